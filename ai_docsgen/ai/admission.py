@@ -0,0 +1,99 @@
+__all__ = ["FileAdmission"]
+
+import fnmatch
+from typing import List, Optional, Tuple
+
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import TreeItem, SkippedFile
+
+log = get_logger(__name__)
+
+# Директории со сторонним или собранным кодом
+EXCLUDED_DIRS = {
+    "vendor", "vendors", "third_party", "third-party", "node_modules", "bower_components",
+    "dist", "build", "target", "obj", "__generated__", "generated",
+}
+
+# Имена файлов минифицированного и сгенерированного кода
+EXCLUDED_FILE_PATTERNS = (
+    "*.min.js", "*.bundle.js", "*.chunk.js", "*-min.js",
+    "*_pb2.py", "*_pb2_grpc.py", "*.pb.go", "*.pb.gw.go", "*_grpc.pb.go", "*.pb.cs",
+    "*.g.cs", "*.g.i.cs", "*.designer.cs", "*.generated.*", "*_generated.*", "*.gen.go", "*.gen.ts",
+    "*.d.ts",
+)
+
+
+class FileAdmission:
+    """
+    Отбор файлов для документирования до их загрузки
+
+    Решение принимается только по метаданным TreeItem: размеру и пути.
+    Файлы неизвестного размера не допускаются.
+    """
+
+    def __init__(self, extensions: Tuple[str, ...], max_file_size: int, byte_budget: Optional[int] = None):
+        """
+        Инициализация отбора
+
+        Args:
+            extensions: Расширения документируемых файлов
+            max_file_size: Максимальный размер одного файла в байтах
+            byte_budget: Максимальный суммарный размер файлов проекта в байтах (None - без ограничения)
+        """
+        self.extensions = extensions
+        self.max_file_size = max_file_size
+        self.byte_budget = byte_budget
+
+    def _check_path(self, path: str) -> Optional[str]:
+        """Возвращает причину отказа по пути файла или None"""
+        parts = path.split("/")
+        for part in parts[:-1]:
+            if part.lower() in EXCLUDED_DIRS:
+                return f"сторонний или собранный код ({part}/)"
+        name = parts[-1].lower()
+        for pattern in EXCLUDED_FILE_PATTERNS:
+            if fnmatch.fnmatchcase(name, pattern):
+                return f"минифицированный или сгенерированный файл ({pattern})"
+        return None
+
+    def admit(self, tree_items: List[TreeItem]) -> Tuple[List[TreeItem], List[SkippedFile]]:
+        """
+        Отбирает файлы для документирования
+
+        Элементы, не являющиеся документируемыми файлами, возвращаются без изменений.
+
+        Args:
+            tree_items: Элементы дерева репозитория
+
+        Returns:
+            Tuple[List[TreeItem], List[SkippedFile]]: Допущенные элементы и пропущенные файлы с причинами
+        """
+        admitted = []
+        skipped = []
+        used_bytes = 0
+
+        for item in tree_items:
+            if item.type != "blob" or not item.path.endswith(self.extensions):
+                admitted.append(item)
+                continue
+
+            reason = self._check_path(item.path)
+            if reason is None:
+                if item.size is None:
+                    # Размер неизвестен, например у блоба, отфильтрованного частичным клоном зеркала
+                    reason = "размер неизвестен (содержимое не загружено)"
+                elif item.size > self.max_file_size:
+                    reason = f"размер {item.size} байт превышает лимит {self.max_file_size} байт"
+                elif self.byte_budget is not None and used_bytes + item.size > self.byte_budget:
+                    reason = f"превышен бюджет проекта {self.byte_budget} байт"
+
+            if reason is not None:
+                log.debug(f"Файл {item.path} пропущен: {reason}")
+                skipped.append(SkippedFile(path=item.path, size=item.size, reason=reason))
+                continue
+
+            used_bytes += item.size
+            admitted.append(item)
+
+        log.info(f"Отбор файлов: пропущено {len(skipped)}, суммарный размер допущенных {used_bytes} байт")
+        return admitted, skipped
@@ -1,76 +1,147 @@
-__all__ = ["AiApiException", "AiAPI", "DialogAPI"]
+__all__ = ["AiApiException", "AsyncAiAPI", "AsyncDialogAPI", "AiAPI", "DialogAPI"]
 
+import asyncio
+import gzip
 import json
+import threading
 import uuid
-from time import sleep
+from typing import Optional, Coroutine, Any, TypeVar
 
-import requests
+import aiohttp
 
+from ai_docsgen.ai.polling import PollingPolicy
 from ai_docsgen.config import settings
 from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import AiConnectionStats
 
 log = get_logger(__name__)
 
+T = TypeVar("T")
+
 
 class AiApiException(Exception):
     pass
 
 
-class AiAPI:
+class AsyncAiAPI:
     def __init__(
             self,
             base_url: str = settings.ai.base_url,
             key: str = settings.ai.key,
             domain: str = settings.ai.domain,
-            operating_system_code: int = settings.ai.operating_system_code):
+            operating_system_code: int = settings.ai.operating_system_code,
+            model_code: int = settings.ai.model_code,
+            polling: Optional[PollingPolicy] = None,
+            compress_threshold: Optional[int] = settings.ai.compress_threshold):
         self.base_url = base_url.rstrip("/")
         self.key = key
         self.domain = domain
         self.operating_system_code = operating_system_code
+        self.model_code = model_code
+        self.polling = polling or PollingPolicy.from_settings()
+        self.compress_threshold = compress_threshold
+        self.stats = AiConnectionStats()
+        self._session: Optional[aiohttp.ClientSession] = None
 
-    def new_dialog(self):
-        return DialogAPI(self, f"{self.domain}_{uuid.uuid4()}")
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """Счётчики новых и переиспользованных соединений пула"""
+        trace_config = aiohttp.TraceConfig()
 
+        async def on_request_start(session, context, params):
+            self.stats.requests += 1
 
-class DialogAPI:
+        async def on_connection_create_end(session, context, params):
+            self.stats.new_connections += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.stats.reused_connections += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Общая для всех диалогов HTTP сессия с пулом keep-alive соединений (создаётся в первом использующем её event loop)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=settings.ai.pool_size,
+                    keepalive_timeout=settings.ai.keepalive_timeout
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    connect=settings.ai.connect_timeout,
+                    sock_read=settings.ai.read_timeout
+                ),
+                trace_configs=[self._trace_config()]
+            )
+        return self._session
+
+    async def post(self, url: str, data: dict) -> tuple[int, str]:
+        """
+        POST запрос к API (тело больше compress_threshold отправляется сжатым gzip)
+
+        Returns:
+            tuple[int, str]: HTTP статус и тело ответа
+        """
+        body = json.dumps(data).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.compress_threshold is not None and len(body) > self.compress_threshold:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+            self.stats.compressed_requests += 1
+
+        async with self.session.post(self.base_url + url, data=body, headers=headers) as response:
+            return response.status, await response.text()
+
+    def new_dialog(self) -> "AsyncDialogAPI":
+        return AsyncDialogAPI(self, f"{self.domain}_{uuid.uuid4()}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class AsyncDialogAPI:
     new_request_url = "/PostNewRequest"
     get_messages_url = "/GetNewResponse"
     complete_session_url = "/CompleteSession"
 
     def __init__(
             self,
-            api: AiAPI,
+            api: AsyncAiAPI,
             dialog_id: str,
     ):
         self.api = api
         self.dialog_id = dialog_id
 
-    def _send_message(self, message: str, retry_count: int = 3) -> bool:
+    async def _send_message(self, message: str, retry_count: int = 3) -> bool:
         _data = {
             "operatingSystemCode": self.api.operating_system_code,
             "apiKey": self.api.key,
             "userDomainName": self.api.domain,
             "dialogIdentifier": self.dialog_id,
-            "aiModelCode": 1,
+            "aiModelCode": self.api.model_code,
             "Message": message
         }
 
         for _ in range(retry_count):
             try:
-                response = requests.post(self.api.base_url + self.new_request_url, json=_data)
+                status, _ = await self.api.post(self.new_request_url, _data)
 
-                if response.status_code != 200:
-                    log.warning("Ошибка ответа: %s", response.status_code)
-                    raise AiApiException(response.status_code)
+                if status != 200:
+                    log.warning("Ошибка ответа: %s", status)
+                    raise AiApiException(status)
                 return True
             except Exception as e:
                 log.error("Произошла ошибка при запросе: %s", e)
-                sleep(settings.ai.timeout)
+                await asyncio.sleep(settings.ai.timeout)
 
         log.error("Превышено количество попыток запроса: %s", retry_count)
         raise AiApiException("Превышено количество попыток запроса")
 
-    def _get_message(self, retry_count: int = 3):
+    async def _get_message(self, retry_count: int = 3):
         _data = {
             "operatingSystemCode": self.api.operating_system_code,
             "apiKey": self.api.key,
@@ -79,11 +150,11 @@ class DialogAPI:
 
         for _ in range(retry_count):
             try:
-                response = requests.post(self.api.base_url + self.get_messages_url, json=_data)
+                status, body = await self.api.post(self.get_messages_url, _data)
 
-                if response.status_code == 200:
+                if status == 200:
                     try:
-                        response_json = response.json()
+                        response_json = json.loads(body)
                         if response_json.get("status", {}).get("isSuccess"):
                             message = response_json.get("data", {}).get("lastMessage")
                             if message:
@@ -93,22 +164,17 @@ class DialogAPI:
                                 return None
                         else:
                             error_desc = response_json.get("status", {}).get("description")
-                            # log.error("Ошибка от сервера: %s", error_desc)
                             raise AiApiException(f"Ошибка от сервера: {error_desc}")
                     except json.JSONDecodeError:
-                        # log.error("Ошибка декодирования JSON.")
                         raise AiApiException("Ошибка декодирования JSON.")
                 else:
-                    # log.warning("Ошибка ответа: %s", response.status_code)
-                    raise AiApiException(f"Ошибка получения ответа: {response.status_code}")
+                    raise AiApiException(f"Ошибка получения ответа: {status}")
             except Exception as e:
-                # log.error("Произошла ошибка при запросе: %s", e)
-                sleep(settings.ai.timeout)
+                await asyncio.sleep(settings.ai.timeout)
 
-        # log.error("Превышено количество попыток запроса: %s", retry_count)
         raise AiApiException("Превышено количество попыток запроса")
 
-    def clear_context(self, retry_count: int = 3):
+    async def clear_context(self, retry_count: int = 3):
         _data = {
             "operatingSystemCode": self.api.operating_system_code,
             "apiKey": self.api.key,
@@ -117,11 +183,11 @@ class DialogAPI:
 
         for _ in range(retry_count):
             try:
-                response = requests.post(self.api.base_url + self.complete_session_url, json=_data)
+                status, body = await self.api.post(self.complete_session_url, _data)
 
-                if response.status_code == 200:
+                if status == 200:
                     try:
-                        result = response.json()
+                        result = json.loads(body)
                         if result.get("isSuccess"):
                             return True
                         else:
@@ -132,48 +198,172 @@ class DialogAPI:
                         log.error("Ошибка декодирования JSON при очистке контекста.")
                         raise AiApiException("Ошибка декодирования JSON при очистке контекста.")
                 else:
-                    log.warning("Ошибка ответа при очистке контекста: %s", response.status_code)
-                    raise AiApiException(f"Ошибка при очистке контекста: {response.status_code}")
+                    log.warning("Ошибка ответа при очистке контекста: %s", status)
+                    raise AiApiException(f"Ошибка при очистке контекста: {status}")
             except Exception as e:
                 log.error("Произошла ошибка при запросе очистки контекста: %s", e)
-                sleep(settings.ai.timeout)
+                await asyncio.sleep(settings.ai.timeout)
 
         log.error("Превышено количество попыток запроса очистки контекста: %s", retry_count)
         raise AiApiException("Превышено количество попыток запроса очистки контекста")
 
-    def ask_ai(self, message: str, max_attempts: int = 50) -> str:
+    async def ask_ai(self, message: str, max_attempts: Optional[int] = None,
+                     deadline: Optional[float] = None) -> str:
         """
-        Отправляет сообщение и ожидает ответа от API с повторными попытками.
-        
+        Отправляет сообщение и ожидает ответа от API, опрашивая его по политике api.polling.
+
         Args:
             message: Текст сообщения для отправки
-            max_attempts: Максимальное количество попыток получения ответа
-            
+            max_attempts: Максимальное количество попыток получения ответа (None - без ограничения)
+            deadline: Максимальное время ожидания ответа в секундах (None - из политики опроса)
+
         Returns:
             str: Полученный ответ от API
-            
+
         Raises:
-            AiApiException: Если ответ не получен за указанное количество попыток
+            AiApiException: Если ответ не получен до дедлайна или за указанное количество попыток
         """
+        policy = self.api.polling
+        deadline = deadline if deadline is not None else policy.deadline
+        loop = asyncio.get_running_loop()
+
         # Отправляем сообщение
-        if not self._send_message(message):
+        if not await self._send_message(message):
             raise AiApiException("Не удалось отправить сообщение")
         else:
             log.info("Сообщение отправлено")
+        started = loop.time()
 
         # Ожидаем ответа
-        for attempt in range(max_attempts):
+        for attempt, delay in enumerate(policy.delays(len(message))):
+            remaining = deadline - (loop.time() - started)
+            if remaining <= 0 or (max_attempts is not None and attempt >= max_attempts):
+                break
+
+            await asyncio.sleep(min(delay, remaining))
             try:
-                response = self._get_message()
+                response = await self._get_message()
             except Exception as e:
                 response = None
             if response:
+                policy.observe(len(message), loop.time() - started)
                 return response
 
-            log.info(f"Ожидание ответа... Попытка {attempt + 1}/{max_attempts}")
-            sleep(settings.ai.timeout)
+            log.info(f"Ожидание ответа... Попытка {attempt + 1}, прошло {loop.time() - started:.1f} с")
+
+        raise AiApiException(f"Не удалось получить ответ за {loop.time() - started:.0f} с")
+
+
+class _EventLoopThread:
+    """Фоновый event loop, в котором синхронный API выполняет асинхронные запросы"""
+
+    _instance: Optional["_EventLoopThread"] = None
+    _instance_lock = threading.Lock()
 
-        raise AiApiException(f"Не удалось получить ответ за {max_attempts} попыток")
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="ai-event-loop", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get(cls) -> "_EventLoopThread":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Выполняет корутину в фоновом loop и блокирует вызывающий поток до результата"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+class AiAPI:
+    """Синхронная обёртка над AsyncAiAPI; все диалоги используют общий фоновый event loop и HTTP сессию"""
+
+    def __init__(
+            self,
+            base_url: str = settings.ai.base_url,
+            key: str = settings.ai.key,
+            domain: str = settings.ai.domain,
+            operating_system_code: int = settings.ai.operating_system_code,
+            model_code: int = settings.ai.model_code):
+        self.async_api = AsyncAiAPI(base_url, key, domain, operating_system_code, model_code)
+        self._loop_thread = _EventLoopThread.get()
+
+    @property
+    def base_url(self) -> str:
+        return self.async_api.base_url
+
+    @property
+    def key(self) -> str:
+        return self.async_api.key
+
+    @property
+    def domain(self) -> str:
+        return self.async_api.domain
+
+    @property
+    def operating_system_code(self) -> int:
+        return self.async_api.operating_system_code
+
+    @property
+    def model_code(self) -> int:
+        return self.async_api.model_code
+
+    @property
+    def connection_stats(self) -> AiConnectionStats:
+        """Снимок статистики пула соединений"""
+        return self.async_api.stats.model_copy()
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return self._loop_thread.run(coro)
+
+    def new_dialog(self):
+        return DialogAPI(self, f"{self.domain}_{uuid.uuid4()}")
+
+    def close(self):
+        self.run(self.async_api.close())
+
+
+class DialogAPI:
+    new_request_url = AsyncDialogAPI.new_request_url
+    get_messages_url = AsyncDialogAPI.get_messages_url
+    complete_session_url = AsyncDialogAPI.complete_session_url
+
+    def __init__(
+            self,
+            api: AiAPI,
+            dialog_id: str,
+    ):
+        self.api = api
+        self.dialog_id = dialog_id
+        self.async_dialog = AsyncDialogAPI(api.async_api, dialog_id)
+
+    def _send_message(self, message: str, retry_count: int = 3) -> bool:
+        return self.api.run(self.async_dialog._send_message(message, retry_count))
+
+    def _get_message(self, retry_count: int = 3):
+        return self.api.run(self.async_dialog._get_message(retry_count))
+
+    def clear_context(self, retry_count: int = 3):
+        return self.api.run(self.async_dialog.clear_context(retry_count))
+
+    def ask_ai(self, message: str, max_attempts: Optional[int] = None, deadline: Optional[float] = None) -> str:
+        """
+        Отправляет сообщение и ожидает ответа от API, опрашивая его по политике api.polling.
+
+        Args:
+            message: Текст сообщения для отправки
+            max_attempts: Максимальное количество попыток получения ответа (None - без ограничения)
+            deadline: Максимальное время ожидания ответа в секундах (None - из политики опроса)
+
+        Returns:
+            str: Полученный ответ от API
+
+        Raises:
+            AiApiException: Если ответ не получен до дедлайна или за указанное количество попыток
+        """
+        return self.api.run(self.async_dialog.ask_ai(message, max_attempts, deadline))
 
 
 if __name__ == "__main__":
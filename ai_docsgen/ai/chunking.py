@@ -0,0 +1,91 @@
+__all__ = ["ModuleChunker"]
+
+from typing import Dict, List
+
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+
+class ModuleChunker:
+    """
+    Оценка размера запроса в токенах и разбиение файлов директории на части,
+    каждая из которых укладывается в бюджет одного запроса к AI
+    """
+
+    def __init__(self, budget_tokens: int, chars_per_token: float = 3.5):
+        """
+        Инициализация
+
+        Args:
+            budget_tokens: Максимальный размер одного запроса в токенах
+            chars_per_token: Среднее число символов на токен (для кода и русского текста около 3-4)
+        """
+        self.budget_tokens = budget_tokens
+        self.chars_per_token = chars_per_token
+
+    def estimate(self, text: str) -> int:
+        """Приблизительное число токенов в тексте"""
+        return int(len(text) / self.chars_per_token) + 1
+
+    @staticmethod
+    def render(file: Dict[str, str]) -> str:
+        """Представление файла в запросе"""
+        return f"### Файл: {file['path']}\n```\n{file['content']}\n```\n\n"
+
+    def _split_file(self, file: Dict[str, str], budget: int) -> List[Dict[str, str]]:
+        """Разбивает слишком большой файл на фрагменты по границам строк"""
+        max_chars = max(int(budget * self.chars_per_token) - len(self.render({"path": file["path"], "content": ""})) - 32, 1)
+        pieces, current, current_len = [], [], 0
+        for line in file["content"].splitlines(keepends=True):
+            while len(line) > max_chars:
+                if current:
+                    pieces.append("".join(current))
+                    current, current_len = [], 0
+                pieces.append(line[:max_chars])
+                line = line[max_chars:]
+            if current_len + len(line) > max_chars and current:
+                pieces.append("".join(current))
+                current, current_len = [], 0
+            current.append(line)
+            current_len += len(line)
+        if current:
+            pieces.append("".join(current))
+
+        return [
+            {"path": f"{file['path']} (фрагмент {i} из {len(pieces)})", "content": piece}
+            for i, piece in enumerate(pieces, 1)
+        ]
+
+    def split(self, files: List[Dict[str, str]], overhead_tokens: int = 0) -> List[List[Dict[str, str]]]:
+        """
+        Разбивает файлы на части, сохраняя их порядок
+
+        Args:
+            files: Файлы в формате {'path': ..., 'content': ...}
+            overhead_tokens: Размер неизменной части запроса (промпт, заголовки, инструкции)
+
+        Returns:
+            List[List[Dict[str, str]]]: Части; файл больше бюджета разбивается на фрагменты
+        """
+        budget = max(self.budget_tokens - overhead_tokens, 1)
+        chunks: List[List[Dict[str, str]]] = []
+        current: List[Dict[str, str]] = []
+        current_tokens = 0
+
+        for file in files:
+            tokens = self.estimate(self.render(file))
+            parts = self._split_file(file, budget) if tokens > budget else [file]
+            for part in parts:
+                tokens = self.estimate(self.render(part))
+                if current and current_tokens + tokens > budget:
+                    chunks.append(current)
+                    current, current_tokens = [], 0
+                current.append(part)
+                current_tokens += tokens
+
+        if current:
+            chunks.append(current)
+
+        log.debug(f"{len(files)} файлов разбито на {len(chunks)} частей (бюджет части: {budget} токенов)")
+        return chunks
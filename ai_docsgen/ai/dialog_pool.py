@@ -0,0 +1,111 @@
+__all__ = ["DialogPool"]
+
+import threading
+from typing import List
+
+from ai_docsgen.ai.api import AiAPI, DialogAPI
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+PRIMING_SUFFIX = (
+    "\n\nВ следующих сообщениях будут переданы файлы. На каждое сообщение отвечайте по инструкции выше. "
+    "Сейчас ответьте одним словом: Готов"
+)
+
+
+class _PooledDialog:
+    """Диалог пула и накопленный в нём контекст"""
+
+    def __init__(self, dialog: DialogAPI, context_chars: int):
+        self.dialog = dialog
+        self.turns = 0
+        self.context_chars = context_chars
+
+
+class DialogPool:
+    """
+    Пул диалогов AI с одинаковой инструкцией
+
+    Инструкция отправляется один раз при открытии диалога, дальше в диалог отправляются
+    только данные. Диалог закрывается (CompleteSession) после max_turns запросов
+    или когда накопленный контекст превышает max_context_chars.
+    """
+
+    def __init__(self, ai_instance: AiAPI, instructions: str, max_turns: int, max_context_chars: int):
+        """
+        Инициализация пула
+
+        Args:
+            ai_instance: Экземпляр AI API
+            instructions: Инструкция, которой открывается каждый диалог
+            max_turns: Максимальное число запросов в одном диалоге
+            max_context_chars: Максимальный накопленный размер диалога в символах
+        """
+        self.ai_instance = ai_instance
+        self.instructions = instructions
+        self.max_turns = max_turns
+        self.max_context_chars = max_context_chars
+        self._idle: List[_PooledDialog] = []
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> _PooledDialog:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        dialog = self.ai_instance.new_dialog()
+        try:
+            answer = dialog.ask_ai(self.instructions + PRIMING_SUFFIX)
+        except Exception:
+            self.complete(dialog)
+            raise
+        log.debug(f"Открыт диалог {dialog.dialog_id} с инструкцией ({len(self.instructions)} символов)")
+        return _PooledDialog(dialog, len(self.instructions) + len(answer))
+
+    def _release(self, pooled: _PooledDialog):
+        if pooled.turns >= self.max_turns or pooled.context_chars >= self.max_context_chars:
+            log.debug(f"Диалог {pooled.dialog.dialog_id} закрыт после {pooled.turns} запросов "
+                      f"({pooled.context_chars} символов контекста)")
+            self.complete(pooled.dialog)
+            return
+        with self._lock:
+            self._idle.append(pooled)
+
+    @staticmethod
+    def complete(dialog: DialogAPI):
+        """Закрывает диалог на сервере (ошибка закрытия только логируется)"""
+        try:
+            dialog.clear_context()
+        except Exception as e:
+            log.warning(f"Не удалось закрыть диалог {getattr(dialog, 'dialog_id', '')}: {e}")
+
+    def ask(self, payload: str) -> str:
+        """
+        Отправляет данные в свободный диалог пула
+
+        Args:
+            payload: Данные запроса (без инструкции)
+
+        Returns:
+            str: Ответ AI
+        """
+        pooled = self._acquire()
+        try:
+            response = pooled.dialog.ask_ai(payload)
+        except Exception:
+            # Состояние диалога после ошибки неизвестно, дальше его не используем
+            self.complete(pooled.dialog)
+            raise
+
+        pooled.turns += 1
+        pooled.context_chars += len(payload) + len(response)
+        self._release(pooled)
+        return response
+
+    def close(self):
+        """Закрывает свободные диалоги пула (пулом можно продолжать пользоваться)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self.complete(pooled.dialog)
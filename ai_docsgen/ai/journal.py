@@ -0,0 +1,81 @@
+__all__ = ["JobJournal"]
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict
+
+from pydantic import ValidationError
+
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import JournalRecord
+
+log = get_logger(__name__)
+
+
+class JobJournal:
+    """
+    Журнал выполнения задачи: по одной JSON строке на готовую директорию
+
+    Каждая запись сбрасывается на диск (fsync) до того, как директория считается готовой,
+    поэтому после падения процесса повторный запуск той же задачи продолжает работу
+    с места остановки. Оборванная последняя строка при чтении пропускается.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Открывает журнал (существующие записи читаются)
+
+        Args:
+            path: Путь к файлу журнала
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.records: Dict[str, JournalRecord] = self._read()
+        if self.records:
+            log.info(f"Журнал задачи {self.path.name}: готово директорий - {len(self.records)}")
+
+    def _read(self) -> Dict[str, JournalRecord]:
+        records: Dict[str, JournalRecord] = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = JournalRecord.model_validate_json(line)
+                except ValidationError as e:
+                    log.warning(f"Пропущена повреждённая запись {number} журнала {self.path.name}: {e.error_count()} ошибок")
+                    continue
+                records[record.module] = record
+        return records
+
+    def append(self, record: JournalRecord):
+        """
+        Добавляет запись и дожидается её записи на диск
+
+        Args:
+            record: Результат обработки директории
+        """
+        line = record.model_dump_json() + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.records[record.module] = record
+
+    def compact(self):
+        """Атомарно переписывает журнал, оставляя последнюю запись для каждой директории"""
+        with self._lock:
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for record in self.records.values():
+                    f.write(record.model_dump_json() + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, self.path)
+        log.debug(f"Журнал {self.path.name} сжат до {len(self.records)} записей")
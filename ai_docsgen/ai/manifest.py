@@ -0,0 +1,63 @@
+__all__ = ["ManifestStore"]
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import ProjectManifest
+
+log = get_logger(__name__)
+
+
+class ManifestStore:
+    """Хранилище манифестов проектов (по одному JSON файлу на проект)"""
+
+    def __init__(self, directory: Path):
+        """
+        Инициализация хранилища
+
+        Args:
+            directory: Директория для файлов манифестов
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, project_id: UUID) -> Path:
+        return self.directory / f"{project_id}.json"
+
+    def load(self, project_id: UUID) -> Optional[ProjectManifest]:
+        """
+        Загрузка манифеста проекта
+
+        Args:
+            project_id: ID проекта
+
+        Returns:
+            Optional[ProjectManifest]: Манифест или None, если его нет или он повреждён
+        """
+        path = self._path(project_id)
+        if not path.exists():
+            return None
+        try:
+            return ProjectManifest.model_validate_json(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            log.warning(f"Не удалось прочитать манифест {path}: {e}")
+            return None
+
+    def save(self, project_id: UUID, manifest: ProjectManifest):
+        """
+        Атомарное сохранение манифеста проекта
+
+        Args:
+            project_id: ID проекта
+            manifest: Манифест
+        """
+        path = self._path(project_id)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(manifest.model_dump_json())
+        os.replace(tmp_name, path)
+        log.debug(f"Манифест проекта {project_id} сохранён в {path}")
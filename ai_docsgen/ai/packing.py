@@ -0,0 +1,98 @@
+__all__ = ["ModulePacker"]
+
+import re
+from typing import Dict, List, Optional
+
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import TreeItem
+
+log = get_logger(__name__)
+
+SECTION_HEADER = "=== ДИРЕКТОРИЯ: {} ==="
+SECTION_HEADER_RE = re.compile(r"^=== ДИРЕКТОРИЯ: (.+?) ===[ \t]*$", re.MULTILINE)
+
+
+class ModulePacker:
+    """
+    Упаковка маленьких директорий в общие запросы к AI
+
+    Директории с небольшим суммарным размером файлов раскладываются по запросам
+    (first-fit decreasing), ответ запроса содержит разделы с заголовками
+    SECTION_HEADER и разбирается обратно по директориям.
+    """
+
+    def __init__(self, module_max_bytes: int, request_max_bytes: int, max_modules: int):
+        """
+        Инициализация
+
+        Args:
+            module_max_bytes: Директории с файлами большего суммарного размера документируются отдельно
+            request_max_bytes: Максимальный суммарный размер файлов в одном общем запросе
+            max_modules: Максимальное число директорий в одном общем запросе
+        """
+        self.module_max_bytes = module_max_bytes
+        self.request_max_bytes = request_max_bytes
+        self.max_modules = max_modules
+
+    @staticmethod
+    def _module_size(files: List[TreeItem]) -> Optional[int]:
+        if any(item.size is None for item in files):
+            return None
+        return sum(item.size for item in files)
+
+    def pack(self, modules: Dict[str, List[TreeItem]]) -> List[List[str]]:
+        """
+        Раскладывает маленькие директории по общим запросам
+
+        Args:
+            modules: Словарь {директория: [файлы]}
+
+        Returns:
+            List[List[str]]: Группы директорий из двух и более элементов; остальные директории
+            документируются отдельно
+        """
+        if self.max_modules < 2:
+            return []
+
+        small = []
+        for module_path, files in modules.items():
+            size = self._module_size(files)
+            if size is not None and size <= self.module_max_bytes:
+                small.append((size, module_path))
+
+        bins: List[List] = []  # [суммарный размер, [директории]]
+        for size, module_path in sorted(small, key=lambda entry: (-entry[0], entry[1])):
+            for packed in bins:
+                if packed[0] + size <= self.request_max_bytes and len(packed[1]) < self.max_modules:
+                    packed[0] += size
+                    packed[1].append(module_path)
+                    break
+            else:
+                bins.append([size, [module_path]])
+
+        groups = [sorted(names) for _, names in bins if len(names) > 1]
+        log.info(f"{sum(len(group) for group in groups)} маленьких директорий упаковано в {len(groups)} общих запросов")
+        return groups
+
+    @staticmethod
+    def split_response(response: str, titles: List[str]) -> Dict[str, str]:
+        """
+        Разбирает ответ общего запроса на разделы
+
+        Args:
+            response: Ответ AI
+            titles: Заголовки директорий, использованные в запросе
+
+        Returns:
+            Dict[str, str]: {заголовок: документация}; директории без раздела в ответе отсутствуют
+        """
+        expected = set(titles)
+        sections: Dict[str, str] = {}
+        headers = list(SECTION_HEADER_RE.finditer(response))
+        for i, header in enumerate(headers):
+            title = header.group(1).strip()
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(response)
+            content = response[header.end():end].strip()
+            if title in expected and content and title not in sections:
+                sections[title] = content + "\n"
+        return sections
@@ -0,0 +1,103 @@
+__all__ = ["StagedPipeline"]
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+_DONE = object()
+
+
+class StagedPipeline:
+    """
+    Конвейер из последовательных стадий, соединённых ограниченными очередями
+
+    Каждая стадия обрабатывается своим числом потоков. Результат стадии (если не None)
+    передаётся следующей; когда очередь следующей стадии заполнена, стадия ждёт,
+    поэтому в памяти одновременно находится не больше queue_size элементов на очередь.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any], int]], queue_size: int):
+        """
+        Инициализация
+
+        Args:
+            stages: Стадии (название, функция обработки элемента, число потоков)
+            queue_size: Размер очереди перед каждой стадией
+        """
+        self.stages = stages
+        self.queue_size = max(queue_size, 1)
+
+    def run(self, items: Iterable[Any]):
+        """
+        Пропускает элементы через все стадии и дожидается завершения
+
+        Ошибка обработки элемента записывается в лог, элемент отбрасывается, остальные
+        элементы обрабатываются до конца.
+
+        Args:
+            items: Входные элементы первой стадии (читаются по мере освобождения очереди)
+
+        Raises:
+            Exception: Первая ошибка обработки элемента (после завершения всех стадий)
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        errors: List[Exception] = []
+        errors_lock = threading.Lock()
+
+        for index, (name, func, workers) in enumerate(self.stages):
+            workers = max(workers, 1)
+            inbox = queues[index]
+            outbox: Optional[queue.Queue] = queues[index + 1] if index + 1 < len(queues) else None
+            next_workers = max(self.stages[index + 1][2], 1) if outbox is not None else 0
+            remaining = [workers]
+            lock = threading.Lock()
+
+            def work(name=name, func=func, inbox=inbox, outbox=outbox, next_workers=next_workers,
+                     remaining=remaining, lock=lock):
+                try:
+                    while True:
+                        item = inbox.get()
+                        if item is _DONE:
+                            break
+                        try:
+                            result = func(item)
+                        except Exception as e:
+                            log.error(f"Ошибка стадии {name}: {e}")
+                            with errors_lock:
+                                errors.append(e)
+                            continue
+                        if result is not None and outbox is not None:
+                            outbox.put(result)
+                finally:
+                    # Последний поток стадии сообщает следующей стадии о завершении
+                    with lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    if last and outbox is not None:
+                        for _ in range(next_workers):
+                            outbox.put(_DONE)
+
+            for number in range(workers):
+                thread = threading.Thread(target=work, name=f"docgen-{name}-{number}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            # Завершение передаётся и при ошибке чтения входных элементов, иначе потоки стадий не завершатся
+            for _ in range(max(self.stages[0][2], 1)):
+                queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            if len(errors) > 1:
+                log.error(f"Ошибок обработки элементов конвейера: {len(errors)}")
+            raise errors[0]
@@ -0,0 +1,95 @@
+__all__ = ["PollingPolicy"]
+
+import math
+import random
+import threading
+from typing import Dict, Iterator, Optional
+
+from ai_docsgen.config import settings
+
+
+class PollingPolicy:
+    """
+    Политика опроса GetNewResponse: экспоненциальная задержка с джиттером и общим дедлайном
+
+    Политика запоминает время ответа для запросов разного размера (корзины по степеням двойки)
+    и начинает опрос не раньше, чем ответ такого размера обычно бывает готов.
+    """
+
+    def __init__(self, initial: float, factor: float, max_interval: float, jitter: float,
+                 deadline: float, smoothing: float = 0.3):
+        """
+        Инициализация политики
+
+        Args:
+            initial: Первый интервал опроса в секундах
+            factor: Множитель интервала после каждой неудачной попытки
+            max_interval: Максимальный интервал в секундах
+            jitter: Доля случайного отклонения интервала (0.2 - ±20%)
+            deadline: Общее время ожидания ответа диалога в секундах
+            smoothing: Вес нового наблюдения в скользящем среднем времени ответа
+        """
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadline = deadline
+        self.smoothing = smoothing
+        self._expected: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "PollingPolicy":
+        return cls(
+            initial=settings.ai.poll_initial,
+            factor=settings.ai.poll_factor,
+            max_interval=settings.ai.poll_max_interval,
+            jitter=settings.ai.poll_jitter,
+            deadline=settings.ai.deadline
+        )
+
+    @staticmethod
+    def _bucket(prompt_size: int) -> int:
+        return int(math.log2(prompt_size + 1))
+
+    def expected(self, prompt_size: int) -> Optional[float]:
+        """Ожидаемое время ответа для запроса такого размера или None, если наблюдений нет"""
+        with self._lock:
+            return self._expected.get(self._bucket(prompt_size))
+
+    def observe(self, prompt_size: int, elapsed: float):
+        """
+        Учитывает фактическое время ответа
+
+        Args:
+            prompt_size: Размер запроса в символах
+            elapsed: Время от отправки до получения ответа в секундах
+        """
+        bucket = self._bucket(prompt_size)
+        with self._lock:
+            previous = self._expected.get(bucket)
+            self._expected[bucket] = elapsed if previous is None else \
+                previous + self.smoothing * (elapsed - previous)
+
+    def _with_jitter(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def delays(self, prompt_size: int) -> Iterator[float]:
+        """
+        Бесконечная последовательность пауз перед очередным опросом
+
+        Args:
+            prompt_size: Размер запроса в символах
+
+        Returns:
+            Iterator[float]: Паузы в секундах
+        """
+        expected = self.expected(prompt_size)
+        if expected is not None:
+            # Первый опрос чуть раньше типичного времени ответа, дальше - частые короткие опросы
+            yield self._with_jitter(expected * 0.8)
+
+        interval = self.initial
+        while True:
+            yield self._with_jitter(interval)
+            interval = min(interval * self.factor, self.max_interval)
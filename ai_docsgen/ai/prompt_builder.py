@@ -0,0 +1,128 @@
+__all__ = ["PromptTemplates", "PromptBuilder", "BuiltRequest"]
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ai_docsgen.ai.chunking import ModuleChunker
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+
+class PromptTemplates:
+    """
+    Кэш текстов промптов
+
+    Файл читается с диска один раз и перечитывается, только если изменились
+    его время модификации или размер.
+    """
+
+    def __init__(self):
+        self._cache: Dict[Path, Tuple[int, int, str]] = {}  # {путь: (mtime_ns, размер, текст)}
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> str:
+        """
+        Текст промпта
+
+        Args:
+            path: Путь к файлу промпта
+
+        Returns:
+            str: Содержимое файла
+        """
+        stat = os.stat(path)
+        cached = self._cache.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        with self._lock:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            self._cache[path] = (stat.st_mtime_ns, stat.st_size, text)
+        log.debug(f"Промпт {path.name} прочитан, размер: {len(text)} символов")
+        return text
+
+
+class BuiltRequest:
+    """Текст запроса, собранный из частей одним join, и его размеры"""
+
+    def __init__(self, parts: List[str], chunker: ModuleChunker):
+        self.text = "".join(parts)
+        self.chars = len(self.text)
+        self.tokens = chunker.estimate(self.text)
+        self._bytes: Optional[int] = None
+
+    @property
+    def bytes(self) -> int:
+        """Размер запроса в байтах UTF-8"""
+        if self._bytes is None:
+            self._bytes = len(self.text.encode("utf-8"))
+        return self._bytes
+
+    def __str__(self) -> str:
+        return f"{self.bytes} байт, ~{self.tokens} токенов"
+
+
+class PromptBuilder:
+    """Сборка запросов к AI из содержимого файлов директорий"""
+
+    def __init__(self, chunker: ModuleChunker):
+        """
+        Инициализация
+
+        Args:
+            chunker: Оценщик размера в токенах
+        """
+        self.chunker = chunker
+
+    def build(self, parts: List[str]) -> BuiltRequest:
+        """Собирает запрос из готовых частей"""
+        return BuiltRequest(parts, self.chunker)
+
+    @staticmethod
+    def _instructions(instructions: Optional[str]) -> List[str]:
+        return [f"\n## ДОПОЛНИТЕЛЬНЫЕ ИНСТРУКЦИИ:\n{instructions}\n"] if instructions else []
+
+    def module_request(self, title: str, files_content: List[Dict[str, str]],
+                       instructions: Optional[str] = None) -> BuiltRequest:
+        """
+        Запрос документации директории (без промпта)
+
+        Args:
+            title: Заголовок директории в запросе
+            files_content: Файлы в формате {'path': ..., 'content': ...}
+            instructions: Дополнительные инструкции проекта
+
+        Returns:
+            BuiltRequest: Текст запроса после промпта
+        """
+        parts = [f"## ФАЙЛЫ ДИРЕКТОРИИ {title}:\n\n"]
+        parts.extend(ModuleChunker.render(file) for file in files_content)
+        parts.extend(self._instructions(instructions))
+        return self.build(parts)
+
+    def packed_request(self, pack_prompt: str, titles: Dict[str, str], contents: Dict[str, List[Dict[str, str]]],
+                       section_header: str, instructions: Optional[str] = None) -> BuiltRequest:
+        """
+        Общий запрос документации нескольких директорий (без промпта)
+
+        Args:
+            pack_prompt: Шаблон промпта общего запроса с подстановкой {headers}
+            titles: Словарь {директория: заголовок}
+            contents: Словарь {директория: файлы}
+            section_header: Формат заголовка раздела ответа
+            instructions: Дополнительные инструкции проекта
+
+        Returns:
+            BuiltRequest: Текст запроса после промпта
+        """
+        headers = "\n".join(section_header.format(title) for title in titles.values())
+        parts = [f"{pack_prompt.format(headers=headers)}\n"]
+        for module_path, title in titles.items():
+            parts.append(f"\n## ФАЙЛЫ ДИРЕКТОРИИ {title}:\n\n")
+            parts.extend(ModuleChunker.render(file) for file in contents[module_path])
+        parts.extend(self._instructions(instructions))
+        return self.build(parts)
@@ -0,0 +1,209 @@
+__all__ = ["CircuitBreaker", "CircuitOpenError", "LatencyTracker", "hedged_call"]
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Deque, Optional, TypeVar
+
+from ai_docsgen.ai.api import AiApiException
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(AiApiException):
+    """Запрос отклонён без обращения к AI: цепь разомкнута"""
+    pass
+
+
+class _CallTicket:
+    """Разрешение на запрос, выданное CircuitBreaker.before_call"""
+
+    def __init__(self, probe: bool, generation: int):
+        self.probe = probe
+        self.generation = generation
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель запросов к AI
+
+    В замкнутом состоянии считает долю ошибок в скользящем окне последних запросов.
+    Когда доля достигает порога, цепь размыкается и запросы сразу завершаются
+    CircuitOpenError. Через open_seconds цепь переходит в полуоткрытое состояние и
+    пропускает half_open_probes пробных запросов: успех замыкает цепь, ошибка снова размыкает.
+    Результаты запросов, разрешённых до последней смены состояния, не учитываются.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window: int, error_rate: float, min_requests: int, open_seconds: float,
+                 half_open_probes: int = 1):
+        """
+        Инициализация
+
+        Args:
+            window: Размер окна последних запросов
+            error_rate: Доля ошибок в окне, при которой цепь размыкается
+            min_requests: Минимальное число запросов в окне для принятия решения
+            open_seconds: Время в разомкнутом состоянии до пробных запросов
+            half_open_probes: Число одновременных пробных запросов
+        """
+        self.window = window
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = self.CLOSED
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._generation = 0  # номер периода между сменами состояния
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str):
+        self.state = state
+        self._generation += 1
+
+    def _open(self):
+        self._set_state(self.OPEN)
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        log.warning(f"Цепь запросов к AI разомкнута на {self.open_seconds:.0f} с")
+
+    def before_call(self) -> _CallTicket:
+        """
+        Проверяет, можно ли выполнить запрос
+
+        Returns:
+            _CallTicket: Разрешение, передаваемое в record вместе с результатом
+
+        Raises:
+            CircuitOpenError: Если цепь разомкнута или лимит пробных запросов исчерпан
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._set_state(self.HALF_OPEN)
+                self._probes = 0
+                log.info("Цепь запросов к AI в полуоткрытом состоянии, выполняется пробный запрос")
+
+            if self.state == self.CLOSED:
+                return _CallTicket(probe=False, generation=self._generation)
+            if self.state == self.HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return _CallTicket(probe=True, generation=self._generation)
+
+            self.rejected += 1
+            raise CircuitOpenError("Сервис AI недоступен: цепь запросов разомкнута")
+
+    def record(self, ticket: _CallTicket, success: bool):
+        """
+        Учитывает результат запроса, разрешённого before_call
+
+        Состояние полуоткрытой цепи меняют только пробные запросы; результат запроса,
+        разрешённого до смены состояния, отбрасывается.
+
+        Args:
+            ticket: Разрешение, полученное от before_call
+            success: Успешен ли запрос
+        """
+        with self._lock:
+            if ticket.generation != self._generation:
+                return
+
+            if ticket.probe:
+                self._probes -= 1
+                if success:
+                    self._set_state(self.CLOSED)
+                    self._outcomes.clear()
+                    log.info("Цепь запросов к AI замкнута")
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(success)
+            if len(self._outcomes) >= self.min_requests:
+                errors = self._outcomes.count(False)
+                if errors / len(self._outcomes) >= self.error_rate:
+                    self._open()
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Выполняет func под защитой выключателя"""
+        ticket = self.before_call()
+        try:
+            result = func()
+        except Exception:
+            self.record(ticket, False)
+            raise
+        self.record(ticket, True)
+        return result
+
+
+class LatencyTracker:
+    """Скользящее окно длительностей запросов для оценки перцентилей"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Перцентиль длительности
+
+        Args:
+            q: Уровень от 0 до 1
+            min_samples: Минимальное число наблюдений
+
+        Returns:
+            Optional[float]: Длительность в секундах или None, если наблюдений мало
+        """
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def hedged_call(primary: Callable[[], T], backup: Callable[[], T], delay: float) -> T:
+    """
+    Выполняет primary; если ответа нет за delay секунд, параллельно запускает backup
+    и возвращает первый успешный результат
+
+    Проигравший запрос не прерывается (синхронный опрос AI нельзя отменить), его результат отбрасывается.
+
+    Args:
+        primary: Основной запрос
+        backup: Дублирующий запрос
+        delay: Задержка перед дублированием в секундах
+
+    Returns:
+        T: Результат первого успешного запроса
+    """
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ai-hedge")
+    try:
+        pending = {executor.submit(primary)}
+        done, _ = wait(pending, timeout=delay)
+        if not done:
+            log.info(f"Ответ AI не получен за {delay:.1f} с, запрос продублирован")
+            pending.add(executor.submit(backup))
+
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        executor.shutdown(wait=False)
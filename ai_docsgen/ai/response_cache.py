@@ -0,0 +1,83 @@
+__all__ = ["ResponseCache"]
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+from ai_docsgen.disk_store import DiskStore
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import AiCacheStats
+
+log = get_logger(__name__)
+
+
+class ResponseCache:
+    """
+    Постоянное хранилище ответов AI, адресуемое хешем запроса и кода модели
+
+    Побайтно одинаковый запрос к той же модели не отправляется повторно. Записи
+    вытесняются по размеру хранилища (LRU) и по возрасту.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, max_age: Optional[float] = None):
+        """
+        Инициализация кэша
+
+        Args:
+            directory: Директория хранилища
+            max_bytes: Максимальный суммарный размер ответов в байтах
+            max_age: Максимальный возраст записи в секундах (None - без ограничения)
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._store = DiskStore(self.directory, max_bytes, max_age=max_age)
+        self._stats_lock = threading.Lock()
+        log.info(f"Кэш ответов AI: {self.directory}, записей: {len(self._store)}, размер: {self._store.total_bytes} байт")
+
+    @staticmethod
+    def key(prompt: str, model_code: int) -> str:
+        """
+        Ключ записи
+
+        Args:
+            prompt: Полный текст запроса
+            model_code: Код модели AI
+
+        Returns:
+            str: SHA-256 кода модели и запроса
+        """
+        digest = hashlib.sha256(f"{model_code}\0".encode("utf-8"))
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str, stats: Optional[AiCacheStats] = None) -> Optional[str]:
+        """
+        Чтение ответа
+
+        Args:
+            key: Ключ записи (см. key)
+            stats: Счётчики задачи, которые нужно обновить
+
+        Returns:
+            Optional[str]: Ответ AI или None, если записи нет или она устарела
+        """
+        entry = self._store.get(key)
+        if stats is not None:
+            with self._stats_lock:
+                if entry is None:
+                    stats.misses += 1
+                else:
+                    stats.hits += 1
+        return entry[0] if entry is not None else None
+
+    def put(self, key: str, response: str):
+        """
+        Сохранение ответа
+
+        Args:
+            key: Ключ записи (см. key)
+            response: Ответ AI
+        """
+        self._store.put(key, response)
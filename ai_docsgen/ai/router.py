@@ -0,0 +1,208 @@
+__all__ = ["AiRouter", "RoutedDialog"]
+
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+from ai_docsgen.ai.api import AiAPI, DialogAPI
+from ai_docsgen.config import settings, AIEndpoint
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import AiConnectionStats, AiEndpointStats
+
+log = get_logger(__name__)
+
+
+class _Endpoint:
+    """Точка доступа маршрутизатора: клиент, лимит и счётчики"""
+
+    def __init__(self, api: AiAPI, name: str, weight: float, max_in_flight: int):
+        self.api = api
+        self.name = name
+        self.weight = weight
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.quarantined_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.quarantined_until
+
+    def load(self) -> float:
+        return (self.in_flight + 1) / self.weight
+
+    def stats(self, now: float) -> AiEndpointStats:
+        return AiEndpointStats(
+            name=self.name,
+            requests=self.requests,
+            errors=self.errors,
+            in_flight=self.in_flight,
+            mean_latency=self.total_latency / self.requests if self.requests else 0.0,
+            max_latency=self.max_latency,
+            quarantined=not self.healthy(now)
+        )
+
+
+class AiRouter:
+    """
+    Распределение диалогов AI между несколькими точками доступа (URL и ключами)
+
+    Диалог привязывается к точке доступа при первом запросе (контекст диалога хранится
+    на её стороне). Выбирается наименее загруженная с учётом веса исправная точка,
+    у которой не исчерпан лимит одновременных запросов. После quarantine_errors ошибок
+    подряд точка выводится из ротации на quarantine_seconds.
+    Интерфейс совпадает с AiAPI, поэтому маршрутизатор можно передать в PipelineWorker.
+    """
+
+    def __init__(self, endpoints: List[AIEndpoint],
+                 quarantine_errors: int = settings.ai.quarantine_errors,
+                 quarantine_seconds: float = settings.ai.quarantine_seconds):
+        """
+        Инициализация маршрутизатора
+
+        Args:
+            endpoints: Точки доступа
+            quarantine_errors: Число ошибок подряд, после которого точка выводится из ротации
+            quarantine_seconds: Время карантина точки в секундах
+        """
+        if not endpoints:
+            raise ValueError("Не задано ни одной точки доступа AI")
+
+        self.quarantine_errors = quarantine_errors
+        self.quarantine_seconds = quarantine_seconds
+        self._endpoints = [
+            _Endpoint(
+                api=AiAPI(base_url=endpoint.base_url, key=endpoint.key, domain=endpoint.domain or settings.ai.domain),
+                name=f"{endpoint.base_url} (ключ ...{endpoint.key[-4:]})",
+                weight=endpoint.weight,
+                max_in_flight=endpoint.max_in_flight
+            )
+            for endpoint in endpoints
+        ]
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_settings(cls) -> "AiRouter":
+        return cls(settings.ai.endpoints)
+
+    @property
+    def model_code(self) -> int:
+        return self._endpoints[0].api.model_code
+
+    @property
+    def connection_stats(self) -> AiConnectionStats:
+        """Суммарная статистика пулов соединений всех точек доступа"""
+        total = AiConnectionStats()
+        for endpoint in self._endpoints:
+            for name, value in endpoint.api.connection_stats.model_dump().items():
+                setattr(total, name, getattr(total, name) + value)
+        return total
+
+    def endpoint_stats(self) -> List[AiEndpointStats]:
+        """Снимок статистики задержек и ошибок по точкам доступа"""
+        now = time.monotonic()
+        with self._condition:
+            return [endpoint.stats(now) for endpoint in self._endpoints]
+
+    def new_dialog(self) -> "RoutedDialog":
+        return RoutedDialog(self)
+
+    def _select(self) -> _Endpoint:
+        """Ожидает и занимает слот наименее загруженной исправной точки доступа"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                available = [e for e in self._endpoints if e.in_flight < e.max_in_flight]
+                healthy = [e for e in available if e.healthy(now)]
+                if healthy:
+                    endpoint = min(healthy, key=_Endpoint.load)
+                elif available and all(not e.healthy(now) for e in self._endpoints):
+                    # В карантине все точки - пробуем ту, чей карантин закончится раньше
+                    endpoint = min(available, key=lambda e: e.quarantined_until)
+                else:
+                    self._condition.wait(timeout=1)
+                    continue
+                endpoint.in_flight += 1
+                return endpoint
+
+    def _acquire(self, endpoint: _Endpoint):
+        """Ожидает и занимает слот конкретной точки доступа (для продолжения диалога)"""
+        with self._condition:
+            while endpoint.in_flight >= endpoint.max_in_flight:
+                self._condition.wait(timeout=1)
+            endpoint.in_flight += 1
+
+    def _release(self, endpoint: _Endpoint, latency: float, error: Optional[Exception]):
+        with self._condition:
+            endpoint.in_flight -= 1
+            endpoint.requests += 1
+            endpoint.total_latency += latency
+            endpoint.max_latency = max(endpoint.max_latency, latency)
+            if error is None:
+                endpoint.consecutive_errors = 0
+            else:
+                endpoint.errors += 1
+                endpoint.consecutive_errors += 1
+                if endpoint.consecutive_errors >= self.quarantine_errors:
+                    endpoint.quarantined_until = time.monotonic() + self.quarantine_seconds
+                    endpoint.consecutive_errors = 0
+                    log.warning(f"Точка доступа AI {endpoint.name} выведена из ротации на "
+                                f"{self.quarantine_seconds:.0f} с: {error}")
+            self._condition.notify_all()
+
+    def close(self):
+        for endpoint in self._endpoints:
+            endpoint.api.close()
+
+
+class RoutedDialog:
+    """Диалог, привязываемый к точке доступа маршрутизатора при первом запросе"""
+
+    def __init__(self, router: AiRouter):
+        self.router = router
+        self._dialog_uuid = uuid.uuid4()
+        self._endpoint: Optional[_Endpoint] = None
+        self._dialog: Optional[DialogAPI] = None
+
+    @property
+    def dialog_id(self) -> str:
+        """Идентификатор диалога с доменом точки доступа (до привязки - с общим доменом)"""
+        domain = self._endpoint.api.domain if self._endpoint is not None else settings.ai.domain
+        return f"{domain}_{self._dialog_uuid}"
+
+    def ask_ai(self, message: str, max_attempts: Optional[int] = None, deadline: Optional[float] = None) -> str:
+        """
+        Отправляет сообщение через точку доступа диалога и ожидает ответа
+
+        Args:
+            message: Текст сообщения для отправки
+            max_attempts: Максимальное количество попыток получения ответа (None - без ограничения)
+            deadline: Максимальное время ожидания ответа в секундах (None - из политики опроса)
+
+        Returns:
+            str: Полученный ответ от API
+        """
+        if self._endpoint is None:
+            self._endpoint = self.router._select()
+            self._dialog = DialogAPI(self._endpoint.api, self.dialog_id)
+        else:
+            self.router._acquire(self._endpoint)
+
+        started = time.monotonic()
+        error = None
+        try:
+            return self._dialog.ask_ai(message, max_attempts, deadline)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.router._release(self._endpoint, time.monotonic() - started, error)
+
+    def clear_context(self, retry_count: int = 3):
+        if self._dialog is None:
+            return True
+        return self._dialog.clear_context(retry_count)
@@ -1,99 +1,242 @@
+import hashlib
 import os
+import shutil
 import tempfile
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import Callable, List, Dict, Optional, Tuple
 
+from ai_docsgen.ai.admission import FileAdmission
 from ai_docsgen.ai.api import AiAPI
-from ai_docsgen.config import Settings
+from ai_docsgen.ai.chunking import ModuleChunker
+from ai_docsgen.ai.dialog_pool import DialogPool
+from ai_docsgen.ai.journal import JobJournal
+from ai_docsgen.ai.manifest import ManifestStore
+from ai_docsgen.ai.packing import ModulePacker, SECTION_HEADER
+from ai_docsgen.ai.pipeline import StagedPipeline
+from ai_docsgen.ai.prompt_builder import PromptTemplates, PromptBuilder
+from ai_docsgen.ai.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged_call
+from ai_docsgen.ai.response_cache import ResponseCache
+from ai_docsgen.ai.router import AiRouter
+from ai_docsgen.config import Settings, settings
+from ai_docsgen.git.blob_cache import BlobCache
+from ai_docsgen.git.ignore import IgnoreMatcher
+from ai_docsgen.git.mirror import LocalMirror
 from ai_docsgen.git.scm import Scm
+from ai_docsgen.git.tarball import TarballSource
 from ai_docsgen.log_setup import get_logger
-from ai_docsgen.schemas import Project, TreeItem
+from ai_docsgen.schemas import Project, TreeItem, JobReport, SourceMode, Job, JobType, ProjectManifest, \
+    ModuleManifest, AiConnectionStats, JournalRecord
 
 log = get_logger(__name__)
 
+# Расширения файлов, для которых генерируется документация
+DOC_EXTENSIONS = ('.py', '.js', '.ts', '.go', '.rs', '.cs')
+
+# Файлы правил исключения самого репозитория
+IGNORE_RULE_FILES = ('.gitignore', '.gitattributes')
+
+ERROR_DOC_HEADER = "# Ошибка при генерации документации"
+
+
+class _ModuleBatch:
+    """Задача конвейера: директория или группа директорий, содержимое их файлов и готовая документация"""
+
+    def __init__(self, group: List[str]):
+        self.group = group
+        self.contents: Dict[str, List[Dict[str, str]]] = {}
+        self.docs: Dict[str, Tuple[str, List[str]]] = {}  # {директория: (документация, список отчёта)}
+
 
 class PipelineWorker:
     """Класс для генерации документации на основе репозитория"""
 
-    def __init__(self, ai_instance: AiAPI = None):
+    def __init__(self, ai_instance: AiAPI | AiRouter = None, blob_cache: BlobCache = None,
+                 manifest_store: ManifestStore = None, response_cache: ResponseCache = None):
         """
         Инициализация пайплайна
 
         Args:
-            ai_instance: Экземпляр AI API (если None, будет создан новый)
+            ai_instance: Экземпляр AI API или маршрутизатор (если None, будет создан по настройкам)
+            blob_cache: Кэш содержимого файлов (если None, будет создан в директории из настроек)
+            manifest_store: Хранилище манифестов проектов (если None, будет создано в директории из настроек)
+            response_cache: Кэш ответов AI (если None, будет создан в директории из настроек)
         """
-        self.ai_instance = ai_instance or AiAPI()
+        self.ai_instance = ai_instance or (AiRouter.from_settings() if settings.ai.endpoints else AiAPI())
+        self.blob_cache = blob_cache or BlobCache(
+            directory=settings.cache.directory / "blobs",
+            max_bytes=settings.cache.blob_max_bytes
+        )
+        self.manifest_store = manifest_store or ManifestStore(settings.cache.directory / "manifests")
+        self.response_cache = response_cache or ResponseCache(
+            directory=settings.cache.directory / "responses",
+            max_bytes=settings.cache.ai_max_bytes,
+            max_age=settings.cache.ai_max_age
+        )
         self.prompt_path = Path(__file__).parent / "prompts" / "struct.txt"
+        self.reduce_prompt_path = Path(__file__).parent / "prompts" / "reduce.txt"
+        self.pack_prompt_path = Path(__file__).parent / "prompts" / "pack.txt"
+        self.summary_prompt_path = Path(__file__).parent / "prompts" / "summary.txt"
+        self.overview_prompt_path = Path(__file__).parent / "prompts" / "overview.txt"
+        self.templates = PromptTemplates()
+        self.chunker = ModuleChunker(settings.generation.max_request_tokens, settings.generation.chars_per_token)
+        self.prompts = PromptBuilder(self.chunker)
+        self.packer = ModulePacker(
+            module_max_bytes=settings.generation.pack_module_max_bytes,
+            request_max_bytes=settings.generation.pack_request_max_bytes,
+            max_modules=settings.generation.pack_max_modules
+        )
+        self.breaker = CircuitBreaker(
+            window=settings.ai.breaker_window,
+            error_rate=settings.ai.breaker_error_rate,
+            min_requests=settings.ai.breaker_min_requests,
+            open_seconds=settings.ai.breaker_open_seconds
+        )
+        self.latencies = LatencyTracker()
+        self._ai_slots = threading.BoundedSemaphore(max(settings.ai.max_in_flight, 1))
+        self._dialog_pools: Dict[str, DialogPool] = {}
+        self._dialog_pools_lock = threading.Lock()
+        self._report_lock = threading.Lock()  # счётчики отчёта обновляются из потоков стадий и дублирующих запросов
         log.info("PipelineWorker инициализирован")
         log.debug(f"Путь к промпту: {self.prompt_path}")
 
     def _read_prompt(self) -> str:
-        """Чтение промпта из файла"""
-        log.debug(f"Чтение промпта из {self.prompt_path}")
+        """Чтение промпта (файл перечитывается только после изменения)"""
         try:
-            with open(self.prompt_path, 'r', encoding='utf-8') as f:
-                prompt = f.read()
-            log.debug(f"Промпт успешно прочитан, размер: {len(prompt)} символов")
-            return prompt
+            return self.templates.get(self.prompt_path)
         except Exception as e:
             log.error(f"Ошибка при чтении промпта: {e}")
             raise
 
+    def _create_source(self, project: Project) -> Scm | LocalMirror | TarballSource:
+        """
+        Создаёт источник файлов репозитория в соответствии с настройками проекта
+
+        Args:
+            project: Информация о проекте
+
+        Returns:
+            Scm | LocalMirror | TarballSource: Клиент GitHub API, локальное зеркало или архив коммита
+        """
+        if project.source_mode == SourceMode.MIRROR:
+            log.debug("Инициализация локального зеркала")
+            return LocalMirror(
+                workspace=settings.cache.directory / "mirrors",
+                auth_token=project.access_token,
+                depth=settings.github.mirror_depth,
+                blob_filter=settings.github.mirror_filter
+            )
+
+        log.debug("Инициализация SCM клиента")
+        scm_client = Scm(auth_token=project.access_token)
+
+        if project.source_mode == SourceMode.TARBALL:
+            log.debug("Инициализация источника из архива коммита")
+            return TarballSource(
+                scm=scm_client,
+                extensions=DOC_EXTENSIONS + IGNORE_RULE_FILES,
+                max_file_size=settings.generation.max_file_size
+            )
+
+        return scm_client
+
     def _get_directory_structure(self, scm_client: Scm, repo_name: str, branch: str,
-                               base_path: str = "", processed_dirs: Set[str] = None) -> List[TreeItem]:
+                               base_path: str = "", ignore: Optional[IgnoreMatcher] = None) -> List[TreeItem]:
         """
-        Рекурсивно получает структуру директорий репозитория
+        Получает полную структуру директорий репозитория одним запросом дерева
 
         Args:
             scm_client: SCM клиент
             repo_name: Имя репозитория
             branch: Ветка
-            base_path: Базовый путь для начала обхода
-            processed_dirs: Множество уже обработанных директорий (для избежания циклов)
+            base_path: Базовый путь, элементы вне которого отбрасываются
+            ignore: Правила исключения, применяемые во время обхода
 
         Returns:
             List[TreeItem]: Список всех элементов дерева
         """
-        if processed_dirs is None:
-            processed_dirs = set()
-
-        if base_path in processed_dirs:
-            return []
-
-        processed_dirs.add(base_path)
         log.info(f"Получение структуры для директории: {base_path if base_path else 'Корень'}")
 
         try:
-            # Получаем содержимое текущей директории
-            items = scm_client.get_repository_structure(
+            return scm_client.get_repository_tree(
                 repo_name=repo_name,
                 branch=branch,
-                path=base_path
+                path=base_path,
+                ignore=ignore
             )
 
-            result = items.copy()
-
-            # Рекурсивно обходим поддиректории
-            for item in items:
-                if item.type == "tree":  # это директория
-                    subdir_items = self._get_directory_structure(
-                        scm_client=scm_client,
-                        repo_name=repo_name,
-                        branch=branch,
-                        base_path=item.path,
-                        processed_dirs=processed_dirs
-                    )
-                    result.extend(subdir_items)
-
-            return result
-
         except Exception as e:
             log.error(f"Ошибка при получении структуры директории {base_path}: {e}")
             return []
 
-    def _get_module_files(self, tree_items: List[TreeItem]) -> Dict[str, List[str]]:
+    def _apply_repository_ignore_rules(self, tree_items: List[TreeItem], ignore: IgnoreMatcher,
+                                       scm_client: Scm, project: Project, report: JobReport) -> List[TreeItem]:
+        """
+        Дополняет правила исключения файлами .gitignore/.gitattributes репозитория и применяет их
+
+        Args:
+            tree_items: Список элементов дерева файлов
+            ignore: Правила исключения проекта (дополняются на месте)
+            scm_client: SCM клиент для загрузки файлов правил
+            project: Информация о проекте
+            report: Отчёт задачи
+
+        Returns:
+            List[TreeItem]: Элементы дерева без исключённых
+        """
+        # Правила более глубоких директорий добавляются позже, поэтому имеют приоритет
+        rule_files = sorted(
+            (item for item in tree_items if item.type == "blob" and os.path.basename(item.path) in IGNORE_RULE_FILES),
+            key=lambda item: item.path.count("/")
+        )
+        for item in rule_files:
+            try:
+                lines = self._load_file_content(item, scm_client, project, report).splitlines()
+            except Exception as e:
+                log.warning(f"Не удалось загрузить {item.path}: {e}")
+                continue
+            base = os.path.dirname(item.path)
+            if item.path.endswith(".gitattributes"):
+                ignore.add_gitattributes(lines, base)
+            else:
+                ignore.add(lines, base)
+            log.debug(f"Добавлены правила исключения из {item.path}")
+
+        tree_items = ignore.filter(tree_items)
+
+        if project.include_patterns:
+            # Файл включён, если с шаблоном совпал он сам или одна из его родительских директорий
+            include = IgnoreMatcher(project.include_patterns)
+            tree_items = [item for item in tree_items if item.type != "blob" or include.is_excluded(item.path)]
+
+        return tree_items
+
+    def _admit_files(self, tree_items: List[TreeItem], project: Project, report: JobReport) -> List[TreeItem]:
+        """
+        Отбирает файлы для документирования по размеру, пути и бюджету проекта до их загрузки
+
+        Args:
+            tree_items: Список элементов дерева файлов
+            project: Информация о проекте
+            report: Отчёт задачи, в который записываются пропущенные файлы
+
+        Returns:
+            List[TreeItem]: Элементы дерева без отклонённых файлов
+        """
+        admission = FileAdmission(
+            extensions=DOC_EXTENSIONS,
+            max_file_size=settings.generation.max_file_size,
+            byte_budget=project.byte_budget if project.byte_budget is not None else settings.generation.byte_budget
+        )
+        admitted, skipped = admission.admit(tree_items)
+        report.skipped_files.extend(skipped)
+        return admitted
+
+    def _get_module_files(self, tree_items: List[TreeItem]) -> Dict[str, List[TreeItem]]:
         """
         Группирует файлы по директориям (модулям)
 
@@ -101,7 +244,7 @@ class PipelineWorker:
             tree_items: Список элементов дерева файлов
 
         Returns:
-            Dict[str, List[str]]: Словарь {директория: [файлы]}
+            Dict[str, List[TreeItem]]: Словарь {директория: [файлы]}
         """
         log.info(f"Группировка {len(tree_items)} файлов по директориям")
         modules = {}
@@ -110,7 +253,7 @@ class PipelineWorker:
         modules[""] = []
 
         for item in tree_items:
-            if item.type == "blob" and item.path.endswith(('.py', '.js', '.ts', '.go', '.rs', '.cs')):
+            if item.type == "blob" and item.path.endswith(DOC_EXTENSIONS):
                 # Определяем директорию файла
                 directory = os.path.dirname(item.path)
 
@@ -118,7 +261,7 @@ class PipelineWorker:
                     modules[directory] = []
                     log.debug(f"Создана новая директория: {directory}")
 
-                modules[directory].append(item.path)
+                modules[directory].append(item)
                 log.debug(f"Файл {item.path} добавлен в директорию {directory}")
 
         # Удалим пустые директории
@@ -127,40 +270,113 @@ class PipelineWorker:
         log.info(f"Сгруппировано {sum(len(files) for files in modules.values())} файлов в {len(modules)} директорий")
         return modules
 
-    def _generate_docs_for_module(self, module_name: str, file_paths: List[str],
-                                  scm_client: Scm, project: Project) -> str:
+    def _load_file_content(self, item: TreeItem, scm_client: Scm, project: Project,
+                           report: JobReport) -> str:
+        """
+        Загружает содержимое файла, сначала проверяя кэш блобов по SHA
+
+        Args:
+            item: Элемент дерева файла
+            scm_client: SCM клиент для доступа к репозиторию
+            project: Информация о проекте
+            report: Отчёт задачи для учёта попаданий в кэш
+
+        Returns:
+            str: Содержимое файла
+        """
+        content = self.blob_cache.get(item.sha, stats=report.blob_cache)
+        if content is not None:
+            log.debug(f"Файл {item.path} взят из кэша блобов")
+            return content
+
+        file = scm_client.get_file_content(
+            repo_name=project.repository,
+            file_path=item.path,
+            owner=None,  # Используем текущего пользователя
+            branch=project.branches[0] if project.branches else "main"
+        )
+        self.blob_cache.put(file.sha, file.content)
+        return file.content
+
+    def _fetch_module_files(self, files: List[TreeItem], scm_client: Scm, project: Project,
+                            report: JobReport) -> List[Dict[str, str]]:
+        """
+        Загружает содержимое файлов модуля с ограниченным параллелизмом
+
+        Порядок результата совпадает с порядком files. Файлы, которые не удалось загрузить,
+        пропускаются и записываются в report.fetch_errors.
+
+        Args:
+            files: Файлы модуля
+            scm_client: SCM клиент для доступа к репозиторию
+            project: Информация о проекте
+            report: Отчёт задачи
+
+        Returns:
+            List[Dict[str, str]]: Список {"path": путь, "content": содержимое}
+        """
+        def fetch(item: TreeItem) -> Tuple[TreeItem, Optional[str], Optional[Exception]]:
+            try:
+                log.debug(f"Загрузка содержимого файла {item.path}")
+                return item, self._load_file_content(item, scm_client, project, report), None
+            except Exception as e:
+                return item, None, e
+
+        parallelism = max(1, min(settings.github.fetch_parallelism, len(files)))
+        if parallelism == 1:
+            results = [fetch(item) for item in files]
+        else:
+            with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="fetch") as executor:
+                results = list(executor.map(fetch, files))
+
+        files_content = []
+        for item, content, error in results:
+            if error is not None:
+                log.error(f"Ошибка при загрузке файла {item.path}: {error}")
+                report.fetch_errors[item.path] = str(error)
+                continue
+            files_content.append({
+                "path": item.path,
+                "content": content
+            })
+            log.debug(f"Файл {item.path} успешно загружен, размер: {len(content)} символов")
+
+        return files_content
+
+    def _generate_docs_for_module(self, module_name: str, files: List[TreeItem],
+                                  scm_client: Scm, project: Project, report: JobReport) -> str:
         """
         Генерирует документацию для модуля
 
         Args:
             module_name: Имя модуля (путь к директории)
-            file_paths: Пути к файлам модуля
+            files: Файлы модуля
             scm_client: SCM клиент для доступа к репозиторию
             project: Информация о проекте
+            report: Отчёт задачи
 
         Returns:
             str: Markdown документация
         """
-        log.info(f"Генерация документации для директории {module_name} ({len(file_paths)} файлов)")
-
         # Загружаем содержимое файлов
-        files_content = []
-        for file_path in file_paths:
-            try:
-                log.debug(f"Загрузка содержимого файла {file_path}")
-                content = scm_client.get_file_content(
-                    repo_name=project.repository,
-                    file_path=file_path,
-                    owner=None,  # Используем текущего пользователя
-                    branch=project.branches[0] if project.branches else "main"
-                )
-                files_content.append({
-                    "path": file_path,
-                    "content": content.content
-                })
-                log.debug(f"Файл {file_path} успешно загружен, размер: {len(content.content)} символов")
-            except Exception as e:
-                log.error(f"Ошибка при загрузке файла {file_path}: {e}")
+        files_content = self._fetch_module_files(files, scm_client, project, report)
+        return self._document_module(module_name, files_content, project, report)
+
+    def _document_module(self, module_name: str, files_content: List[Dict[str, str]],
+                         project: Project, report: JobReport) -> str:
+        """
+        Генерирует документацию для модуля по уже загруженному содержимому файлов
+
+        Args:
+            module_name: Имя модуля (путь к директории)
+            files_content: Содержимое файлов модуля (см. _fetch_module_files)
+            project: Информация о проекте
+            report: Отчёт задачи
+
+        Returns:
+            str: Markdown документация
+        """
+        log.info(f"Генерация документации для директории {module_name} ({len(files_content)} файлов)")
 
         # Создаем запрос для AI
         log.debug("Чтение промпта для генерации документации")
@@ -170,29 +386,251 @@ class PipelineWorker:
         display_module_name = module_name if module_name else "Корневая директория"
 
         # Формируем запрос с содержимым файлов
-        request = f"{prompt}\n\n## ФАЙЛЫ ДИРЕКТОРИИ {display_module_name}:\n\n"
-
-        for file in files_content:
-            request += f"### Файл: {file['path']}\n```\n{file['content']}\n```\n\n"
-
-        # Добавляем дополнительные инструкции из проекта, если есть
-        if project.instructions:
-            log.debug("Добавлены дополнительные инструкции из проекта")
-            request += f"\n## ДОПОЛНИТЕЛЬНЫЕ ИНСТРУКЦИИ:\n{project.instructions}\n"
+        payload = self.prompts.module_request(display_module_name, files_content, project.instructions)
+        prompt_size = self.prompts.build([prompt])
 
         # Отправляем запрос в AI
-        log.info(f"Отправка запроса в AI для директории {display_module_name}, размер запроса: {len(request)} символов")
-        dialog = self.ai_instance.new_dialog()
+        log.info(f"Отправка запроса в AI для директории {display_module_name}, "
+                 f"размер промпта: {prompt_size}, размер запроса: {payload}")
         try:
             log.debug("Ожидание ответа от AI...")
-            response = dialog.ask_ai(request)
+            if prompt_size.tokens + payload.tokens <= self.chunker.budget_tokens:
+                response = self._ask_ai(payload.text, project, report, prompt=prompt)
+            else:
+                response = self._map_reduce_module(prompt, display_module_name, files_content, project, report)
             log.info(f"Получен ответ от AI для директории {display_module_name}, размер: {len(response)} символов")
             return response
         except Exception as e:
             log.error(f"Ошибка при генерации документации для директории {display_module_name}: {e}")
-            return f"# Ошибка при генерации документации\n\nДиректория: {display_module_name}\nОшибка: {str(e)}"
+            return f"{ERROR_DOC_HEADER}\n\nДиректория: {display_module_name}\nОшибка: {str(e)}"
+
+    def _map_reduce_module(self, prompt: str, display_module_name: str, files_content: List[Dict[str, str]],
+                           project: Project, report: JobReport) -> str:
+        """
+        Документирует директорию, не помещающуюся в один запрос: части документируются
+        параллельно, затем объединяются запросом с промптом reduce.txt
+
+        Args:
+            prompt: Промпт генерации документации
+            display_module_name: Название директории для AI
+            files_content: Файлы директории
+            project: Информация о проекте
+            report: Отчёт задачи
+
+        Returns:
+            str: Markdown документация директории
+        """
+        overhead = self.chunker.estimate(prompt) + \
+            self.prompts.module_request(display_module_name, [], project.instructions).tokens + 16
+        chunks = self.chunker.split(files_content, overhead)
+        log.info(f"Директория {display_module_name} разбита на {len(chunks)} частей")
+
+        def document(numbered_chunk: Tuple[int, List[Dict[str, str]]]) -> str:
+            number, chunk = numbered_chunk
+            title = f"{display_module_name} (часть {number} из {len(chunks)})"
+            request = self.prompts.module_request(title, chunk, project.instructions)
+            return self._ask_ai(request.text, project, report, prompt=prompt)
+
+        with ThreadPoolExecutor(max_workers=max(settings.generation.chunk_parallelism, 1)) as executor:
+            partial_docs = list(executor.map(document, enumerate(chunks, 1)))
+
+        return self._reduce_docs(display_module_name, partial_docs, project, report)
+
+    def _reduce_docs(self, display_module_name: str, partial_docs: List[str],
+                     project: Project, report: JobReport) -> str:
+        """
+        Объединяет частичные документы директории (если они не помещаются в один запрос - по уровням)
+
+        Args:
+            display_module_name: Название директории для AI
+            partial_docs: Документация частей директории
+            project: Информация о проекте
+            report: Отчёт задачи
+
+        Returns:
+            str: Объединённая документация
+        """
+        reduce_prompt = self.templates.get(self.reduce_prompt_path)
+
+        def build(docs: List[Dict[str, str]]) -> str:
+            sections = "".join(f"### {doc['path']}\n{doc['content']}\n\n" for doc in docs)
+            return f"## ЧАСТИЧНАЯ ДОКУМЕНТАЦИЯ ДИРЕКТОРИИ {display_module_name}:\n\n{sections}"
+
+        prompt_tokens = self.chunker.estimate(reduce_prompt)
+        docs = [{"path": f"Часть {i}", "content": doc} for i, doc in enumerate(partial_docs, 1)]
+        while len(docs) > 1 and prompt_tokens + self.chunker.estimate(build(docs)) > self.chunker.budget_tokens:
+            groups = self.chunker.split(docs, prompt_tokens + self.chunker.estimate(build([])))
+            if len(groups) >= len(docs):
+                # Каждая часть сама по себе больше бюджета - объединяем как есть
+                break
+            log.info(f"Промежуточное объединение {len(docs)} частей директории {display_module_name} в {len(groups)}")
+            with ThreadPoolExecutor(max_workers=max(settings.generation.chunk_parallelism, 1)) as executor:
+                merged = list(executor.map(
+                    lambda group: self._ask_ai(build(group), project, report, prompt=reduce_prompt), groups
+                ))
+            docs = [{"path": f"Часть {i}", "content": doc} for i, doc in enumerate(merged, 1)]
+
+        if len(docs) == 1:
+            return docs[0]["content"]
+        return self._ask_ai(build(docs), project, report, prompt=reduce_prompt)
+
+    def _generate_packed_docs(self, group: List[str], contents: Dict[str, List[Dict[str, str]]],
+                              project: Project, report: JobReport) -> Dict[str, str]:
+        """
+        Генерирует документацию группы маленьких директорий одним общим запросом
 
-    def _build_directory_tree(self, modules: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        Args:
+            group: Директории группы (см. ModulePacker.pack)
+            contents: Словарь {директория: содержимое файлов} (см. _fetch_module_files)
+            project: Информация о проекте
+            report: Отчёт задачи
+
+        Returns:
+            Dict[str, str]: {директория: документация}; директории, для которых общий запрос
+            не удался или ответ не содержит раздела, отсутствуют и документируются отдельно
+        """
+        prompt = self._read_prompt()
+        pack_prompt = self.templates.get(self.pack_prompt_path)
+
+        titles = {module_path: module_path if module_path else "Корневая директория" for module_path in group}
+        request = self.prompts.packed_request(pack_prompt, titles, contents, SECTION_HEADER, project.instructions)
+
+        log.info(f"Отправка общего запроса в AI для {len(group)} директорий, размер запроса: {request}")
+        try:
+            # Ответ без разделов всех директорий не кэшируется, иначе повторные запуски получали бы его снова
+            response = self._ask_ai(
+                request.text, project, report, prompt=prompt,
+                accept=lambda answer: len(self.packer.split_response(answer, list(titles.values()))) == len(titles)
+            )
+            sections = self.packer.split_response(response, list(titles.values()))
+        except Exception as e:
+            log.error(f"Ошибка общего запроса для директорий {group}: {e}")
+            return {}
+
+        docs: Dict[str, str] = {}
+        for module_path, title in titles.items():
+            if title in sections:
+                docs[module_path] = sections[title]
+            else:
+                log.warning(f"В ответе общего запроса нет раздела директории {title}, она будет документирована отдельно")
+        return docs
+
+    @staticmethod
+    def _module_cost(files: List[TreeItem]) -> int:
+        """Оценка трудоёмкости директории - суммарный размер файлов"""
+        return sum(item.size or 0 for item in files)
+
+    def _dialog_pool(self, prompt: str) -> DialogPool:
+        """Пул диалогов, открытых промптом prompt"""
+        with self._dialog_pools_lock:
+            pool = self._dialog_pools.get(prompt)
+            if pool is None:
+                pool = self._dialog_pools[prompt] = DialogPool(
+                    ai_instance=self.ai_instance,
+                    instructions=prompt,
+                    max_turns=settings.ai.dialog_max_turns,
+                    max_context_chars=settings.ai.dialog_max_context_chars
+                )
+            return pool
+
+    def _close_dialog_pools(self):
+        with self._dialog_pools_lock:
+            pools = list(self._dialog_pools.values())
+        for pool in pools:
+            pool.close()
+
+    def ask(self, request: str, project: Optional[Project] = None, report: Optional[JobReport] = None) -> str:
+        """
+        Отправляет один запрос с промптом документации директории тем же путём, что и process:
+        через кэш ответов, пул диалогов, общий лимит одновременных запросов и выключатель
+
+        Args:
+            request: Текст запроса после промпта
+            project: Информация о проекте
+            report: Отчёт, в который записываются метрики запроса
+
+        Returns:
+            str: Ответ AI
+        """
+        return self._ask_ai(request, project, report, prompt=self._read_prompt())
+
+    def _ask_ai(self, request: str, project: Optional[Project] = None, report: Optional[JobReport] = None,
+                prompt: Optional[str] = None, accept: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Отправляет запрос в AI, если ответа на побайтно такой же запрос нет в кэше
+
+        Запросы с промптом отправляются в диалог из пула, уже получивший этот промпт,
+        остальные - в новый диалог, который закрывается после ответа. Все запросы проходят
+        через выключатель self.breaker; при AI__HEDGE_ENABLED запрос, не получивший ответа
+        за перцентиль длительности, дублируется в новый диалог.
+
+        Args:
+            request: Текст запроса (после промпта, если он задан)
+            project: Информация о проекте (bypass_ai_cache отключает чтение из кэша)
+            report: Отчёт задачи для учёта попаданий в кэш
+            prompt: Промпт-инструкция, общая для многих запросов
+            accept: Проверка формата ответа; не прошедший её ответ возвращается, но не кэшируется
+                (а уже закэшированный не используется)
+
+        Returns:
+            str: Ответ AI
+        """
+        full_request = f"{prompt}\n\n{request}" if prompt else request
+        key = self.response_cache.key(full_request, self.ai_instance.model_code)
+        if project is None or not project.bypass_ai_cache:
+            response = self.response_cache.get(key, stats=report.ai_cache if report else None)
+            if response is not None and (accept is None or accept(response)):
+                log.info(f"Ответ AI взят из кэша, размер: {len(response)} символов")
+                return response
+
+        def ask_new_dialog() -> str:
+            dialog = self.ai_instance.new_dialog()
+            try:
+                return dialog.ask_ai(full_request)
+            finally:
+                DialogPool.complete(dialog)
+
+        def send() -> str:
+            if prompt and settings.ai.dialog_max_turns > 1:
+                return self._dialog_pool(prompt).ask(request)
+            return ask_new_dialog()
+
+        def timed(func) -> str:
+            # Общий для всех директорий, частей и повторов лимит одновременных запросов
+            with self._ai_slots:
+                started = time.monotonic()
+                response = self.breaker.call(func)
+                self.latencies.add(time.monotonic() - started)
+            return response
+
+        hedge_delay = None
+        if settings.ai.hedge_enabled:
+            hedge_delay = self.latencies.percentile(settings.ai.hedge_percentile, settings.ai.hedge_min_samples)
+
+        try:
+            if hedge_delay is None:
+                response = timed(send)
+            else:
+                def backup() -> str:
+                    if report:
+                        with self._report_lock:
+                            report.ai_hedged_requests += 1
+                    return timed(ask_new_dialog)
+
+                response = hedged_call(lambda: timed(send), backup, hedge_delay)
+        except CircuitOpenError:
+            if report:
+                with self._report_lock:
+                    report.ai_rejected_requests += 1
+            raise
+
+        if accept is None or accept(response):
+            self.response_cache.put(key, response)
+        else:
+            log.warning("Ответ AI не прошёл проверку формата и не сохранён в кэш")
+        return response
+
+    def _build_directory_tree(self, modules: Dict[str, List[TreeItem]]) -> Dict[str, List[TreeItem]]:
         """
         Строит иерархическое дерево директорий
 
@@ -200,7 +638,7 @@ class PipelineWorker:
             modules: Словарь {директория: [файлы]}
 
         Returns:
-            Dict[str, List[str]]: Иерархическое дерево директорий
+            Dict[str, List[TreeItem]]: Иерархическое дерево директорий
         """
         # Сортируем директории для корректного порядка обхода
         sorted_dirs = sorted(modules.keys())
@@ -239,125 +677,61 @@ class PipelineWorker:
 
         return tree
 
-    def create_overview_documentation(self, doc_directory_path: Path):
+    def create_overview_documentation(self, doc_directory_path: Path, project: Optional[Project] = None,
+                                      report: Optional[JobReport] = None):
         """
         Создает обзорную документацию для всего проекта
-        
+
+        Документация директорий сворачивается снизу вверх (см. _summarize_tree), поэтому
+        запрос обзора укладывается в бюджет при любом размере проекта.
+
         Args:
             doc_directory_path: Путь к директории с документацией
+            project: Информация о проекте
+            report: Отчёт задачи
         """
         log.info(f"Создание обзорной документации для директории: {doc_directory_path}")
-        
-        # Путь к промпту для обзорной документации
-        overview_prompt_path = Path(__file__).parent / "prompts" / "overview.txt"
-        
+
         try:
             # Читаем промпт для обзорной документации
-            log.debug(f"Чтение промпта обзорной документации из {overview_prompt_path}")
-            with open(overview_prompt_path, 'r', encoding='utf-8') as f:
-                prompt = f.read()
-            log.debug(f"Промпт успешно прочитан, размер: {len(prompt)} символов")
-            
-            # Рекурсивно собираем все .md файлы
-            md_files = []
-            log.debug("Рекурсивный сбор .md файлов")
-            
-            def collect_md_files(directory: Path, base_path: Path) -> List[Dict[str, str]]:
-                """Рекурсивно собирает все .md файлы"""
-                files_data = []
-                
-                for item in directory.iterdir():
-                    if item.is_file() and item.suffix == '.md':
-                        # Получаем относительный путь от базовой директории документации
-                        relative_path = item.relative_to(base_path)
-                        
-                        log.debug(f"Чтение файла: {relative_path}")
-                        try:
-                            with open(item, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                            
-                            files_data.append({
-                                'path': str(relative_path),
-                                'content': content
-                            })
-                            log.debug(f"Файл {relative_path} успешно прочитан, размер: {len(content)} символов")
-                        except Exception as e:
-                            log.error(f"Ошибка при чтении файла {relative_path}: {e}")
-                    
-                    elif item.is_dir():
-                        # Рекурсивно обходим поддиректории
-                        log.debug(f"Обход поддиректории: {item.name}")
-                        subdirectory_files = collect_md_files(item, base_path)
-                        files_data.extend(subdirectory_files)
-                
-                return files_data
-            
-            md_files = collect_md_files(doc_directory_path, doc_directory_path)
-            log.info(f"Собрано {len(md_files)} файлов документации")
-            
+            prompt = self.templates.get(self.overview_prompt_path)
+
+            module_docs = self._collect_module_docs(doc_directory_path)
+            log.info(f"Собрано {len(module_docs)} файлов документации")
+
             # Создаем структуру проекта (дерево директорий)
             log.debug("Построение структуры проекта")
-            
-            def build_project_structure(directory: Path, base_path: Path, prefix: str = "") -> str:
-                """Строит текстовое представление структуры директорий"""
-                structure = ""
-                items = []
-                
-                # Собираем все элементы директории
-                for item in directory.iterdir():
-                    items.append(item)
-                
-                # Сортируем: сначала директории, потом файлы
-                items.sort(key=lambda x: (x.is_file(), x.name))
-                
-                for i, item in enumerate(items):
-                    is_last = i == len(items) - 1
-                    current_prefix = "└── " if is_last else "├── "
-                    next_prefix = "    " if is_last else "│   "
-                    
-                    relative_path = item.relative_to(base_path)
-                    structure += f"{prefix}{current_prefix}{item.name}\n"
-                    
-                    if item.is_dir():
-                        structure += build_project_structure(
-                            item, 
-                            base_path, 
-                            prefix + next_prefix
-                        )
-                
-                return structure
-            
-            project_structure = build_project_structure(doc_directory_path, doc_directory_path)
+            project_structure = self._build_project_structure(doc_directory_path)
             log.debug(f"Структура проекта построена, размер: {len(project_structure)} символов")
-            
+
+            header = "".join([
+                "## СТРУКТУРА ПРОЕКТА:\n",
+                f"```\n{project_structure}```\n\n",
+                "## СОДЕРЖИМОЕ ФАЙЛОВ ДОКУМЕНТАЦИИ:\n\n",
+            ])
+            sections = self._summarize_tree(module_docs, project, report)
+            overhead = self.chunker.estimate(prompt) + self.chunker.estimate(header)
+            if overhead + self.chunker.estimate(self._render_doc_sections(sections)) > self.chunker.budget_tokens:
+                sections = [{"path": "Сводка проекта", "content": self._summarize_sections("", sections, project, report)}]
+
             # Формируем полный запрос для AI
-            request = f"{prompt}\n\n"
-            request += "## СТРУКТУРА ПРОЕКТА:\n"
-            request += f"```\n{project_structure}```\n\n"
-            request += "## СОДЕРЖИМОЕ ФАЙЛОВ ДОКУМЕНТАЦИИ:\n\n"
-            
-            # Добавляем содержимое каждого файла
-            for file_data in md_files:
-                request += f"### Файл: {file_data['path']}\n"
-                request += f"```markdown\n{file_data['content']}\n```\n\n"
-            
-            log.info(f"Сформирован запрос для AI, размер: {len(request)} символов")
-            
+            request = self.prompts.build([prompt, "\n\n", header, self._render_doc_sections(sections)])
+            log.info(f"Сформирован запрос для AI, размер: {request}")
+
             # Отправляем запрос в AI
             log.debug("Отправка запроса в AI для создания обзорной документации")
-            dialog = self.ai_instance.new_dialog()
-            response = dialog.ask_ai(request)
+            response = self._ask_ai(request.text, project, report)
             log.info(f"Получен ответ от AI, размер: {len(response)} символов")
-            
+
             # Сохраняем результат в README.md
             readme_path = doc_directory_path / "README.md"
             log.info(f"Сохранение обзорной документации в {readme_path}")
-            
+
             with open(readme_path, "w", encoding="utf-8") as f:
                 f.write(response)
-            
+
             log.info("Обзорная документация успешно создана")
-            
+
         except Exception as e:
             log.error(f"Ошибка при создании обзорной документации: {e}")
             # Создаем базовый README в случае ошибки
@@ -366,25 +740,250 @@ class PipelineWorker:
                 f.write(f"# Документация проекта\n\nОшибка при генерации обзорной документации: {str(e)}\n")
             log.info("Создан базовый README с информацией об ошибке")
 
-    def process(self, project: Project) -> str:
+    @staticmethod
+    def _collect_module_docs(doc_directory_path: Path) -> Dict[str, str]:
+        """
+        Читает сгенерированную документацию директорий
+
+        Args:
+            doc_directory_path: Путь к директории с документацией
+
+        Returns:
+            Dict[str, str]: {директория репозитория: документация}
+        """
+        module_docs = {}
+        for path in sorted(doc_directory_path.rglob("*.md")):
+            relative_path = path.relative_to(doc_directory_path)
+            if relative_path == Path("README.md"):
+                continue
+            module_path = "" if relative_path == Path("description.md") else relative_path.parent.as_posix()
+            try:
+                module_docs[module_path] = path.read_text(encoding="utf-8")
+            except Exception as e:
+                log.error(f"Ошибка при чтении файла {relative_path}: {e}")
+        return module_docs
+
+    @staticmethod
+    def _build_project_structure(doc_directory_path: Path) -> str:
+        """Строит текстовое представление структуры директорий документации (без README.md прошлого запуска)"""
+        lines = []
+
+        def walk(directory: Path, prefix: str):
+            # Сортируем: сначала директории, потом файлы
+            items = sorted(
+                (item for item in directory.iterdir() if item != doc_directory_path / "README.md"),
+                key=lambda x: (x.is_file(), x.name)
+            )
+            for i, item in enumerate(items):
+                is_last = i == len(items) - 1
+                lines.append(f"{prefix}{'└── ' if is_last else '├── '}{item.name}\n")
+                if item.is_dir():
+                    walk(item, prefix + ("    " if is_last else "│   "))
+
+        walk(doc_directory_path, "")
+        return "".join(lines)
+
+    @staticmethod
+    def _doc_file_name(module_path: str) -> str:
+        """Путь файла документации директории относительно корня документации"""
+        if not module_path:
+            return "description.md"
+        return f"{module_path}/{module_path.rsplit('/', 1)[-1]}.md"
+
+    @staticmethod
+    def _render_doc_sections(sections: List[Dict[str, str]]) -> str:
+        return "".join(f"### Файл: {section['path']}\n```markdown\n{section['content']}\n```\n\n" for section in sections)
+
+    def _summarize_tree(self, module_docs: Dict[str, str], project: Optional[Project],
+                        report: Optional[JobReport]) -> List[Dict[str, str]]:
+        """
+        Сворачивает документацию директорий снизу вверх
+
+        Каждая директория передаёт родителю свою документацию и то, что передали её
+        поддиректории. Если это больше GENERATION__OVERVIEW_PASS_TOKENS, вместо текста
+        передаётся его сводка (промпт summary.txt). Директории одного уровня обрабатываются
+        параллельно. Запрос сводки однозначно определяется содержимым поддерева, поэтому
+        сводки неизменившихся поддеревьев берутся из кэша ответов AI.
+
+        Args:
+            module_docs: {директория: документация}
+            project: Информация о проекте
+            report: Отчёт задачи
+
+        Returns:
+            List[Dict[str, str]]: Разделы {'path': ..., 'content': ...} для запроса обзора
+        """
+        nodes = {""}
+        for module_path in module_docs:
+            parts = module_path.split("/") if module_path else []
+            nodes.update("/".join(parts[:depth]) for depth in range(1, len(parts) + 1))
+
+        children: Dict[str, List[str]] = {node: [] for node in nodes}
+        for node in nodes:
+            if node:
+                children[node.rpartition("/")[0]].append(node)
+
+        passed: Dict[str, List[Dict[str, str]]] = {}
+
+        def reduce_node(node: str) -> List[Dict[str, str]]:
+            sections = []
+            if node in module_docs:
+                sections.append({"path": self._doc_file_name(node), "content": module_docs[node]})
+            for child in sorted(children[node]):
+                sections.extend(passed[child])
+            if not node or self.chunker.estimate(self._render_doc_sections(sections)) <= \
+                    settings.generation.overview_pass_tokens:
+                return sections
+            summary = self._summarize_sections(node, sections, project, report)
+            return [{"path": f"Сводка директории {node}", "content": summary}]
+
+        def depth_of(node: str) -> int:
+            return node.count("/") + 1 if node else 0
+
+        for depth in range(max(map(depth_of, nodes)), -1, -1):
+            level = [node for node in nodes if depth_of(node) == depth]
+            with ThreadPoolExecutor(max_workers=max(settings.generation.module_parallelism, 1)) as executor:
+                for node, sections in zip(level, executor.map(reduce_node, level)):
+                    passed[node] = sections
+
+        return passed[""]
+
+    def _summarize_sections(self, title: str, sections: List[Dict[str, str]], project: Optional[Project],
+                            report: Optional[JobReport]) -> str:
+        """
+        Составляет сводку разделов документации (если они не помещаются в один запрос - по уровням)
+
+        Args:
+            title: Директория
+            sections: Разделы документации директории и её поддиректорий
+            project: Информация о проекте
+            report: Отчёт задачи
+
+        Returns:
+            str: Сводка
+        """
+        prompt = self.templates.get(self.summary_prompt_path)
+        display_title = title if title else "Корневая директория"
+
+        def build(parts: List[Dict[str, str]]) -> str:
+            return "".join([f"## ДОКУМЕНТАЦИЯ ДИРЕКТОРИИ {display_title}:\n\n", self._render_doc_sections(parts)])
+
+        prompt_tokens = self.chunker.estimate(prompt)
+        while len(sections) > 1 and prompt_tokens + self.chunker.estimate(build(sections)) > self.chunker.budget_tokens:
+            groups = self.chunker.split(sections, prompt_tokens + self.chunker.estimate(build([])))
+            if len(groups) >= len(sections):
+                break
+            log.info(f"Промежуточная сводка {len(sections)} разделов директории {display_title} в {len(groups)}")
+            with ThreadPoolExecutor(max_workers=max(settings.generation.chunk_parallelism, 1)) as executor:
+                summaries = list(executor.map(
+                    lambda group: self._ask_ai(build(group), project, report, prompt=prompt), groups
+                ))
+            sections = [{"path": f"Сводка части {i}", "content": summary} for i, summary in enumerate(summaries, 1)]
+
+        return self._ask_ai(build(sections), project, report, prompt=prompt)
+
+    def _load_base_manifest(self, project: Project, job: Optional[Job]) -> Optional[ProjectManifest]:
+        """
+        Загружает манифест предыдущей генерации, если задача допускает инкрементальное обновление
+
+        Args:
+            project: Информация о проекте
+            job: Задача
+
+        Returns:
+            Optional[ProjectManifest]: Манифест или None, если нужна полная генерация
+        """
+        if job is None or job.job_type != JobType.PARTIAL_UPDATE:
+            return None
+
+        manifest = self.manifest_store.load(project.id)
+        if manifest is None:
+            log.info("Манифест предыдущей генерации не найден, выполняется полная генерация")
+            return None
+        if manifest.instructions_hash != self._instructions_hash(project):
+            log.info("Инструкции проекта изменились, выполняется полная генерация")
+            return None
+
+        log.info(f"Инкрементальное обновление относительно коммита {manifest.commit_id}")
+        return manifest
+
+    @classmethod
+    def _module_fingerprint(cls, project: Project, module_files: List[TreeItem]) -> str:
+        """Отпечаток входных данных директории: инструкции проекта и SHA файлов"""
+        digest = hashlib.sha256(cls._instructions_hash(project).encode("utf-8"))
+        for item in sorted(module_files, key=lambda item: item.path):
+            digest.update(f"\n{item.path} {item.sha}".encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _instructions_hash(project: Project) -> str:
+        return hashlib.sha256((project.instructions or "").encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _evict_old_jobs(jobs_directory: Path, current_job: Job):
+        """
+        Удаляет директории документации и журналы задач, не изменявшиеся дольше CACHE__JOB_MAX_AGE
+
+        Args:
+            jobs_directory: Директория задач
+            current_job: Выполняемая задача (не удаляется)
+        """
+        if settings.cache.job_max_age is None or not jobs_directory.exists():
+            return
+
+        modified: Dict[str, float] = {}
+        for path in jobs_directory.iterdir():
+            job_id = path.name.removesuffix(".jsonl")
+            if path.name.endswith(".tmp") or job_id == str(current_job.id):
+                continue
+            try:
+                modified[job_id] = max(modified.get(job_id, 0.0), path.stat().st_mtime)
+            except OSError:
+                continue
+
+        deadline = time.time() - settings.cache.job_max_age
+        for job_id, modified_at in modified.items():
+            if modified_at >= deadline:
+                continue
+            shutil.rmtree(jobs_directory / job_id, ignore_errors=True)
+            (jobs_directory / f"{job_id}.jsonl").unlink(missing_ok=True)
+            log.info(f"Удалены данные завершённой задачи {job_id}")
+
+    def process(self, project: Project, report: Optional[JobReport] = None, job: Optional[Job] = None) -> str:
         """
         Основной метод обработки проекта и генерации документации
 
+        Для задач PARTIAL_UPDATE документация заново генерируется только для директорий,
+        у которых изменился набор файлов или их SHA; для остальных берётся из манифеста.
+
         Args:
             project: Информация о проекте
+            report: Отчёт задачи, в который записываются метрики (если None, будет создан новый)
+            job: Задача (если None, выполняется полная генерация)
 
         Returns:
             str: Путь к директории с сгенерированной документацией
         """
         log.info(f"Начало обработки проекта {project.name} (репозиторий: {project.repository})")
-
-        # Создаем SCM клиент
-        log.debug("Инициализация SCM клиента")
-        scm_client = Scm(auth_token=project.access_token)
-
-        # Создаем временную директорию для документации
-        temp_dir = Path(tempfile.mkdtemp(prefix="docgen_"))
-        log.info(f"Создана временная директория для документации: {temp_dir}")
+        report = report if report is not None else JobReport()
+        connections_before = self.ai_instance.connection_stats
+
+        # Создаем источник файлов (GitHub API или локальное зеркало)
+        scm_client = self._create_source(project)
+
+        # Создаем директорию для документации; у задачи она постоянная, чтобы прерванный запуск можно было продолжить
+        journal = None
+        if job is not None:
+            self._evict_old_jobs(settings.cache.directory / "jobs", job)
+            temp_dir = settings.cache.directory / "jobs" / str(job.id)
+            journal = JobJournal(settings.cache.directory / "jobs" / f"{job.id}.jsonl")
+            if not journal.records and temp_dir.exists():
+                shutil.rmtree(temp_dir)
+            temp_dir.mkdir(parents=True, exist_ok=True)
+            log.info(f"Директория документации задачи: {temp_dir}")
+        else:
+            temp_dir = Path(tempfile.mkdtemp(prefix="docgen_"))
+            log.info(f"Создана временная директория для документации: {temp_dir}")
 
         try:
             # Получаем структуру репозитория рекурсивно
@@ -392,15 +991,21 @@ class PipelineWorker:
             branch = project.branches[0] if project.branches else "main"
             base_path = project.directory or ""
 
+            ignore = IgnoreMatcher(project.exclude_patterns)
             tree_items = self._get_directory_structure(
                 scm_client=scm_client,
                 repo_name=project.repository,
                 branch=branch,
-                base_path=base_path
+                base_path=base_path,
+                ignore=ignore
             )
+            tree_items = self._apply_repository_ignore_rules(tree_items, ignore, scm_client, project, report)
             log.info(f"Получено {len(tree_items)} элементов структуры репозитория")
             log.debug(f"Структура репозитория:\n{tree_items}")
 
+            # Отбрасываем файлы, которые не стоит загружать
+            tree_items = self._admit_files(tree_items, project, report)
+
             # Группируем файлы по директориям
             log.debug("Группировка файлов по директориям")
             modules = self._get_module_files(tree_items)
@@ -409,20 +1014,78 @@ class PipelineWorker:
             directory_tree = self._build_directory_tree(modules)
             log.info(f"Построено дерево директорий с {len(directory_tree)} узлами")
 
+            base_manifest = self._load_base_manifest(project, job)
+            manifest = ProjectManifest(
+                commit_id=job.commit_id if job else None,
+                instructions_hash=self._instructions_hash(project)
+            )
 
-
-            # Генерируем документацию для каждой директории
-            for module_path, file_paths in modules.items():
+            def previous_doc(module_path: str, module_files: List[TreeItem]) -> Optional[ModuleManifest]:
+                previous = base_manifest.modules.get(module_path) if base_manifest else None
+                if previous is not None and previous.files == {item.path: item.sha for item in module_files}:
+                    return previous
+                return None
+
+            def resumed_doc(module_path: str, module_files: List[TreeItem]) -> Optional[str]:
+                record = journal.records.get(module_path) if journal else None
+                if record is not None and record.fingerprint == self._module_fingerprint(project, module_files):
+                    return record.doc
+                return None
+
+            def fetch_stage(group: List[str]) -> _ModuleBatch:
+                # Готовые директории не загружаются, для остальных загружается содержимое файлов
+                batch = _ModuleBatch(group)
+                for module_path in group:
+                    module_files = modules[module_path]
+                    resumed = resumed_doc(module_path, module_files)
+                    previous = previous_doc(module_path, module_files)
+                    if resumed is not None:
+                        log.info(f"Директория {module_path if module_path else 'Корень'} готова в журнале задачи")
+                        batch.docs[module_path] = (resumed, report.resumed_modules)
+                    elif previous is not None:
+                        log.info(f"Файлы директории {module_path if module_path else 'Корень'} не изменились, "
+                                 f"используется предыдущая документация")
+                        batch.docs[module_path] = (previous.doc, report.reused_modules)
+                    else:
+                        batch.contents[module_path] = self._fetch_module_files(module_files, scm_client, project, report)
+                return batch
+
+            def document_stage(batch: _ModuleBatch) -> _ModuleBatch:
+                pending = batch.contents
+                if len(pending) > 1:
+                    # Маленькие директории документируем общим запросом, не вошедшие в ответ - по одной
+                    for module_path, doc_content in self._generate_packed_docs(
+                            list(pending), pending, project, report).items():
+                        batch.docs[module_path] = (doc_content, report.regenerated_modules)
+                for module_path, files_content in pending.items():
+                    if module_path not in batch.docs:
+                        doc_content = self._document_module(module_path, files_content, project, report)
+                        batch.docs[module_path] = (doc_content, report.regenerated_modules)
+                batch.contents = {}
+                return batch
+
+            def write_stage(batch: _ModuleBatch):
+                # Единственный поток записи: манифест, журнал и отчёт не требуют блокировок
+                for module_path in batch.group:
+                    if module_path in batch.docs:
+                        doc_content, source = batch.docs[module_path]
+                        write_module(module_path, doc_content, source)
+
+            def write_module(module_path: str, doc_content: str, source: List[str]):
+                module_files = modules[module_path]
                 try:
-                    log.info(f"Обработка директории {module_path if module_path else 'Корень'}")
-
-                    # Генерируем документацию для директории
-                    doc_content = self._generate_docs_for_module(
-                        module_name=module_path,
-                        file_paths=file_paths,
-                        scm_client=scm_client,
-                        project=project
-                    )
+                    source.append(module_path)
+                    file_shas = {item.path: item.sha for item in module_files}
+
+                    fetch_failed = any(path in report.fetch_errors for path in file_shas)
+                    if not doc_content.startswith(ERROR_DOC_HEADER) and not fetch_failed:
+                        manifest.modules[module_path] = ModuleManifest(files=file_shas, doc=doc_content)
+                        if journal is not None and source is not report.resumed_modules:
+                            journal.append(JournalRecord(
+                                module=module_path,
+                                fingerprint=self._module_fingerprint(project, module_files),
+                                doc=doc_content
+                            ))
 
                     # Определяем путь для сохранения документации
                     # Если это корневая директория, сохраняем в корне temp_dir
@@ -442,11 +1105,61 @@ class PipelineWorker:
                 except Exception as e:
                     log.error(f"Ошибка при обработке директории {module_path}: {e}")
 
+            # Маленькие директории документируем общими запросами, остальные - по одной
+            groups = self.packer.pack(
+                {
+                    path: files for path, files in modules.items()
+                    if previous_doc(path, files) is None and resumed_doc(path, files) is None
+                }
+            )
+            packed = {module_path for group in groups for module_path in group}
+            tasks = groups + [[path] for path in modules if path not in packed]
+
+            # Загрузка, запросы к AI и запись идут конвейером, начиная с самых трудоёмких задач:
+            # пока AI отвечает по одной директории, файлы следующих уже загружаются
+            tasks.sort(key=lambda group: sum(self._module_cost(modules[path]) for path in group), reverse=True)
+            StagedPipeline(
+                stages=[
+                    ("fetch", fetch_stage, settings.generation.fetch_workers),
+                    ("ai", document_stage, settings.generation.module_parallelism),
+                    ("write", write_stage, 1),
+                ],
+                queue_size=settings.generation.pipeline_queue_size
+            ).run(tasks)
+
             # Создаем README.md в корне с общей информацией
             log.info(f"Создание основного README")
-            self.create_overview_documentation(temp_dir)
+            self.create_overview_documentation(temp_dir, project, report)
             log.debug(f"README успешно создан")
 
+            self.manifest_store.save(project.id, manifest)
+            if journal is not None:
+                journal.compact()
+            log.info(f"Директорий сгенерировано заново: {len(report.regenerated_modules)}, "
+                     f"взято из манифеста: {len(report.reused_modules)}, из журнала: {len(report.resumed_modules)}")
+
+            report.docs_path = str(temp_dir)
+            report.github_throttled_seconds = scm_client.throttled_seconds
+            log.info(f"Кэш блобов: попаданий {report.blob_cache.hits}, промахов {report.blob_cache.misses}, "
+                     f"сэкономлено {report.blob_cache.bytes_saved} байт")
+            log.info(f"Ожидание лимитов GitHub: {report.github_throttled_seconds:.1f} с")
+            connections_after = self.ai_instance.connection_stats
+            report.ai_connections = AiConnectionStats(**{
+                name: value - getattr(connections_before, name)
+                for name, value in connections_after.model_dump().items()
+            })
+            log.info(f"AI запросов: {report.ai_connections.requests}, новых соединений: "
+                     f"{report.ai_connections.new_connections}, переиспользовано: "
+                     f"{report.ai_connections.reused_connections}")
+            if isinstance(self.ai_instance, AiRouter):
+                report.ai_endpoints = self.ai_instance.endpoint_stats()
+                for endpoint in report.ai_endpoints:
+                    log.info(f"Точка доступа AI {endpoint.name}: запросов {endpoint.requests}, ошибок {endpoint.errors}, "
+                             f"средняя задержка {endpoint.mean_latency:.1f} с")
+            ai_cache_lookups = report.ai_cache.hits + report.ai_cache.misses
+            if ai_cache_lookups:
+                log.info(f"Кэш ответов AI: попаданий {report.ai_cache.hits} из {ai_cache_lookups} "
+                         f"({report.ai_cache.hits / ai_cache_lookups:.0%})")
             log.info(f"Обработка проекта {project.name} завершена успешно")
             return str(temp_dir)
 
@@ -454,6 +1167,11 @@ class PipelineWorker:
             log.error(f"Ошибка при обработке проекта {project.name}: {e}")
             return str(e)
 
+        finally:
+            self._close_dialog_pools()
+            if isinstance(scm_client, TarballSource):
+                scm_client.close()
+
 
 if __name__ == "__main__":
     worker = PipelineWorker()
@@ -0,0 +1,163 @@
+__all__ = ["FakeServerConfig", "FakeAiServer"]
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+from pydantic import BaseModel
+
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+
+class FakeServerConfig(BaseModel):
+    """
+    Параметры локальной замены AI сервиса
+
+    :var latency_median: Медиана времени подготовки ответа в секундах
+    :var latency_sigma: Разброс времени ответа (sigma логнормального распределения, 0 - постоянное)
+    :var error_rate: Доля HTTP запросов, завершающихся ошибкой 500
+    :var response_chars: Средний размер ответа в символах
+    :var seed: Начальное значение генератора случайных чисел
+    """
+    latency_median: float = 2.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    response_chars: int = 4000
+    seed: Optional[int] = None
+
+
+class FakeAiServer:
+    """
+    Локальный сервер с API PostNewRequest / GetNewResponse / CompleteSession
+
+    Ответ на сообщение становится доступен через случайное (логнормальное) время,
+    часть запросов завершается ошибкой. Используется для нагрузочного тестирования
+    AiAPI и PipelineWorker без обращения к настоящему сервису.
+    """
+
+    def __init__(self, config: FakeServerConfig = FakeServerConfig()):
+        self.config = config
+        self.requests = 0
+        self.errors = 0
+        self.dialogs: Dict[str, int] = {}  # диалог -> число принятых сообщений
+        self._random = random.Random(config.seed)
+        self._pending: Dict[str, Tuple[float, str]] = {}  # диалог -> (время готовности, ответ)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _latency(self) -> float:
+        if self.config.latency_sigma <= 0:
+            return self.config.latency_median
+        return self._random.lognormvariate(0, self.config.latency_sigma) * self.config.latency_median
+
+    def _answer(self, message: str) -> str:
+        size = max(int(self._random.gauss(self.config.response_chars, self.config.response_chars * 0.2)), 16)
+        header = f"# Ответ на запрос из {len(message)} символов\n\n"
+        return header + ("Описание модуля. " * (size // 17 + 1))[:max(size - len(header), 0)]
+
+    def _failed(self) -> bool:
+        self.requests += 1
+        if self._random.random() < self.config.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    async def _post_new_request(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        if self._failed():
+            return web.Response(status=500, text="Внутренняя ошибка")
+        message = data.get("Message", "")
+        self.dialogs[data["dialogIdentifier"]] = self.dialogs.get(data["dialogIdentifier"], 0) + 1
+        self._pending[data["dialogIdentifier"]] = (time.monotonic() + self._latency(), self._answer(message))
+        return web.json_response({"status": {"isSuccess": True}})
+
+    async def _get_new_response(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        if self._failed():
+            return web.Response(status=500, text="Внутренняя ошибка")
+        ready_at, answer = self._pending.get(data["dialogIdentifier"], (0.0, None))
+        message = answer if answer is not None and time.monotonic() >= ready_at else None
+        return web.json_response({"status": {"isSuccess": True}, "data": {"lastMessage": message}})
+
+    async def _complete_session(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        self.requests += 1
+        self._pending.pop(data["dialogIdentifier"], None)
+        return web.json_response({"isSuccess": True})
+
+    def _application(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.add_routes([
+            web.post("/PostNewRequest", self._post_new_request),
+            web.post("/GetNewResponse", self._get_new_response),
+            web.post("/CompleteSession", self._complete_session),
+        ])
+        return app
+
+    async def _start(self, host: str, port: int) -> str:
+        self._runner = web.AppRunner(self._application(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        return f"http://{host}:{bound_port}"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Запускает сервер в фоновом потоке
+
+        Args:
+            host: Адрес
+            port: Порт (0 - любой свободный)
+
+        Returns:
+            str: Базовый URL для AiAPI
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake-ai-server", daemon=True)
+        self._thread.start()
+        url = asyncio.run_coroutine_threadsafe(self._start(host, port), self._loop).result()
+        log.info(f"Тестовый AI сервер запущен: {url}")
+        return url
+
+    def stop(self):
+        """Останавливает сервер, запущенный start"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальная замена AI сервиса для нагрузочного тестирования")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-median", type=float, default=2.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--response-chars", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeAiServer(FakeServerConfig(
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        response_chars=args.response_chars,
+        seed=args.seed
+    ))
+    server.start(args.host, args.port)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,202 @@
+__all__ = ["LoadTestResult", "load_messages", "synthetic_messages", "run_load"]
+
+import argparse
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ai_docsgen.ai.api import AiAPI
+from ai_docsgen.bench.fake_server import FakeAiServer, FakeServerConfig
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+
+class LoadTestResult(BaseModel):
+    """Результат прогона одной конфигурации"""
+    name: str
+    concurrency: int
+    requests: int
+    errors: int
+    duration: float  # seconds
+    throughput: float  # успешных запросов в секунду
+    p50: Optional[float] = None  # seconds
+    p90: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+
+
+def load_messages(path: Path) -> List[str]:
+    """
+    Читает записанный трафик в формате JSONL
+
+    Сообщением строки считается поле prompt, message или body (с заголовком title, если он есть).
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        List[str]: Сообщения в порядке записи
+    """
+    messages = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            message = record.get("prompt") or record.get("message") or record.get("body") or ""
+            if record.get("title"):
+                message = f"{record['title']}\n\n{message}"
+            messages.append(message)
+    return messages
+
+
+def synthetic_messages(count: int, chars: int) -> List[str]:
+    """Сообщения заданного размера, различающиеся номером"""
+    filler = "def function(): return value\n" * (chars // 29 + 1)
+    return [f"### Файл: module_{i}.py\n{filler[:chars]}" for i in range(count)]
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def run_load(name: str, ask: Callable[[str], str], messages: List[str], concurrency: int) -> LoadTestResult:
+    """
+    Отправляет сообщения с заданным числом одновременных запросов
+
+    Args:
+        name: Название конфигурации
+        ask: Функция отправки одного сообщения
+        messages: Сообщения
+        concurrency: Число одновременных запросов
+
+    Returns:
+        LoadTestResult: Пропускная способность и перцентили длительности успешных запросов
+    """
+    def timed(message: str) -> Optional[float]:
+        started = time.monotonic()
+        try:
+            ask(message)
+        except Exception as e:
+            log.debug(f"Запрос завершился ошибкой: {e}")
+            return None
+        return time.monotonic() - started
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        durations = list(executor.map(timed, messages))
+    duration = time.monotonic() - started
+
+    latencies = [d for d in durations if d is not None]
+    return LoadTestResult(
+        name=name,
+        concurrency=concurrency,
+        requests=len(messages),
+        errors=len(messages) - len(latencies),
+        duration=duration,
+        throughput=len(latencies) / duration if duration else 0.0,
+        p50=_percentile(latencies, 0.50),
+        p90=_percentile(latencies, 0.90),
+        p95=_percentile(latencies, 0.95),
+        p99=_percentile(latencies, 0.99)
+    )
+
+
+def _api_driver(base_url: str) -> Tuple[Callable[[str], str], AiAPI]:
+    """Каждое сообщение - новый диалог AiAPI, закрываемый после ответа"""
+    api = AiAPI(base_url=base_url, key="load-test", domain="load-test")
+
+    def ask(message: str) -> str:
+        dialog = api.new_dialog()
+        try:
+            return dialog.ask_ai(message)
+        finally:
+            dialog.clear_context()
+
+    return ask, api
+
+
+def _worker_driver(base_url: str, workspace: Path) -> Tuple[Callable[[str], str], AiAPI]:
+    """Сообщения проходят путь запросов PipelineWorker: кэш ответов, пул диалогов, выключатель"""
+    from ai_docsgen.ai.manifest import ManifestStore
+    from ai_docsgen.ai.response_cache import ResponseCache
+    from ai_docsgen.ai.worker import PipelineWorker
+    from ai_docsgen.git.blob_cache import BlobCache
+
+    api = AiAPI(base_url=base_url, key="load-test", domain="load-test")
+    worker = PipelineWorker(
+        ai_instance=api,
+        blob_cache=BlobCache(workspace / "blobs", 1),
+        manifest_store=ManifestStore(workspace / "manifests"),
+        response_cache=ResponseCache(workspace / "responses", 64 * 1024 * 1024)
+    )
+    return worker.ask, api
+
+
+def _print_results(results: List[LoadTestResult]):
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:.2f}" if value is not None else "-"
+
+    print(f"{'конфигурация':<24}{'пот.':>6}{'запр.':>7}{'ошиб.':>7}{'зап/с':>9}{'p50':>8}{'p90':>8}{'p95':>8}{'p99':>8}")
+    for result in results:
+        print(f"{result.name:<24}{result.concurrency:>6}{result.requests:>7}{result.errors:>7}"
+              f"{result.throughput:>9.2f}{seconds(result.p50):>8}{seconds(result.p90):>8}"
+              f"{seconds(result.p95):>8}{seconds(result.p99):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочное тестирование AiAPI и PipelineWorker")
+    parser.add_argument("--url", help="URL AI сервиса (если не задан, запускается локальный FakeAiServer)")
+    parser.add_argument("--target", choices=("api", "worker"), nargs="+", default=["api"],
+                        help="api - AiAPI напрямую, worker - путь запросов PipelineWorker")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--replay", type=Path, help="JSONL файл с записанными запросами")
+    parser.add_argument("--requests", type=int, default=100, help="Число синтетических запросов")
+    parser.add_argument("--message-chars", type=int, default=8000, help="Размер синтетического запроса")
+    parser.add_argument("--latency-median", type=float, default=1.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--response-chars", type=int, default=4000)
+    parser.add_argument("--json", action="store_true", help="Вывести результаты в JSON")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = FakeAiServer(FakeServerConfig(
+            latency_median=args.latency_median,
+            latency_sigma=args.latency_sigma,
+            error_rate=args.error_rate,
+            response_chars=args.response_chars,
+            seed=0
+        ))
+        base_url = server.start()
+
+    messages = load_messages(args.replay) if args.replay else synthetic_messages(args.requests, args.message_chars)
+    results = []
+    try:
+        for target in args.target:
+            for concurrency in args.concurrency:
+                with tempfile.TemporaryDirectory(prefix="docgen_bench_") as workspace:
+                    ask, api = _api_driver(base_url) if target == "api" else _worker_driver(base_url, Path(workspace))
+                    try:
+                        results.append(run_load(target, ask, messages, concurrency))
+                    finally:
+                        api.close()
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.json:
+        print(json.dumps([result.model_dump() for result in results], ensure_ascii=False, indent=2))
+    else:
+        _print_results(results)
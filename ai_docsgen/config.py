@@ -1,7 +1,9 @@
 __all__ = ["settings"]
 
 from pathlib import Path
+from typing import Optional, List
 
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict, PydanticBaseSettingsSource, \
     PyprojectTomlConfigSettingsSource
 
@@ -53,12 +55,53 @@ class Remote(BaseSettings):
     )
 
 
+class AIEndpoint(BaseModel):
+    """
+    Точка доступа AI для маршрутизатора
+
+    :var base_url: URL API
+    :var key: Ключ API
+    :var domain: Домен пользователя (если не задан - AI__DOMAIN)
+    :var weight: Относительная доля запросов
+    :var max_in_flight: Максимальное число одновременных запросов
+    """
+    base_url: str
+    key: str
+    domain: Optional[str] = None
+    weight: float = 1.0
+    max_in_flight: int = 8
+
+
 class AI(BaseSettings):
     key: str
     domain: str
     base_url: str = "https://gpt.orionsoft.ru/api/External"
     timeout: float = 3
     operating_system_code: int = 12
+    model_code: int = 1
+    poll_initial: float = 0.5  # seconds
+    poll_factor: float = 1.5
+    poll_max_interval: float = 10  # seconds
+    poll_jitter: float = 0.2
+    deadline: float = 600  # seconds, общее время ожидания ответа
+    pool_size: int = 100  # одновременных соединений в пуле
+    max_in_flight: int = 16  # одновременных запросов к AI на один PipelineWorker
+    keepalive_timeout: float = 30  # seconds
+    connect_timeout: float = 10  # seconds
+    read_timeout: float = 60  # seconds
+    dialog_max_turns: int = 8  # запросов в одном диалоге пула (1 - новый диалог на каждый запрос)
+    dialog_max_context_chars: int = 300_000  # символов контекста, после которых диалог закрывается
+    compress_threshold: Optional[int] = None  # bytes, тело запроса больше порога сжимается gzip (None - не сжимать)
+    endpoints: List[AIEndpoint] = []  # JSON; если задан, запросы распределяются между точками доступа
+    quarantine_errors: int = 3  # ошибок подряд, после которых точка доступа выводится из ротации
+    quarantine_seconds: float = 60  # seconds
+    breaker_window: int = 20  # последних запросов, по которым считается доля ошибок
+    breaker_error_rate: float = 0.5  # доля ошибок, при которой запросы перестают отправляться
+    breaker_min_requests: int = 5
+    breaker_open_seconds: float = 60  # seconds до пробного запроса
+    hedge_enabled: bool = False  # дублировать запросы, которые дольше hedge_percentile
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
 
     model_config = SettingsConfigDict(
         env_file=CURRENT_DIR.parent / ".env",
@@ -70,12 +113,77 @@ class AI(BaseSettings):
     )
 
 
+class GitHub(BaseSettings):
+    fetch_parallelism: int = 8  # одновременных загрузок файлов
+    max_concurrency: int = 8  # одновременных запросов к API на один токен
+    rate_limit_reserve: int = 50  # запросов, оставляемых в запасе до сброса лимита
+    rate_limit_retries: int = 5
+    request_timeout: float = 60  # seconds
+    mirror_depth: int = 1
+    # Фильтр частичного клона для локальных зеркал; размер отфильтрованных блобов неизвестен,
+    # поэтому такие файлы не документируются (blob:none исключит все файлы)
+    mirror_filter: Optional[str] = "blob:limit=1m"
+
+    model_config = SettingsConfigDict(
+        env_file=CURRENT_DIR.parent / ".env",
+        env_file_encoding="utf-8",
+        env_prefix="GITHUB__",
+        env_nested_delimiter="__",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+
+class Generation(BaseSettings):
+    max_file_size: int = 256 * 1024  # bytes, файлы больше не отправляются в AI
+    byte_budget: Optional[int] = None  # bytes на проект, если не задан в проекте
+    max_request_tokens: int = 32000  # tokens, директории больше разбиваются на части
+    chars_per_token: float = 3.5
+    chunk_parallelism: int = 4  # частей директории, документируемых одновременно
+    module_parallelism: int = 8  # директорий, документируемых одновременно
+    fetch_workers: int = 2  # потоков загрузки файлов директорий для конвейера
+    pipeline_queue_size: int = 4  # задач в каждой очереди конвейера (ограничивает память)
+    overview_pass_tokens: int = 4000  # tokens, поддерево больше передаётся в обзор в виде сводки
+    pack_module_max_bytes: int = 4 * 1024  # bytes, директории меньше упаковываются в общие запросы
+    pack_request_max_bytes: int = 32 * 1024  # bytes файлов в одном общем запросе
+    pack_max_modules: int = 10  # директорий в одном общем запросе (меньше 2 - без упаковки)
+
+    model_config = SettingsConfigDict(
+        env_file=CURRENT_DIR.parent / ".env",
+        env_file_encoding="utf-8",
+        env_prefix="GENERATION__",
+        env_nested_delimiter="__",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+
+class Cache(BaseSettings):
+    directory: Path = CURRENT_DIR.parent / ".cache"
+    blob_max_bytes: int = 512 * 1024 * 1024  # bytes
+    ai_max_bytes: int = 256 * 1024 * 1024  # bytes
+    ai_max_age: Optional[float] = 30 * 24 * 3600  # seconds
+    job_max_age: Optional[float] = 7 * 24 * 3600  # seconds, документация и журналы старых задач удаляются
+
+    model_config = SettingsConfigDict(
+        env_file=CURRENT_DIR.parent / ".env",
+        env_file_encoding="utf-8",
+        env_prefix="CACHE__",
+        env_nested_delimiter="__",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+
 class Settings(BaseSettings):
     project: AppData = AppData()  # type: ignore[call-arg]
     dev: bool = False
     project_root: Path = CURRENT_DIR
     remote: Remote = Remote()
     ai: AI = AI()
+    github: GitHub = GitHub()
+    generation: Generation = Generation()
+    cache: Cache = Cache()
     gh_token: str
 
     model_config = SettingsConfigDict(
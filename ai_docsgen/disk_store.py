@@ -0,0 +1,176 @@
+__all__ = ["DiskStore"]
+
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+
+class DiskStore:
+    """
+    Ограниченное по размеру хранилище текстовых записей на диске
+
+    Запись хранится в файле directory/<ключ[:2]>/<ключ[2:]> и пишется атомарно
+    (временный файл и os.replace). Записи вытесняются по суммарному размеру (LRU)
+    и, если задан max_age, по возрасту. Индекс восстанавливается по файлам при
+    создании, в порядке времени их модификации.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, max_age: Optional[float] = None,
+                 touch_on_read: bool = False):
+        """
+        Инициализация хранилища
+
+        Args:
+            directory: Директория хранилища
+            max_bytes: Максимальный суммарный размер записей в байтах
+            max_age: Максимальный возраст записи в секундах (None - без ограничения)
+            touch_on_read: Обновлять время модификации файла при чтении, чтобы порядок LRU
+                сохранялся между запусками (при max_age не используется - возраст считается от записи)
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.touch_on_read = touch_on_read and max_age is None
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, Tuple[int, float]] = OrderedDict()  # ключ -> (размер, время записи)
+        self._total_bytes = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _load_index(self):
+        found = []
+        for path in self.directory.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, path.parent.name + path.name, stat.st_size))
+
+        with self._lock:
+            for modified_at, key, size in sorted(found):
+                self._entries[key] = (size, modified_at)
+                self._total_bytes += size
+            self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key[2:]
+
+    def _expired(self, written_at: float) -> bool:
+        return self.max_age is not None and time.time() - written_at > self.max_age
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        """
+        Чтение записи
+
+        Повреждённая или удалённая с диска запись забывается.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Optional[Tuple[str, int]]: Текст и размер записи в байтах или None, если записи нет или она устарела
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                self._remove(key)
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size:
+                    # Декодируем прямо из отображения, без промежуточной копии в bytes
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                        text = str(view, "utf-8")
+                else:
+                    text = ""
+            if self.touch_on_read:
+                os.utime(path)
+        except (OSError, UnicodeDecodeError) as e:
+            log.warning(f"Не удалось прочитать запись {key} из {self.directory}: {e}")
+            with self._lock:
+                self._remove(key)
+            return None
+
+        return text, entry[0]
+
+    def put(self, key: str, text: str, replace: bool = True):
+        """
+        Сохранение записи
+
+        Args:
+            key: Ключ записи
+            text: Содержимое
+            replace: Перезаписывать существующую запись (иначе она только помечается использованной)
+        """
+        data = text.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        if not replace:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return
+
+        path = self._path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except OSError as e:
+            log.warning(f"Не удалось сохранить запись {key} в {self.directory}: {e}")
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            self._entries[key] = (len(data), time.time())
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _remove(self, key: str):
+        """Удаляет запись (вызывается под блокировкой; отсутствие записи или файла допустимо)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[0]
+        try:
+            self._path(key).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Удаляет устаревшие записи и самые давно использованные, пока размер не уложится в лимит"""
+        if self.max_age is not None:
+            for key in [key for key, (_, written_at) in self._entries.items() if self._expired(written_at)]:
+                self._remove(key)
+        while self._total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            log.debug(f"Запись {key} вытеснена из {self.directory}")
@@ -0,0 +1,66 @@
+__all__ = ["BlobCache"]
+
+import threading
+from pathlib import Path
+from typing import Optional
+
+from ai_docsgen.disk_store import DiskStore
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import BlobCacheStats
+
+log = get_logger(__name__)
+
+
+class BlobCache:
+    """
+    Постоянное хранилище содержимого файлов, адресуемое git SHA
+
+    Содержимое блоба с данным SHA неизменно, поэтому запись никогда не устаревает
+    и вытесняется только по размеру хранилища (LRU по времени последнего доступа).
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Инициализация кэша
+
+        Args:
+            directory: Директория хранилища
+            max_bytes: Максимальный суммарный размер блобов в байтах
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._store = DiskStore(self.directory, max_bytes, touch_on_read=True)
+        self._stats_lock = threading.Lock()
+        log.info(f"Кэш блобов: {self.directory}, записей: {len(self._store)}, размер: {self._store.total_bytes} байт")
+
+    def get(self, sha: str, stats: Optional[BlobCacheStats] = None) -> Optional[str]:
+        """
+        Чтение содержимого блоба
+
+        Args:
+            sha: Git SHA блоба
+            stats: Счётчики задачи, которые нужно обновить
+
+        Returns:
+            Optional[str]: Содержимое файла или None, если блоба нет в кэше
+        """
+        entry = self._store.get(sha)
+        if stats is not None:
+            # Под блокировкой, т.к. файлы читаются из нескольких потоков
+            with self._stats_lock:
+                if entry is not None:
+                    stats.hits += 1
+                    stats.bytes_saved += entry[1]
+                else:
+                    stats.misses += 1
+        return entry[0] if entry is not None else None
+
+    def put(self, sha: str, content: str):
+        """
+        Сохранение содержимого блоба
+
+        Args:
+            sha: Git SHA блоба
+            content: Содержимое файла
+        """
+        self._store.put(sha, content, replace=False)
@@ -0,0 +1,212 @@
+__all__ = ["IgnoreMatcher"]
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import TreeItem
+
+log = get_logger(__name__)
+
+# Атрибуты .gitattributes, которые помечают файлы как сторонние или сгенерированные
+EXCLUDING_ATTRIBUTES = ("linguist-vendored", "linguist-generated", "linguist-documentation", "export-ignore")
+
+
+def _translate(pattern: str) -> str:
+    """Переводит glob-шаблон в стиле .gitignore (без '!' и завершающего '/') в регулярное выражение"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        at_segment_start = i == 0 or pattern[i - 1] == "/"
+        if pattern.startswith("**/", i) and at_segment_start:
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern[i:] == "**" and at_segment_start:
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreMatcher:
+    """
+    Набор правил исключения в формате .gitignore, скомпилированный в одно регулярное выражение
+
+    Шаблоны объединяются в одну альтернативу в обратном порядке, поэтому первая
+    совпавшая ветка - это последнее подходящее правило, как того требует .gitignore.
+    Одна проверка пути - один вызов fullmatch независимо от числа правил.
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), base: str = ""):
+        """
+        Инициализация набора правил
+
+        Args:
+            patterns: Строки в формате .gitignore
+            base: Директория, относительно которой заданы правила (как для вложенного .gitignore)
+        """
+        self._rules: List[Tuple[str, bool, bool]] = []  # (регулярное выражение, отрицание, только директории)
+        self._file_regex: Optional[re.Pattern] = None
+        self._dir_regex: Optional[re.Pattern] = None
+        self._negated: Dict[str, bool] = {}
+        self._dir_cache: Dict[str, bool] = {}
+        self.add(patterns, base)
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def add(self, patterns: Iterable[str], base: str = ""):
+        """
+        Добавляет правила (более поздние правила имеют приоритет)
+
+        Args:
+            patterns: Строки в формате .gitignore
+            base: Директория, относительно которой заданы правила
+        """
+        base = base.strip("/")
+        for line in patterns:
+            line = line.rstrip("\r\n")
+            if not line.endswith("\\ "):
+                line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith(("\\#", "\\!")):
+                line = line[1:]
+
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+
+            # Шаблон без '/' (кроме завершающего) совпадает на любой глубине
+            anchored = "/" in line
+            regex = _translate(line.lstrip("/"))
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            if base:
+                regex = re.escape(base) + "/" + regex
+
+            self._rules.append((regex, negate, dir_only))
+
+        self._compile()
+
+    def add_gitattributes(self, lines: Iterable[str], base: str = ""):
+        """
+        Добавляет правила из .gitattributes: исключаются файлы с атрибутами linguist-vendored,
+        linguist-generated, linguist-documentation и export-ignore
+
+        Args:
+            lines: Строки .gitattributes
+            base: Директория, в которой лежит .gitattributes
+        """
+        patterns = []
+        for line in lines:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            pattern, attributes = fields[0], fields[1:]
+            for attribute in attributes:
+                name, _, value = attribute.lstrip("-!").partition("=")
+                if name not in EXCLUDING_ATTRIBUTES:
+                    continue
+                unset = attribute.startswith(("-", "!")) or value == "false"
+                patterns.append(f"!{pattern}" if unset else pattern)
+        self.add(patterns, base)
+
+    def _compile(self):
+        self._dir_cache.clear()
+        self._negated = {f"r{i}": negate for i, (_, negate, _) in enumerate(self._rules)}
+
+        def combine(include_dir_only: bool) -> Optional[re.Pattern]:
+            alternatives = [
+                f"(?P<r{i}>{regex})"
+                for i, (regex, _, dir_only) in reversed(list(enumerate(self._rules)))
+                if include_dir_only or not dir_only
+            ]
+            return re.compile("|".join(alternatives)) if alternatives else None
+
+        self._dir_regex = combine(include_dir_only=True)
+        self._file_regex = combine(include_dir_only=False)
+
+    def matches(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Проверяет путь по правилам без учёта родительских директорий
+
+        Args:
+            path: Путь от корня репозитория
+            is_dir: Является ли путь директорией
+
+        Returns:
+            bool: Совпал ли путь с правилом исключения (и не был возвращён правилом '!')
+        """
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return False
+        match = regex.fullmatch(path)
+        return match is not None and not self._negated[match.lastgroup]
+
+    def is_excluded(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Проверяет путь с учётом родительских директорий (файл в исключённой директории исключён)
+
+        Args:
+            path: Путь от корня репозитория
+            is_dir: Является ли путь директорией
+
+        Returns:
+            bool: Исключён ли путь
+        """
+        if not self._rules:
+            return False
+
+        parts = path.split("/")
+        for depth in range(1, len(parts)):
+            parent = "/".join(parts[:depth])
+            excluded = self._dir_cache.get(parent)
+            if excluded is None:
+                excluded = self._dir_cache[parent] = self.matches(parent, is_dir=True)
+            if excluded:
+                return True
+        return self.matches(path, is_dir)
+
+    def filter(self, tree_items: List[TreeItem]) -> List[TreeItem]:
+        """
+        Отбрасывает исключённые элементы дерева вместе с содержимым исключённых директорий
+
+        Args:
+            tree_items: Элементы дерева
+
+        Returns:
+            List[TreeItem]: Оставшиеся элементы
+        """
+        if not self._rules:
+            return tree_items
+        result = [item for item in tree_items if not self.is_excluded(item.path, item.type == "tree")]
+        log.debug(f"Правила исключения отбросили {len(tree_items) - len(result)} элементов дерева")
+        return result
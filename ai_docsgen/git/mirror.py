@@ -0,0 +1,271 @@
+__all__ = ["LocalMirror"]
+
+import base64
+import hashlib
+import os
+import re
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+from ai_docsgen.git.ignore import IgnoreMatcher
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import TreeItem, FileContent
+
+log = get_logger(__name__)
+
+
+class LocalMirror:
+    """
+    Источник файлов репозитория на основе постоянного локального зеркала
+
+    Для каждого репозитория в рабочей директории хранится bare-репозиторий, который
+    обновляется инкрементальным `git fetch --depth --filter`. Дерево и содержимое файлов
+    читаются с диска. Интерфейс чтения совпадает с Scm, поэтому PipelineWorker может
+    использовать любой из источников.
+    """
+
+    _locks: Dict[Path, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(self, workspace: Path, auth_token: Optional[str] = None,
+                 depth: int = 1, blob_filter: Optional[str] = "blob:limit=1m"):
+        """
+        Инициализация источника
+
+        Args:
+            workspace: Директория для хранения зеркал
+            auth_token: GitHub токен для приватных репозиториев
+            depth: Глубина истории при fetch
+            blob_filter: Фильтр частичного клона (например "blob:none" или "blob:limit=1m"), None - без фильтра
+        """
+        self.workspace = Path(workspace)
+        self.workspace.mkdir(parents=True, exist_ok=True)
+        self.depth = depth
+        self.blob_filter = blob_filter
+        self._auth_token = auth_token
+        self._commits: Dict[Tuple[str, str], str] = {}
+        self._blob_shas: Dict[Tuple[str, str], str] = {}
+
+    @property
+    def throttled_seconds(self) -> float:
+        """Локальное зеркало не подвержено лимитам GitHub API"""
+        return 0.0
+
+    def _remote_url(self, repo_name: str) -> str:
+        """
+        Определяет URL удалённого репозитория
+
+        Args:
+            repo_name: Имя "owner/repo", URL или путь к локальному репозиторию
+
+        Returns:
+            str: URL для git fetch
+        """
+        if re.match(r"^[a-z][a-z0-9+.-]*://", repo_name) or repo_name.startswith("git@"):
+            return repo_name
+        local_path = Path(repo_name).expanduser()
+        if local_path.exists():
+            # file:// нужен, чтобы git выполнял --depth и --filter и для локальных репозиториев
+            return local_path.resolve().as_uri()
+        return f"https://github.com/{repo_name.removesuffix('.git')}.git"
+
+    def _mirror_path(self, url: str) -> Path:
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", url.rstrip("/").rsplit("/", 1)[-1].removesuffix(".git"))
+        digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+        return self.workspace / f"{name}-{digest}.git"
+
+    def _git(self, git_dir: Path, *args: str, input: Optional[bytes] = None) -> bytes:
+        """
+        Выполняет git команду над зеркалом (без смены текущей директории процесса)
+
+        Args:
+            git_dir: Путь к bare-репозиторию
+            args: Аргументы git
+            input: Данные для stdin
+
+        Returns:
+            bytes: stdout команды
+        """
+        env = os.environ.copy()
+        env["GIT_TERMINAL_PROMPT"] = "0"
+        if self._auth_token:
+            # Токен передаётся через окружение, чтобы не попасть в аргументы процесса и конфиг зеркала
+            credentials = base64.b64encode(f"x-access-token:{self._auth_token}".encode()).decode()
+            env["GIT_CONFIG_COUNT"] = "1"
+            env["GIT_CONFIG_KEY_0"] = "http.https://github.com/.extraheader"
+            env["GIT_CONFIG_VALUE_0"] = f"Authorization: Basic {credentials}"
+
+        try:
+            result = subprocess.run(
+                ["git", "--git-dir", str(git_dir), *args],
+                input=input, env=env, check=True, capture_output=True
+            )
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Ошибка выполнения git {args[0]}: {e.stderr.decode(errors='replace').strip()}")
+        return result.stdout
+
+    def _lock_for(self, git_dir: Path) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(git_dir, threading.Lock())
+
+    def sync(self, repo_name: str, branch: str = "main") -> str:
+        """
+        Создаёт или инкрементально обновляет зеркало и возвращает коммит ветки
+
+        Args:
+            repo_name: Имя "owner/repo", URL или путь к локальному репозиторию
+            branch: Ветка
+
+        Returns:
+            str: SHA коммита ветки
+        """
+        url = self._remote_url(repo_name)
+        git_dir = self._mirror_path(url)
+
+        with self._lock_for(git_dir):
+            if not git_dir.exists():
+                log.info(f"Создание зеркала {url} в {git_dir}")
+                subprocess.run(["git", "init", "--bare", "--quiet", str(git_dir)], check=True, capture_output=True)
+                self._git(git_dir, "remote", "add", "origin", url)
+                if self.blob_filter:
+                    self._git(git_dir, "config", "remote.origin.promisor", "true")
+                    self._git(git_dir, "config", "remote.origin.partialclonefilter", self.blob_filter)
+
+            fetch_args = ["fetch", "--quiet", "--no-tags", f"--depth={self.depth}"]
+            if self.blob_filter:
+                fetch_args.append(f"--filter={self.blob_filter}")
+            log.info(f"Обновление зеркала {url} (ветка: {branch})")
+            self._git(git_dir, *fetch_args, "origin", f"+refs/heads/{branch}:refs/heads/{branch}")
+
+            commit = self._git(git_dir, "rev-parse", f"refs/heads/{branch}").decode().strip()
+
+        log.debug(f"Ветка {branch} зеркала {git_dir.name} указывает на {commit}")
+        return commit
+
+    def _resolve(self, repo_name: str, branch: str) -> Tuple[Path, str]:
+        """Возвращает зеркало и коммит ветки, синхронизируя зеркало один раз за время жизни источника"""
+        key = (repo_name, branch)
+        if key not in self._commits:
+            self._commits[key] = self.sync(repo_name, branch)
+        return self._mirror_path(self._remote_url(repo_name)), self._commits[key]
+
+    def get_repository_tree(self, repo_name: str, branch: str = "main", path: str = "",
+                            ignore: Optional[IgnoreMatcher] = None) -> List[TreeItem]:
+        """
+        Получение полного дерева репозитория из зеркала
+
+        Args:
+            repo_name: Имя "owner/repo", URL или путь к локальному репозиторию
+            branch: Ветка
+            path: Путь в репозитории (возвращаются только элементы внутри него)
+            ignore: Правила исключения (исключённые элементы не попадают в результат, их размеры не читаются)
+
+        Returns:
+            List[TreeItem]: Список всех элементов дерева с путями от корня репозитория
+        """
+        try:
+            git_dir, commit = self._resolve(repo_name, branch)
+            prefix = path.strip("/")
+
+            args = ["ls-tree", "-r", "-t", "-z", commit]
+            if prefix:
+                args += ["--", prefix]
+            entries = []
+            for record in self._git(git_dir, *args).decode("utf-8").split("\0"):
+                if not record:
+                    continue
+                meta, item_path = record.split("\t", 1)
+                mode, item_type, sha = meta.split(" ")
+                if prefix and not item_path.startswith(f"{prefix}/"):
+                    continue
+                if ignore and ignore.is_excluded(item_path, item_type == "tree"):
+                    continue
+                entries.append((item_path, mode, item_type, sha))
+
+            sizes = self._get_blob_sizes(git_dir, commit, [sha for _, _, item_type, sha in entries if item_type == "blob"])
+
+            tree_items = []
+            for item_path, mode, item_type, sha in entries:
+                if item_type == "blob":
+                    self._blob_shas[(commit, item_path)] = sha
+                tree_items.append(TreeItem(
+                    path=item_path,
+                    mode=mode,
+                    type=item_type,
+                    size=sizes.get(sha) if item_type == "blob" else None,
+                    sha=sha
+                ))
+
+            log.info(f"Получено {len(tree_items)} элементов дерева из зеркала {git_dir.name}")
+            return tree_items
+
+        except Exception as e:
+            raise Exception(f"Ошибка получения дерева репозитория из зеркала: {str(e)}")
+
+    def _get_blob_sizes(self, git_dir: Path, commit: str, shas: List[str]) -> Dict[str, int]:
+        """
+        Размеры блобов, присутствующих в зеркале
+
+        Блобы, отфильтрованные частичным клоном, не запрашиваются с сервера по одному
+        (git узнаёт размер только загрузив блоб), а остаются без размера; FileAdmission
+        такие файлы отклоняет.
+        """
+        if not shas:
+            return {}
+
+        missing = set()
+        if self.blob_filter:
+            output = self._git(git_dir, "rev-list", "--objects", "--missing=print", commit)
+            missing = {line[1:] for line in output.decode().splitlines() if line.startswith("?")}
+
+        present = [sha for sha in shas if sha not in missing]
+        if not present:
+            return {}
+
+        output = self._git(
+            git_dir, "cat-file", "--batch-check=%(objectname) %(objectsize)",
+            input="\n".join(present).encode() + b"\n"
+        )
+        sizes = {}
+        for line in output.decode().splitlines():
+            sha, size = line.split(" ", 1)
+            if size.isdigit():
+                sizes[sha] = int(size)
+        return sizes
+
+    def get_file_content(self, repo_name: str, file_path: str,
+                         owner: Optional[str] = None, branch: str = "main") -> FileContent:
+        """
+        Получение содержимого файла из зеркала
+
+        Args:
+            repo_name: Имя "owner/repo", URL или путь к локальному репозиторию
+            file_path: Путь к файлу в репозитории
+            owner: Владелец репозитория (игнорируется, оставлен для совместимости с Scm)
+            branch: Ветка
+
+        Returns:
+            FileContent: Содержимое файла
+        """
+        try:
+            git_dir, commit = self._resolve(repo_name, branch)
+            sha = self._blob_shas.get((commit, file_path))
+            if sha is None:
+                sha = self._git(git_dir, "rev-parse", f"{commit}:{file_path}").decode().strip()
+
+            # Отсутствующий в частичном клоне блоб git догрузит с сервера сам
+            data = self._git(git_dir, "cat-file", "blob", sha)
+
+            return FileContent(
+                name=os.path.basename(file_path),
+                path=file_path,
+                content=data.decode("utf-8"),
+                encoding="utf-8",
+                size=len(data),
+                sha=sha
+            )
+
+        except Exception as e:
+            raise Exception(f"Ошибка получения содержимого файла из зеркала: {str(e)}")
@@ -0,0 +1,135 @@
+__all__ = ["GithubRateLimiter"]
+
+import hashlib
+import threading
+import time
+from typing import Dict, Optional
+
+from ai_docsgen.config import settings
+from ai_docsgen.log_setup import get_logger
+
+log = get_logger(__name__)
+
+
+class GithubRateLimiter:
+    """
+    Общий для всех задач планировщик запросов к GitHub API для одного токена
+
+    Работает как корзина токенов: ёмкость и время пополнения берутся из заголовков
+    X-RateLimit-Remaining/X-RateLimit-Reset последнего ответа. Когда запас подходит
+    к концу, запросы ждут сброса лимита, а число одновременных запросов снижается;
+    после вторичного лимита (Retry-After) все запросы по токену приостанавливаются.
+    """
+
+    _registry: Dict[str, "GithubRateLimiter"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, max_concurrency: int, reserve: int):
+        """
+        Инициализация планировщика
+
+        Args:
+            max_concurrency: Максимальное число одновременных запросов
+            reserve: Сколько запросов оставлять в запасе до сброса лимита
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserve = reserve
+        self.throttled_seconds = 0.0
+
+        self._cond = threading.Condition()
+        self._concurrency = self.max_concurrency
+        self._in_flight = 0
+        self._remaining: Optional[int] = None  # неизвестно до первого ответа
+        self._reset_at = 0.0
+        self._blocked_until = 0.0
+
+    @classmethod
+    def for_token(cls, auth_token: Optional[str]) -> "GithubRateLimiter":
+        """
+        Возвращает общий планировщик для токена (лимиты GitHub считаются на токен)
+
+        Args:
+            auth_token: GitHub токен или None для анонимного доступа
+
+        Returns:
+            GithubRateLimiter: Планировщик запросов
+        """
+        key = hashlib.sha256(auth_token.encode()).hexdigest() if auth_token else "anonymous"
+        with cls._registry_lock:
+            if key not in cls._registry:
+                cls._registry[key] = cls(
+                    max_concurrency=settings.github.max_concurrency,
+                    reserve=settings.github.rate_limit_reserve
+                )
+            return cls._registry[key]
+
+    def _wait_time(self, now: float) -> float:
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        if self._remaining is not None and self._remaining <= self.reserve and self._reset_at > now:
+            return self._reset_at - now
+        return 0
+
+    def acquire(self) -> float:
+        """
+        Ожидает разрешения на запрос
+
+        Returns:
+            float: Время ожидания из-за лимитов в секундах
+        """
+        waited = 0.0
+        with self._cond:
+            while True:
+                now = time.time()
+                wait_for = self._wait_time(now)
+                if wait_for > 0:
+                    log.warning(f"Лимит запросов GitHub исчерпан, ожидание {wait_for:.1f} с")
+                    self._cond.wait(wait_for)
+                    waited += time.time() - now
+                    continue
+                if self._in_flight >= self._concurrency:
+                    self._cond.wait()
+                    continue
+                break
+
+            self._in_flight += 1
+            if self._remaining is not None:
+                self._remaining -= 1
+            self.throttled_seconds += waited
+        return waited
+
+    def release(self, remaining: int, limit: int, reset_at: float):
+        """
+        Завершение запроса с обновлением состояния по заголовкам ответа
+
+        Args:
+            remaining: Значение X-RateLimit-Remaining (отрицательное, если неизвестно)
+            limit: Значение X-RateLimit-Limit (отрицательное, если неизвестно)
+            reset_at: Значение X-RateLimit-Reset (unix time)
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if remaining >= 0:
+                # Запросы, ещё не получившие ответ, уже потратили свои токены
+                self._remaining = max(0, remaining - self._in_flight)
+                self._reset_at = reset_at
+
+            if limit > 0 and self._remaining is not None and self._remaining < limit * 0.1:
+                self._concurrency = max(1, self._concurrency // 2)
+            elif self._concurrency < self.max_concurrency:
+                self._concurrency += 1
+            self._cond.notify_all()
+
+    def penalize(self, retry_after: float):
+        """
+        Завершение запроса, упёршегося во вторичный лимит: приостанавливает все запросы по токену
+
+        Args:
+            retry_after: Сколько секунд ждать до следующего запроса
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self._blocked_until = max(self._blocked_until, time.time() + retry_after)
+            self._concurrency = 1
+            self._cond.notify_all()
+        log.warning(f"Получен лимит GitHub, запросы приостановлены на {retry_after:.1f} с")
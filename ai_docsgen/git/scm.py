@@ -1,17 +1,29 @@
 import base64
+import hashlib
 import os
 import subprocess
+import tarfile
+import threading
+import time
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Callable, Dict, TypeVar, Iterator, Tuple
 
-from github import Github, Auth
+import requests
+from github import Github, Auth, GithubException, RateLimitExceededException, InputGitTreeElement
+from github.Repository import Repository
 from pydantic import BaseModel, PrivateAttr
+from urllib3.util import Retry
 
+from ai_docsgen.config import settings
+from ai_docsgen.git.ignore import IgnoreMatcher
+from ai_docsgen.git.rate_limit import GithubRateLimiter
 from ai_docsgen.log_setup import get_logger
 from ai_docsgen.schemas import RepositoryInfo, TreeItem, FileContent
 
 log = get_logger(__name__)
 
+T = TypeVar("T")
+
 
 class Scm(BaseModel):
     """Класс для работы с GitHub API"""
@@ -19,6 +31,11 @@ class Scm(BaseModel):
     # Приватные атрибуты для PyGithub клиента
     _client: Github = PrivateAttr()
     _auth_token: Optional[str] = PrivateAttr(default=None)
+    _rate_limiter: GithubRateLimiter = PrivateAttr()
+    _throttled_seconds: float = PrivateAttr(default=0.0)
+    _repos: Dict[str, Repository] = PrivateAttr(default_factory=dict)
+    _repos_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
     def __init__(self, auth_token: Optional[str] = None, **data):
         """
@@ -29,15 +46,98 @@ class Scm(BaseModel):
         """
         super().__init__(**data)
         self._auth_token = auth_token
-        
+        self._rate_limiter = GithubRateLimiter.for_token(auth_token)
+
+        # Лимиты запросов обрабатывает GithubRateLimiter, поэтому PyGithub повторяет только ошибки сервера
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504], allowed_methods=None)
+        pool_size = settings.github.max_concurrency
+
         if auth_token:
             auth = Auth.Token(auth_token)
-            self._client = Github(auth=auth)
+            self._client = Github(auth=auth, retry=retry, pool_size=pool_size)
         else:
             # Инициализация без аутентификации (для публичных репозиториев)
-            self._client = Github()
+            self._client = Github(retry=retry, pool_size=pool_size)
             log.info("Инициализация SCM клиента без аутентификации. Доступны только публичные репозитории с ограничением запросов.")
 
+    @property
+    def throttled_seconds(self) -> float:
+        """Суммарное время, которое запросы этого клиента ждали из-за лимитов GitHub"""
+        return self._throttled_seconds
+
+    def _request(self, func: Callable[[], T]) -> T:
+        """
+        Выполняет запрос к GitHub API через общий планировщик лимитов токена
+
+        Args:
+            func: Функция, выполняющая ровно один запрос к API
+
+        Returns:
+            T: Результат func
+        """
+        for attempt in range(settings.github.rate_limit_retries):
+            waited = self._rate_limiter.acquire()
+            try:
+                result = func()
+            except GithubException as e:
+                retry_after = self._get_retry_after(e)
+                if retry_after is None:
+                    self._release()
+                    raise
+                self._rate_limiter.penalize(retry_after)
+                log.warning(f"Лимит запросов GitHub (попытка {attempt + 1}/{settings.github.rate_limit_retries})")
+                continue
+            except Exception:
+                self._release()
+                raise
+            finally:
+                with self._lock:
+                    self._throttled_seconds += waited
+
+            self._release()
+            return result
+
+        raise Exception("Превышено количество попыток запроса к GitHub из-за лимитов")
+
+    def _release(self):
+        """Передаёт планировщику состояние лимита из заголовков последнего ответа"""
+        requester = self._client.requester
+        remaining, limit = requester.rate_limiting
+        self._rate_limiter.release(remaining, limit, requester.rate_limiting_resettime)
+
+    @staticmethod
+    def _get_retry_after(e: GithubException) -> Optional[float]:
+        """
+        Определяет, является ли ошибка превышением лимита, и сколько ждать до повтора
+
+        Returns:
+            Optional[float]: Время ожидания в секундах или None, если это не ошибка лимита
+        """
+        headers = {k.lower(): v for k, v in (e.headers or {}).items()}
+        message = str(e.data).lower() if e.data else ""
+        is_rate_limit = (
+                isinstance(e, RateLimitExceededException)
+                or (e.status in (403, 429) and ("rate limit" in message or "retry-after" in headers))
+        )
+        if not is_rate_limit:
+            return None
+
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+        if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+            return max(1.0, float(headers["x-ratelimit-reset"]) - time.time())
+        return 60.0
+
+    def _get_repo(self, normalized_repo_name: str) -> Repository:
+        """Получение объекта репозитория (один запрос на репозиторий за время жизни клиента)"""
+        # Отдельная блокировка: _request сам берёт self._lock; потоки загрузки ждут первый запрос, а не дублируют его
+        with self._repos_lock:
+            repo = self._repos.get(normalized_repo_name)
+            if repo is None:
+                repo = self._request(lambda: self._client.get_repo(normalized_repo_name))
+                self._repos[normalized_repo_name] = repo
+            return repo
+
     def get_repository_info(self, repo_name: str, owner: Optional[str] = None) -> RepositoryInfo:
         """
         Получение информации о репозитории
@@ -53,7 +153,7 @@ class Scm(BaseModel):
             # Нормализация repo_name
             normalized_repo_name = self._normalize_repo_name(repo_name)
 
-            repo = self._client.get_repo(normalized_repo_name)
+            repo = self._get_repo(normalized_repo_name)
 
             return RepositoryInfo(
                 name=repo.name,
@@ -109,9 +209,9 @@ class Scm(BaseModel):
         log.info(f"Получение структуры репозитория {repo_name} (ветка: {branch}, путь: {path})")
         try:
             normalized_repo_name = self._normalize_repo_name(repo_name)
-            repo = self._client.get_repo(normalized_repo_name)
+            repo = self._get_repo(normalized_repo_name)
 
-            contents = repo.get_contents(path, ref=branch)
+            contents = self._request(lambda: repo.get_contents(path, ref=branch))
 
             # Если contents не является списком, делаем его списком
             if not isinstance(contents, list):
@@ -132,6 +232,96 @@ class Scm(BaseModel):
         except Exception as e:
             raise Exception(f"Ошибка получения структуры репозитория: {str(e)}")
 
+    def get_repository_tree(self, repo_name: str, branch: str = "main", path: str = "",
+                            ignore: Optional[IgnoreMatcher] = None) -> List[TreeItem]:
+        """
+        Получение полного дерева репозитория за один запрос (рекурсивный режим Git Trees API)
+
+        Ветка один раз разрешается в коммит, после чего всё дерево забирается одним вызовом.
+        Если GitHub вернул усечённое дерево, недостающие поддеревья догружаются постранично.
+
+        Args:
+            repo_name: Имя репозитория в формате "owner/repo" или полный URL
+            branch: Ветка
+            path: Путь в репозитории (возвращаются только элементы внутри него)
+            ignore: Правила исключения; исключённые поддеревья не загружаются и не попадают в результат
+
+        Returns:
+            List[TreeItem]: Список всех элементов дерева с путями от корня репозитория
+        """
+        log.info(f"Получение дерева репозитория {repo_name} (ветка: {branch}, путь: {path})")
+        try:
+            normalized_repo_name = self._normalize_repo_name(repo_name)
+            repo = self._get_repo(normalized_repo_name)
+
+            commit_sha = self._resolve_commit(repo, branch)
+
+            tree = self._request(lambda: repo.get_git_tree(commit_sha, recursive=True))
+            if tree.raw_data.get("truncated"):
+                log.warning(f"Дерево репозитория {normalized_repo_name} усечено, переход к постраничной загрузке")
+                tree_items = self._get_tree_paged(repo, commit_sha, ignore=ignore, prefix=path.strip("/"))
+            else:
+                tree_items = [self._to_tree_item(element) for element in tree.tree]
+                if ignore:
+                    tree_items = ignore.filter(tree_items)
+
+            prefix = path.strip("/")
+            if prefix:
+                tree_items = [item for item in tree_items if item.path.startswith(f"{prefix}/")]
+
+            log.info(f"Получено {len(tree_items)} элементов дерева")
+            return tree_items
+
+        except Exception as e:
+            raise Exception(f"Ошибка получения дерева репозитория: {str(e)}")
+
+    def _resolve_commit(self, repo: Repository, branch: str) -> str:
+        """Разрешает ветку в SHA коммита"""
+        commit_sha = self._request(lambda: repo.get_branch(branch)).commit.sha
+        log.debug(f"Ветка {branch} разрешена в коммит {commit_sha}")
+        return commit_sha
+
+    def _get_tree_paged(self, repo, tree_sha: str, base_path: str = "",
+                        ignore: Optional[IgnoreMatcher] = None, prefix: str = "") -> List[TreeItem]:
+        """
+        Постраничная загрузка дерева: по одному нерекурсивному запросу на поддерево
+
+        Args:
+            repo: Объект репозитория PyGithub
+            tree_sha: SHA дерева
+            base_path: Путь дерева от корня репозитория
+            ignore: Правила исключения; исключённые поддеревья не запрашиваются
+            prefix: Путь, за пределы которого обход не спускается
+
+        Returns:
+            List[TreeItem]: Список всех элементов поддерева
+        """
+        tree_items = []
+        pending = [(tree_sha, base_path)]
+        while pending:
+            sha, current_path = pending.pop()
+            for element in self._request(lambda: repo.get_git_tree(sha)).tree:
+                item = self._to_tree_item(element, current_path)
+                if ignore and ignore.matches(item.path, item.type == "tree"):
+                    continue
+                tree_items.append(item)
+                on_prefix_path = not prefix or prefix.startswith(f"{item.path}/") or item.path == prefix \
+                    or item.path.startswith(f"{prefix}/")
+                if item.type == "tree" and on_prefix_path:
+                    pending.append((item.sha, item.path))
+        return tree_items
+
+    @staticmethod
+    def _to_tree_item(element, base_path: str = "") -> TreeItem:
+        """Преобразует элемент Git Trees API в TreeItem"""
+        return TreeItem(
+            path=f"{base_path}/{element.path}" if base_path else element.path,
+            mode=element.mode,
+            type=element.type,
+            size=element.size if element.type == "blob" else None,
+            sha=element.sha
+        )
+
     def get_file_content(self, repo_name: str, file_path: str,
                          owner: Optional[str] = None, branch: str = "main") -> FileContent:
         """
@@ -148,9 +338,9 @@ class Scm(BaseModel):
         """
         try:
             normalized_repo_name = self._normalize_repo_name(repo_name)
-            repo = self._client.get_repo(normalized_repo_name)
+            repo = self._get_repo(normalized_repo_name)
 
-            file = repo.get_contents(file_path, ref=branch)
+            file = self._request(lambda: repo.get_contents(file_path, ref=branch))
 
             # Декодирование содержимого
             if file.encoding == "base64":
@@ -170,6 +360,82 @@ class Scm(BaseModel):
         except Exception as e:
             raise Exception(f"Ошибка получения содержимого файла: {str(e)}")
 
+    def iter_archive_files(self, repo_name: str, branch: str = "main",
+                           extensions: Tuple[str, ...] = (), max_file_size: Optional[int] = None,
+                           on_skip: Optional[Callable[[TreeItem, str], None]] = None) -> Iterator[FileContent]:
+        """
+        Потоковое чтение tar.gz архива коммита с отбором нужных файлов
+
+        Архив скачивается одним запросом и распаковывается на лету, не сохраняясь на диск.
+        В памяти одновременно находится не больше одного отобранного файла.
+
+        Args:
+            repo_name: Имя репозитория в формате "owner/repo" или полный URL
+            branch: Ветка
+            extensions: Расширения файлов, которые нужно оставить (пусто - все)
+            max_file_size: Максимальный размер файла в байтах (None - без ограничения)
+            on_skip: Вызывается для файлов, пропущенных по размеру или кодировке,
+                с элементом дерева (размер и git SHA) и причиной
+
+        Returns:
+            Iterator[FileContent]: Отобранные файлы с путями от корня репозитория и git SHA
+        """
+        log.info(f"Загрузка архива репозитория {repo_name} (ветка: {branch})")
+        try:
+            normalized_repo_name = self._normalize_repo_name(repo_name)
+            repo = self._get_repo(normalized_repo_name)
+            commit_sha = self._resolve_commit(repo, branch)
+            archive_url = self._request(lambda: repo.get_archive_link("tarball", ref=commit_sha))
+
+            # Ссылка на архив уже подписана GitHub, токен в запрос не передаётся
+            with requests.get(archive_url, stream=True, timeout=settings.github.request_timeout) as response:
+                response.raise_for_status()
+                with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                    for member in archive:
+                        if not member.isfile():
+                            continue
+                        # Первый компонент пути - каталог вида owner-repo-sha
+                        path = member.name.split("/", 1)[1] if "/" in member.name else member.name
+                        if extensions and not path.endswith(extensions):
+                            continue
+                        if max_file_size is not None and member.size > max_file_size:
+                            reason = f"размер {member.size} байт превышает лимит {max_file_size} байт"
+                            log.debug(f"Файл {path} пропущен: {reason}")
+                            if on_skip is not None:
+                                # Поток архива всё равно читается насквозь, поэтому SHA считается без хранения файла
+                                digest = hashlib.sha1(b"blob %d\0" % member.size)
+                                stream = archive.extractfile(member)
+                                for block in iter(lambda: stream.read(1024 * 1024), b""):
+                                    digest.update(block)
+                                on_skip(self._archive_tree_item(path, member.size, digest.hexdigest()), reason)
+                            continue
+
+                        data = archive.extractfile(member).read()
+                        sha = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+                        try:
+                            content = data.decode("utf-8")
+                        except UnicodeDecodeError:
+                            log.debug(f"Файл {path} пропущен: не UTF-8")
+                            if on_skip is not None:
+                                on_skip(self._archive_tree_item(path, len(data), sha), "содержимое не в UTF-8")
+                            continue
+
+                        yield FileContent(
+                            name=os.path.basename(path),
+                            path=path,
+                            content=content,
+                            encoding="utf-8",
+                            size=len(data),
+                            sha=sha
+                        )
+
+        except Exception as e:
+            raise Exception(f"Ошибка загрузки архива репозитория: {str(e)}")
+
+    @staticmethod
+    def _archive_tree_item(path: str, size: int, sha: str) -> TreeItem:
+        return TreeItem(path=path, mode="100644", type="blob", size=size, sha=sha)
+
     def create_repository(self, repo_name: str, description: str = "",
                           private: bool = False, auto_init: bool = True) -> RepositoryInfo:
         """
@@ -189,12 +455,12 @@ class Scm(BaseModel):
             
         try:
             user = self._client.get_user()
-            repo = user.create_repo(
+            repo = self._request(lambda: user.create_repo(
                 name=repo_name,
                 description=description,
                 private=private,
                 auto_init=auto_init
-            )
+            ))
 
             return RepositoryInfo(
                 name=repo.name,
@@ -244,50 +510,47 @@ class Scm(BaseModel):
                 raise Exception(f"Папка {local_path} не существует")
 
             # Получаем информацию о пользователе для формирования URL
-            user = self._client.get_user()
+            user_login = self._request(lambda: self._client.get_user().login)
             normalized_repo_name = self._normalize_repo_name(repo_name)
 
             # Если repo_name уже содержит имя владельца, используем его
             if "/" in normalized_repo_name:
                 repo_url = f"https://github.com/{normalized_repo_name}.git"
             else:
-                repo_url = f"https://github.com/{user.login}/{normalized_repo_name}.git"
-
-            # Переходим в директорию
-            os.chdir(local_path)
+                repo_url = f"https://github.com/{user_login}/{normalized_repo_name}.git"
 
             # Проверяем, не является ли папка уже git репозиторием
             if not (local_path / ".git").exists():
                 # Инициализируем git репозиторий
-                subprocess.run(["git", "init"], check=True, capture_output=True)
-                subprocess.run(["git", "branch", "-M", branch], check=True, capture_output=True)
+                subprocess.run(["git", "init"], cwd=local_path, check=True, capture_output=True)
+                subprocess.run(["git", "branch", "-M", branch], cwd=local_path, check=True, capture_output=True)
 
             # Добавляем все файлы
-            subprocess.run(["git", "add", "."], check=True, capture_output=True)
+            subprocess.run(["git", "add", "."], cwd=local_path, check=True, capture_output=True)
 
             # Проверяем, есть ли изменения для коммита
-            result = subprocess.run(["git", "status", "--porcelain"],
+            result = subprocess.run(["git", "status", "--porcelain"], cwd=local_path,
                                     capture_output=True, text=True)
 
             if result.stdout.strip():  # Есть изменения
                 # Создаем коммит
-                subprocess.run(["git", "commit", "-m", commit_message],
+                subprocess.run(["git", "commit", "-m", commit_message], cwd=local_path,
                                check=True, capture_output=True)
 
             # Добавляем remote origin если его нет
-            remotes_result = subprocess.run(["git", "remote"],
+            remotes_result = subprocess.run(["git", "remote"], cwd=local_path,
                                             capture_output=True, text=True)
 
             if "origin" not in remotes_result.stdout:
-                subprocess.run(["git", "remote", "add", "origin", repo_url],
+                subprocess.run(["git", "remote", "add", "origin", repo_url], cwd=local_path,
                                check=True, capture_output=True)
             else:
                 # Обновляем URL remote origin
-                subprocess.run(["git", "remote", "set-url", "origin", repo_url],
+                subprocess.run(["git", "remote", "set-url", "origin", repo_url], cwd=local_path,
                                check=True, capture_output=True)
 
             # Пушим в репозиторий
-            subprocess.run(["git", "push", "-u", "origin", branch],
+            subprocess.run(["git", "push", "-u", "origin", branch], cwd=local_path,
                            check=True, capture_output=True)
 
             return True
@@ -297,6 +560,104 @@ class Scm(BaseModel):
         except Exception as e:
             raise Exception(f"Ошибка инициализации и пуша репозитория: {str(e)}")
 
+    def publish_directory(self, local_path: str, repo_name: str,
+                          commit_message: str = "Update documentation",
+                          branch: str = "main", delete_missing: bool = True) -> str:
+        """
+        Публикация содержимого локальной папки одним коммитом через Git Data API
+
+        Загружаются только файлы, чей git SHA отличается от файлов в ветке, после чего
+        создаётся одно дерево и один коммит, и ветка переносится на него. Текущая
+        директория процесса не меняется, поэтому публикации могут идти параллельно.
+
+        Args:
+            local_path: Путь к локальной папке
+            repo_name: Имя репозитория на GitHub ("owner/repo" или имя в аккаунте пользователя)
+            commit_message: Сообщение коммита
+            branch: Ветка
+            delete_missing: Удалять из ветки файлы, которых нет в локальной папке
+
+        Returns:
+            str: SHA коммита, на который указывает ветка
+        """
+        if not self._auth_token:
+            raise Exception("Для публикации требуется аутентификация. Укажите auth_token при инициализации Scm.")
+
+        try:
+            local_path = Path(local_path).resolve()
+            if not local_path.exists():
+                raise Exception(f"Папка {local_path} не существует")
+
+            normalized_repo_name = self._normalize_repo_name(repo_name)
+            if "/" not in normalized_repo_name:
+                user_login = self._request(lambda: self._client.get_user().login)
+                normalized_repo_name = f"{user_login}/{normalized_repo_name}"
+            repo = self._get_repo(normalized_repo_name)
+
+            local_files = {}
+            for file_path in sorted(local_path.rglob("*")):
+                if not file_path.is_file() or ".git" in file_path.relative_to(local_path).parts:
+                    continue
+                data = file_path.read_bytes()
+                local_files[file_path.relative_to(local_path).as_posix()] = (
+                    hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest(), data
+                )
+
+            try:
+                ref = self._request(lambda: repo.get_git_ref(f"heads/{branch}"))
+            except GithubException as e:
+                if e.status not in (404, 409):
+                    raise
+                ref = None
+
+            if ref is not None:
+                base_commit = self._request(lambda: repo.get_git_commit(ref.object.sha))
+                base_tree = self._request(lambda: repo.get_git_tree(base_commit.tree.sha, recursive=True))
+                if base_tree.raw_data.get("truncated"):
+                    remote_items = self._get_tree_paged(repo, base_tree.sha)
+                else:
+                    remote_items = [self._to_tree_item(element) for element in base_tree.tree]
+                remote_files = {item.path: item.sha for item in remote_items if item.type == "blob"}
+            else:
+                base_commit, base_tree, remote_files = None, None, {}
+
+            changed = [path for path, (sha, _) in local_files.items() if remote_files.get(path) != sha]
+            deleted = [path for path in remote_files if path not in local_files] if delete_missing else []
+
+            if base_commit is not None and not changed and not deleted:
+                log.info(f"Изменений для публикации в {normalized_repo_name} нет")
+                return base_commit.sha
+
+            log.info(f"Публикация в {normalized_repo_name} (ветка: {branch}): "
+                     f"изменено {len(changed)}, удалено {len(deleted)} файлов")
+
+            elements = []
+            for path in changed:
+                data = local_files[path][1]
+                blob = self._request(lambda: repo.create_git_blob(base64.b64encode(data).decode("ascii"), "base64"))
+                elements.append(InputGitTreeElement(path=path, mode="100644", type="blob", sha=blob.sha))
+            for path in deleted:
+                elements.append(InputGitTreeElement(path=path, mode="100644", type="blob", sha=None))
+
+            if base_tree is not None:
+                tree = self._request(lambda: repo.create_git_tree(elements, base_tree))
+            else:
+                tree = self._request(lambda: repo.create_git_tree(elements))
+            parents = [base_commit] if base_commit is not None else []
+            commit = self._request(lambda: repo.create_git_commit(commit_message, tree, parents))
+
+            if ref is not None:
+                # Без force: если ветку успели сдвинуть, GitHub отклонит перенос, а не затрёт чужой коммит
+                self._request(lambda: ref.edit(commit.sha, force=False))
+            else:
+                self._request(lambda: repo.create_git_ref(f"refs/heads/{branch}", commit.sha))
+
+            log.info(f"Ветка {branch} репозитория {normalized_repo_name} перенесена на коммит {commit.sha}")
+            return commit.sha
+
+        except Exception as e:
+            raise Exception(f"Ошибка публикации в репозиторий: {str(e)}")
+
     def create_and_push_repository(self, local_path: str, repo_name: str,
                                    description: str = "", private: bool = False,
                                    commit_message: str = "Initial commit") -> RepositoryInfo:
@@ -316,19 +677,20 @@ class Scm(BaseModel):
         if not self._auth_token:
             raise Exception("Для создания и пуша репозитория требуется аутентификация. Укажите auth_token при инициализации Scm.")
             
-        # Создаем репозиторий на GitHub (без auto_init, чтобы избежать конфликтов)
+        # Создаем репозиторий на GitHub (с auto_init, т.к. Git Data API не работает с пустыми репозиториями)
         repo_info = self.create_repository(
             repo_name=repo_name,
             description=description,
             private=private,
-            auto_init=False
+            auto_init=True
         )
 
-        # Инициализируем и пушим локальный репозиторий
-        self.init_and_push_local_repo(
+        # Публикуем содержимое локальной папки одним коммитом
+        self.publish_directory(
             local_path=local_path,
-            repo_name=repo_name,
-            commit_message=commit_message
+            repo_name=repo_info.full_name,
+            commit_message=commit_message,
+            branch=repo_info.default_branch
         )
 
         return repo_info
@@ -0,0 +1,135 @@
+__all__ = ["TarballSource"]
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+from ai_docsgen.git.ignore import IgnoreMatcher
+from ai_docsgen.git.scm import Scm
+from ai_docsgen.log_setup import get_logger
+from ai_docsgen.schemas import TreeItem, FileContent
+
+log = get_logger(__name__)
+
+
+class TarballSource:
+    """
+    Источник файлов репозитория на основе одного архива коммита
+
+    Архив читается потоком через Scm.iter_archive_files, отобранные файлы складываются
+    во временную директорию. Файлы, пропущенные по размеру или кодировке, остаются в дереве
+    с размером, но без содержимого, чтобы их отклонил и учёл в отчёте FileAdmission, как
+    для других источников. Интерфейс чтения совпадает с Scm.
+    """
+
+    def __init__(self, scm: Scm, extensions: Tuple[str, ...], max_file_size: Optional[int] = None):
+        """
+        Инициализация источника
+
+        Args:
+            scm: SCM клиент для загрузки архива
+            extensions: Расширения документируемых файлов
+            max_file_size: Максимальный размер сохраняемого файла в байтах (тот же, что у FileAdmission)
+        """
+        self._scm = scm
+        self.extensions = extensions
+        self.max_file_size = max_file_size
+        self._spool = tempfile.TemporaryDirectory(prefix="docgen_tar_")
+        self._files: Dict[Tuple[str, str], Dict[str, TreeItem]] = {}
+        self._unloaded: Dict[str, str] = {}  # {SHA: причина} для файлов без сохранённого содержимого
+        self._lock = threading.Lock()
+
+    @property
+    def throttled_seconds(self) -> float:
+        return self._scm.throttled_seconds
+
+    def _spool_path(self, sha: str) -> Path:
+        return Path(self._spool.name) / sha
+
+    def _load(self, repo_name: str, branch: str, ignore: Optional[IgnoreMatcher] = None) -> Dict[str, TreeItem]:
+        """Загружает архив ветки один раз за время жизни источника (исключённые файлы не сохраняются)"""
+        key = (repo_name, branch)
+        with self._lock:
+            if key not in self._files:
+                files = {}
+
+                def skip(item: TreeItem, reason: str):
+                    if not (ignore and ignore.is_excluded(item.path)):
+                        files[item.path] = item
+                        self._unloaded[item.sha] = reason
+
+                for file in self._scm.iter_archive_files(repo_name, branch, self.extensions, self.max_file_size,
+                                                         on_skip=skip):
+                    if ignore and ignore.is_excluded(file.path):
+                        continue
+                    spool_path = self._spool_path(file.sha)
+                    if not spool_path.exists():
+                        spool_path.write_bytes(file.content.encode("utf-8"))
+                    files[file.path] = TreeItem(
+                        path=file.path,
+                        mode="100644",
+                        type="blob",
+                        size=file.size,
+                        sha=file.sha
+                    )
+                log.info(f"Из архива {repo_name} отобрано {len(files)} файлов")
+                self._files[key] = files
+            return self._files[key]
+
+    def get_repository_tree(self, repo_name: str, branch: str = "main", path: str = "",
+                            ignore: Optional[IgnoreMatcher] = None) -> List[TreeItem]:
+        """
+        Получение отобранных файлов архива в виде дерева
+
+        Args:
+            repo_name: Имя репозитория в формате "owner/repo" или полный URL
+            branch: Ветка
+            path: Путь в репозитории (возвращаются только элементы внутри него)
+            ignore: Правила исключения
+
+        Returns:
+            List[TreeItem]: Файлы, прошедшие фильтр по расширению (включая пропущенные по размеру)
+        """
+        tree_items = list(self._load(repo_name, branch, ignore).values())
+        if ignore:
+            tree_items = ignore.filter(tree_items)
+        prefix = path.strip("/")
+        if prefix:
+            tree_items = [item for item in tree_items if item.path.startswith(f"{prefix}/")]
+        return tree_items
+
+    def get_file_content(self, repo_name: str, file_path: str,
+                         owner: Optional[str] = None, branch: str = "main") -> FileContent:
+        """
+        Получение содержимого файла из архива
+
+        Args:
+            repo_name: Имя репозитория в формате "owner/repo" или полный URL
+            file_path: Путь к файлу в репозитории
+            owner: Владелец репозитория (игнорируется, оставлен для совместимости с Scm)
+            branch: Ветка
+
+        Returns:
+            FileContent: Содержимое файла
+        """
+        item = self._load(repo_name, branch).get(file_path)
+        if item is None:
+            raise Exception(f"Файл {file_path} отсутствует в архиве или не прошёл фильтр")
+        if item.sha in self._unloaded:
+            raise Exception(f"Содержимое файла {file_path} не сохранено из архива: {self._unloaded[item.sha]}")
+
+        return FileContent(
+            name=os.path.basename(file_path),
+            path=file_path,
+            # Читаются байты, чтобы не преобразовывать переводы строк (CRLF) при чтении в текстовом режиме
+            content=self._spool_path(item.sha).read_bytes().decode("utf-8"),
+            encoding="utf-8",
+            size=item.size,
+            sha=item.sha
+        )
+
+    def close(self):
+        """Удаляет временную директорию с файлами архива"""
+        self._spool.cleanup()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 from uuid import UUID
 from enum import Enum
@@ -9,6 +9,11 @@ class DocType(str, Enum):
     PRIVATE = "private"
     PUBLIC = "public"
 
+class SourceMode(str, Enum):
+    API = "api"
+    MIRROR = "mirror"
+    TARBALL = "tarball"
+
 class JobStatus(str, Enum):
     PENDING = "pending"
     RUNNING = "running"
@@ -48,6 +53,11 @@ class Project(BaseModel):
     docs_repository: Optional[str]
     docs_url: Optional[str]
     jobs: Optional[List[Job]] = []
+    source_mode: SourceMode = SourceMode.API
+    byte_budget: Optional[int] = None  # максимальный суммарный размер документируемых файлов
+    include_patterns: List[str] = []  # шаблоны .gitignore; если заданы, документируются только совпавшие файлы
+    exclude_patterns: List[str] = []  # шаблоны .gitignore для исключения файлов и директорий
+    bypass_ai_cache: bool = False  # не брать ответы AI из кэша (принудительная перегенерация)
     created_at: datetime
     updated_at: datetime
 
@@ -89,3 +99,79 @@ class TreeItem(BaseModel):
     type: str  # 'blob' для файлов, 'tree' для директорий
     size: Optional[int] = None
     sha: str
+
+
+class BlobCacheStats(BaseModel):
+    """Счётчики кэша содержимого файлов за одну задачу"""
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+
+class SkippedFile(BaseModel):
+    """Файл, исключённый из документирования до загрузки"""
+    path: str
+    size: Optional[int] = None
+    reason: str
+
+
+class AiCacheStats(BaseModel):
+    """Статистика использования кэша ответов AI за время выполнения задачи"""
+    hits: int = 0
+    misses: int = 0
+
+
+class AiConnectionStats(BaseModel):
+    """Статистика использования пула HTTP соединений AI клиента"""
+    requests: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+    compressed_requests: int = 0
+
+
+class AiEndpointStats(BaseModel):
+    """Статистика точки доступа AI маршрутизатора"""
+    name: str
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    mean_latency: float = 0.0  # seconds
+    max_latency: float = 0.0  # seconds
+    quarantined: bool = False
+
+
+class JobReport(BaseModel):
+    """Отчёт о выполнении задачи генерации документации"""
+    docs_path: Optional[str] = None
+    blob_cache: BlobCacheStats = Field(default_factory=BlobCacheStats)
+    fetch_errors: Dict[str, str] = Field(default_factory=dict)
+    github_throttled_seconds: float = 0.0
+    ai_connections: AiConnectionStats = Field(default_factory=AiConnectionStats)
+    ai_cache: AiCacheStats = Field(default_factory=AiCacheStats)
+    ai_endpoints: List[AiEndpointStats] = Field(default_factory=list)
+    ai_rejected_requests: int = 0  # отклонено разомкнутой цепью
+    ai_hedged_requests: int = 0
+    regenerated_modules: List[str] = Field(default_factory=list)
+    reused_modules: List[str] = Field(default_factory=list)
+    resumed_modules: List[str] = Field(default_factory=list)  # взяты из журнала прерванного запуска задачи
+    skipped_files: List[SkippedFile] = Field(default_factory=list)
+
+
+class ModuleManifest(BaseModel):
+    """Входные данные и результат генерации документации одной директории"""
+    files: Dict[str, str]  # путь файла -> git SHA
+    doc: str
+
+
+class JournalRecord(BaseModel):
+    """Запись журнала задачи о готовой директории"""
+    module: str
+    fingerprint: str  # хеш инструкций проекта и SHA файлов директории
+    doc: str
+
+
+class ProjectManifest(BaseModel):
+    """Состояние последней успешной генерации документации проекта"""
+    commit_id: Optional[str] = None
+    instructions_hash: Optional[str] = None
+    modules: Dict[str, ModuleManifest] = Field(default_factory=dict)
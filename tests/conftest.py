@@ -0,0 +1,142 @@
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+from unittest import mock
+from uuid import UUID, uuid4
+
+import pytest
+
+# Настройки читаются при импорте пакета; обязательные значения в тестах не используются
+os.environ.setdefault("CONFIG__GH_TOKEN", "test")
+os.environ.setdefault("AI__KEY", "test")
+os.environ.setdefault("AI__DOMAIN", "test")
+
+from ai_docsgen.bench.fake_server import FakeAiServer, FakeServerConfig  # noqa: E402
+from ai_docsgen.config import settings  # noqa: E402
+from ai_docsgen.git.scm import Scm  # noqa: E402
+from ai_docsgen.schemas import AiConnectionStats, Project, Job, JobStatus, JobType, SourceMode  # noqa: E402
+
+REPO_FILES = {
+    "main.py": "print('main')\n",
+    "pkg/__init__.py": "",
+    "pkg/core.py": "def core():\n    return 1\n",
+    "pkg/sub/util.py": "def util():\n    return 2\n",
+    "web/app.ts": "export const app = 1;\n",
+    "docs/readme.txt": "не код\n",
+}
+
+
+def git(*args: str, cwd: Path) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def make_bare_repo(tmp_path: Path, files: Dict[str, str]) -> Path:
+    """Локальный bare-репозиторий с веткой main и заданными файлами"""
+    work = tmp_path / "work"
+    work.mkdir()
+    git("init", "--quiet", "--initial-branch=main", cwd=work)
+    for path, content in files.items():
+        (work / path).parent.mkdir(parents=True, exist_ok=True)
+        (work / path).write_text(content, encoding="utf-8")
+    git("add", ".", cwd=work)
+    git("commit", "--quiet", "-m", "init", cwd=work)
+
+    bare = tmp_path / "origin.git"
+    git("init", "--quiet", "--bare", "--initial-branch=main", str(bare), cwd=tmp_path)
+    git("config", "uploadpack.allowFilter", "true", cwd=bare)
+    git("push", "--quiet", str(bare), "main", cwd=work)
+    return bare
+
+
+@pytest.fixture
+def bare_repo(tmp_path) -> Path:
+    """Локальный bare-репозиторий с файлами REPO_FILES"""
+    return make_bare_repo(tmp_path, REPO_FILES)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch) -> Path:
+    """Отдельная директория кэшей, задач и зеркал"""
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(settings.cache, "directory", directory)
+    return directory
+
+
+@pytest.fixture
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(settings.ai, "poll_initial", 0.01)
+    monkeypatch.setattr(settings.ai, "poll_max_interval", 0.05)
+    monkeypatch.setattr(settings.ai, "deadline", 10)
+    monkeypatch.setattr(settings.ai, "timeout", 0.01)
+
+
+def start_fake_ai(**config) -> FakeAiServer:
+    server = FakeAiServer(FakeServerConfig(**{
+        "latency_median": 0.01, "latency_sigma": 0, "response_chars": 200, "seed": 1, **config
+    }))
+    server.url = server.start()
+    return server
+
+
+@pytest.fixture
+def fake_ai(fast_polling):
+    server = start_fake_ai()
+    yield server
+    server.stop()
+
+
+class RecordingAi:
+    """Заменяет AiAPI: записывает полные тексты запросов и отвечает функцией answer"""
+
+    model_code = "test"
+    dialog_id = "recording"
+
+    def __init__(self, answer: Callable[[str], str]):
+        self.answer = answer
+        self.requests: List[str] = []
+        self.connection_stats = AiConnectionStats()
+        self._lock = threading.Lock()
+
+    def new_dialog(self) -> "RecordingAi":
+        return self
+
+    def clear_context(self):
+        pass
+
+    def ask_ai(self, request: str) -> str:
+        with self._lock:
+            self.requests.append(request)
+        return self.answer(request)
+
+
+def make_scm(**client_methods) -> Scm:
+    """Scm с подменённым клиентом PyGithub: запросы не уходят в сеть, лимит запросов не исчерпан"""
+    scm = Scm(auth_token="test-token")
+    scm._client = mock.Mock(**client_methods)
+    scm._client.requester.rate_limiting = (4999, 5000)
+    scm._client.requester.rate_limiting_resettime = time.time() + 3600
+    return scm
+
+
+def make_project(**fields) -> Project:
+    values = dict(
+        id=uuid4(), name="p", repository="owner/repo", directory="", access_token="", branches=["main"],
+        doc_language="ru", doc_type="full", instructions=None, docs_repository=None, docs_url=None,
+        source_mode=SourceMode.API, created_at=datetime.now(), updated_at=datetime.now()
+    )
+    values.update(fields)
+    return Project(**values)
+
+
+def make_job(project: Project, job_id: UUID = None, job_type: JobType = JobType.FULL_GENERATION) -> Job:
+    return Job(
+        id=job_id or uuid4(), project_id=project.id, branch="main", commit_id="c1", status=JobStatus.RUNNING,
+        job_type=job_type, started_at=datetime.now(), completed_at=datetime.now()
+    )
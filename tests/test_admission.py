@@ -0,0 +1,23 @@
+from ai_docsgen.ai.admission import FileAdmission
+from ai_docsgen.schemas import TreeItem
+
+
+def blob(path, size):
+    return TreeItem(path=path, mode="100644", type="blob", size=size, sha=path)
+
+
+def test_unknown_size_is_rejected_with_reason():
+    admission = FileAdmission(extensions=(".py",), max_file_size=100, byte_budget=1000)
+    admitted, skipped = admission.admit([blob("a.py", 10), blob("big.py", None)])
+
+    assert [item.path for item in admitted] == ["a.py"]
+    assert [file.path for file in skipped] == ["big.py"]
+    assert "неизвестен" in skipped[0].reason
+
+
+def test_size_limit_and_budget():
+    admission = FileAdmission(extensions=(".py",), max_file_size=100, byte_budget=150)
+    admitted, skipped = admission.admit([blob("a.py", 90), blob("b.py", 200), blob("c.py", 90)])
+
+    assert [item.path for item in admitted] == ["a.py"]
+    assert [file.path for file in skipped] == ["b.py", "c.py"]
@@ -0,0 +1,92 @@
+import pytest
+
+from conftest import RecordingAi, make_bare_repo, make_job, make_project
+from ai_docsgen.ai.chunking import ModuleChunker
+from ai_docsgen.ai.worker import PipelineWorker
+from ai_docsgen.config import settings
+from ai_docsgen.schemas import JobReport, SourceMode
+
+MAP_MARKER = "## ФАЙЛЫ ДИРЕКТОРИИ Корневая директория (часть"
+REDUCE_MARKER = "## ЧАСТИЧНАЯ ДОКУМЕНТАЦИЯ ДИРЕКТОРИИ"
+
+
+def source_file(number: int, lines: int = 40) -> str:
+    return "".join(f"value_{number}_{line} = {line}  # строка {line}\n" for line in range(lines))
+
+
+def test_split_keeps_whole_files_within_budget():
+    chunker = ModuleChunker(budget_tokens=700, chars_per_token=3.5)
+    files = [{"path": f"f{i}.py", "content": source_file(i, 20)} for i in range(6)]
+
+    chunks = chunker.split(files, overhead_tokens=100)
+
+    assert len(chunks) > 1
+    assert [file for chunk in chunks for file in chunk] == files
+    for chunk in chunks:
+        assert sum(chunker.estimate(chunker.render(file)) for file in chunk) <= 600
+
+
+def test_split_cuts_oversized_file_at_line_boundaries():
+    chunker = ModuleChunker(budget_tokens=300, chars_per_token=3.5)
+    content = source_file(0, 100)
+
+    chunks = chunker.split([{"path": "big.py", "content": content}])
+
+    pieces = [file for chunk in chunks for file in chunk]
+    assert len(pieces) > 1
+    assert "".join(piece["content"] for piece in pieces) == content
+    assert all(piece["content"].endswith("\n") for piece in pieces)
+    assert pieces[0]["path"] == f"big.py (фрагмент 1 из {len(pieces)})"
+    for chunk in chunks:
+        assert sum(chunker.estimate(chunker.render(file)) for file in chunk) <= 300
+
+
+@pytest.fixture
+def map_reduce_worker(tmp_path, cache_dir, monkeypatch):
+    monkeypatch.setattr(settings.generation, "max_request_tokens", 3000)
+    monkeypatch.setattr(settings.ai, "dialog_max_turns", 1)
+    files = {f"m{i}.py": source_file(i) for i in range(24)}
+    repo = make_bare_repo(tmp_path, files)
+
+    def run(answer):
+        ai = RecordingAi(answer)
+        project = make_project(repository=str(repo), source_mode=SourceMode.MIRROR)
+        report = JobReport()
+        PipelineWorker(ai_instance=ai).process(project, report, make_job(project))
+        return ai, files, report
+
+    return run
+
+
+def test_oversized_module_is_split_at_file_boundaries(map_reduce_worker):
+    ai, files, _ = map_reduce_worker(lambda request: "итог")
+
+    map_requests = [request for request in ai.requests if MAP_MARKER in request]
+    assert len(map_requests) > 1
+    for content in files.values():
+        # Каждый файл целиком попадает ровно в одну часть
+        assert sum(content in request for request in map_requests) == 1
+    chunker = ModuleChunker(settings.generation.max_request_tokens, settings.generation.chars_per_token)
+    assert all(chunker.estimate(request) <= chunker.budget_tokens for request in map_requests)
+
+    # Короткие частичные документы объединяются одним запросом
+    assert sum(REDUCE_MARKER in request for request in ai.requests) == 1
+
+
+def test_reduce_stops_once_merged_docs_fit(map_reduce_worker):
+    def answer(request: str) -> str:
+        # Частичные документы вместе не помещаются в запрос, промежуточные итоги - помещаются
+        if MAP_MARKER in request:
+            return "частичный документ " * 160
+        return "итог"
+
+    ai, _, _ = map_reduce_worker(answer)
+
+    map_count = sum(MAP_MARKER in request for request in ai.requests)
+    reduce_requests = [request for request in ai.requests if REDUCE_MARKER in request]
+    intermediate, final = reduce_requests[:-1], reduce_requests[-1]
+
+    assert 1 < len(intermediate) < map_count
+    assert all("частичный документ" in request for request in intermediate)
+    assert "частичный документ" not in final
+    assert final.count("### Часть") == len(intermediate)
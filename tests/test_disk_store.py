@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+
+from ai_docsgen.ai.response_cache import ResponseCache
+from ai_docsgen.disk_store import DiskStore
+from ai_docsgen.git.blob_cache import BlobCache
+from ai_docsgen.schemas import AiCacheStats, BlobCacheStats
+
+
+def test_round_trip_and_lru_eviction(tmp_path):
+    store = DiskStore(tmp_path, max_bytes=10)
+    store.put("aa01", "12345")
+    store.put("aa02", "12345")
+    assert store.get("aa01") == ("12345", 5)  # aa02 становится самой давно использованной
+
+    store.put("aa03", "12345")
+    assert store.get("aa02") is None
+    assert store.get("aa01") is not None
+    assert store.total_bytes == 10
+
+
+def test_index_is_restored_and_expired_entries_dropped(tmp_path):
+    DiskStore(tmp_path, max_bytes=100).put("bb01", "old")
+    os.utime(tmp_path / "bb" / "01", (time.time() - 100, time.time() - 100))
+
+    assert len(DiskStore(tmp_path, max_bytes=100)) == 1
+    assert len(DiskStore(tmp_path, max_bytes=100, max_age=10)) == 0
+
+
+def test_concurrent_reads_of_broken_entry_are_misses(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=1000)
+    key = cache.key("запрос", 1)
+    cache.put(key, "ответ")
+    path = tmp_path / key[:2] / key[2:]
+    path.write_bytes(b"\xff\xfe")
+
+    stats = AiCacheStats()
+    errors = []
+
+    def read():
+        try:
+            assert cache.get(key, stats) is None
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert stats.misses == 8
+    assert not path.exists()
+
+
+def test_blob_cache_counts_saved_bytes(tmp_path):
+    cache = BlobCache(tmp_path, max_bytes=1000)
+    cache.put("cc01", "привет")
+    cache.put("cc02", "")
+
+    stats = BlobCacheStats()
+    assert cache.get("cc01", stats) == "привет"
+    assert cache.get("cc02", stats) == ""
+    assert cache.get("cc03", stats) is None
+    assert (stats.hits, stats.misses, stats.bytes_saved) == (2, 1, 12)
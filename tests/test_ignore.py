@@ -0,0 +1,119 @@
+import re
+
+import pytest
+
+from conftest import RecordingAi, make_bare_repo, make_job, make_project
+from ai_docsgen.ai.worker import PipelineWorker
+from ai_docsgen.git.ignore import IgnoreMatcher
+from ai_docsgen.schemas import JobReport, SourceMode
+
+FILE_RE = re.compile(r"### Файл: (\S+\.py)\n")
+
+REPO = {
+    ".gitignore": "build/\n*.tmp.py\n!keep.tmp.py\n",
+    ".gitattributes": "src/gen/** linguist-generated\nlib/vendor.py export-ignore\n",
+    "main.py": "print(1)\n",
+    "src/a.py": "a = 1\n",
+    "src/pkg/b.py": "b = 2\n",
+    "src/gen/g.py": "g = 3\n",
+    "src/x.tmp.py": "x = 4\n",
+    "src/keep.tmp.py": "k = 5\n",
+    "lib/c.py": "c = 6\n",
+    "lib/vendor.py": "v = 7\n",
+    "build/out.py": "o = 8\n",
+}
+
+
+def documented_files(tmp_path, cache_dir, **project_fields):
+    """Запускает process по зеркалу и возвращает файлы, отправленные в AI"""
+    ai = RecordingAi(lambda request: "документация")
+    project = make_project(repository=str(make_bare_repo(tmp_path, REPO)), source_mode=SourceMode.MIRROR,
+                           **project_fields)
+    PipelineWorker(ai_instance=ai).process(project, JobReport(), make_job(project))
+    return sorted({path for request in ai.requests for path in FILE_RE.findall(request)})
+
+
+def test_repository_ignore_rules_are_applied(tmp_path, cache_dir):
+    assert documented_files(tmp_path, cache_dir) == [
+        "lib/c.py", "main.py", "src/a.py", "src/keep.tmp.py", "src/pkg/b.py"
+    ]
+
+
+@pytest.mark.parametrize("pattern", ["src/", "src", "src/**"])
+def test_include_pattern_covers_directory_contents(tmp_path, cache_dir, pattern):
+    assert documented_files(tmp_path, cache_dir, include_patterns=[pattern]) == [
+        "src/a.py", "src/keep.tmp.py", "src/pkg/b.py"
+    ]
+
+
+def test_exclude_patterns_combine_with_repository_rules(tmp_path, cache_dir):
+    assert documented_files(tmp_path, cache_dir, exclude_patterns=["/main.py", "pkg/"]) == [
+        "lib/c.py", "src/a.py", "src/keep.tmp.py"
+    ]
+
+
+def test_dir_only_pattern_does_not_match_file_of_same_name():
+    matcher = IgnoreMatcher(["build/"])
+    assert matcher.is_excluded("build/out.py")
+    assert not matcher.is_excluded("build")
+    assert matcher.is_excluded("build", is_dir=True)
+
+
+def test_negation_restores_path_and_later_rule_wins():
+    matcher = IgnoreMatcher(["*.py", "!keep.py", "!docs/*.py", "docs/private.py"])
+    assert matcher.is_excluded("src/a.py")
+    assert not matcher.is_excluded("src/keep.py")
+    assert not matcher.is_excluded("docs/public.py")
+    assert matcher.is_excluded("docs/private.py")
+
+    # Файл в исключённой директории не возвращается отрицанием
+    matcher = IgnoreMatcher(["vendor/", "!vendor/keep.py"])
+    assert matcher.is_excluded("vendor/keep.py")
+
+
+def test_leading_slash_anchors_to_base():
+    matcher = IgnoreMatcher(["/setup.py", "tests/data"])
+    assert matcher.is_excluded("setup.py")
+    assert not matcher.is_excluded("pkg/setup.py")
+    assert matcher.is_excluded("tests/data/x.py")
+    assert not matcher.is_excluded("pkg/tests/data/x.py")
+
+    nested = IgnoreMatcher(["/local.py", "*.gen.py"], base="pkg")
+    assert nested.is_excluded("pkg/local.py")
+    assert not nested.is_excluded("local.py")
+    assert nested.is_excluded("pkg/sub/a.gen.py")
+    assert not nested.is_excluded("other/a.gen.py")
+
+
+@pytest.mark.parametrize("pattern, excluded, kept", [
+    ("**/migrations", ["migrations/1.py", "app/migrations/2.py"], ["app/migrations.py"]),
+    ("docs/**", ["docs/a.py", "docs/x/y.py"], ["src/docs.py"]),
+    ("a/**/b.py", ["a/b.py", "a/x/y/b.py"], ["x/a/b.py", "a/x/c.py"]),
+    ("*_pb2.py", ["api_pb2.py", "pkg/api_pb2.py"], ["pkg/api.py"]),
+])
+def test_double_star_globs(pattern, excluded, kept):
+    matcher = IgnoreMatcher([pattern])
+    assert all(matcher.is_excluded(path) for path in excluded)
+    assert not any(matcher.is_excluded(path) for path in kept)
+
+
+def test_gitattributes_excluding_attributes():
+    matcher = IgnoreMatcher()
+    matcher.add_gitattributes([
+        "# комментарий",
+        "*.py text eol=lf",
+        "dist/** export-ignore",
+        "*_pb2.py linguist-generated=true",
+        "api_pb2.py -linguist-generated",
+        "third_party/** linguist-vendored",
+    ])
+    assert not matcher.is_excluded("src/a.py")
+    assert matcher.is_excluded("dist/bundle.py")
+    assert matcher.is_excluded("pkg/model_pb2.py")
+    assert not matcher.is_excluded("pkg/api_pb2.py")
+    assert matcher.is_excluded("third_party/lib/x.py")
+
+    nested = IgnoreMatcher()
+    nested.add_gitattributes(["gen.py linguist-generated"], base="pkg")
+    assert nested.is_excluded("pkg/gen.py")
+    assert not nested.is_excluded("gen.py")
@@ -0,0 +1,78 @@
+import os
+import time
+from uuid import uuid4
+
+from conftest import make_project, make_job
+from ai_docsgen.ai.api import AiAPI
+from ai_docsgen.ai.journal import JobJournal
+from ai_docsgen.ai.worker import PipelineWorker
+from ai_docsgen.config import settings
+from ai_docsgen.schemas import JournalRecord, JobReport, SourceMode
+
+
+def record(module, doc):
+    return JournalRecord(module=module, fingerprint=f"fp-{module}", doc=doc)
+
+
+def test_records_survive_reopen_and_torn_last_line(tmp_path):
+    path = tmp_path / "job.jsonl"
+    journal = JobJournal(path)
+    journal.append(record("a", "doc a"))
+    journal.append(record("b", "doc b"))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"module": "c", "finger')  # запись, оборванная падением процесса
+
+    resumed = JobJournal(path)
+    assert {module: item.doc for module, item in resumed.records.items()} == {"a": "doc a", "b": "doc b"}
+
+
+def test_compact_keeps_last_record_per_module(tmp_path):
+    path = tmp_path / "job.jsonl"
+    journal = JobJournal(path)
+    journal.append(record("a", "old"))
+    journal.append(record("a", "new"))
+    journal.append(record("b", "doc b"))
+
+    journal.compact()
+
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    assert JobJournal(path).records["a"].doc == "new"
+
+
+def test_rerun_of_job_resumes_from_journal(bare_repo, cache_dir, fake_ai):
+    project = make_project(repository=str(bare_repo), source_mode=SourceMode.MIRROR)
+    job = make_job(project)
+    api = AiAPI(base_url=fake_ai.url, key="k", domain="d")
+    try:
+        first = JobReport()
+        PipelineWorker(ai_instance=api).process(project, first, job)
+        assert sorted(first.regenerated_modules) == ["", "pkg", "pkg/sub", "web"]
+        sent = sum(fake_ai.dialogs.values())
+
+        second = JobReport()
+        docs_path = PipelineWorker(ai_instance=api).process(project, second, job)
+    finally:
+        api.close()
+
+    assert sorted(second.resumed_modules) == ["", "pkg", "pkg/sub", "web"]
+    assert second.regenerated_modules == []
+    # README.md первого запуска не меняет запрос обзора, поэтому ответ берётся из кэша
+    assert sum(fake_ai.dialogs.values()) == sent
+    assert (cache_dir / "jobs" / str(job.id) / "README.md").exists()
+    assert docs_path == str(cache_dir / "jobs" / str(job.id))
+
+
+def test_old_jobs_are_evicted(cache_dir, monkeypatch):
+    monkeypatch.setattr(settings.cache, "job_max_age", 60)
+    jobs = cache_dir / "jobs"
+    old_id, fresh_id = uuid4(), uuid4()
+    for job_id in (old_id, fresh_id):
+        (jobs / str(job_id)).mkdir(parents=True)
+        (jobs / f"{job_id}.jsonl").write_text("", encoding="utf-8")
+    stale = time.time() - 3600
+    for path in (jobs / str(old_id), jobs / f"{old_id}.jsonl"):
+        os.utime(path, (stale, stale))
+
+    PipelineWorker._evict_old_jobs(jobs, make_job(make_project()))
+
+    assert sorted(path.name for path in jobs.iterdir()) == sorted([str(fresh_id), f"{fresh_id}.jsonl"])
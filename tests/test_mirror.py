@@ -0,0 +1,60 @@
+from conftest import REPO_FILES, git
+from ai_docsgen.git.ignore import IgnoreMatcher
+from ai_docsgen.git.mirror import LocalMirror
+
+
+def ls_tree(bare_repo, *paths):
+    """Ожидаемое дерево по выводу git ls-tree: {путь: (тип, sha, размер)}"""
+    output = git("ls-tree", "-r", "-t", "-l", "main", "--", *paths, cwd=bare_repo)
+    tree = {}
+    for line in output.splitlines():
+        meta, path = line.split("\t", 1)
+        _, item_type, sha, size = meta.split()
+        tree[path] = (item_type, sha, int(size) if size.isdigit() else None)
+    return tree
+
+
+def as_dict(items):
+    return {item.path: (item.type, item.sha, item.size) for item in items}
+
+
+def test_tree_matches_ls_tree(bare_repo, tmp_path):
+    mirror = LocalMirror(tmp_path / "mirrors")
+    assert as_dict(mirror.get_repository_tree(str(bare_repo))) == ls_tree(bare_repo)
+
+
+def test_partial_clone_keeps_sizes_of_fetched_blobs_only(bare_repo, tmp_path):
+    mirror = LocalMirror(tmp_path / "mirrors", blob_filter="blob:limit=20")
+    items = as_dict(mirror.get_repository_tree(str(bare_repo)))
+
+    for path, content in REPO_FILES.items():
+        size = len(content.encode("utf-8"))
+        # Блобы больше лимита фильтра не загружены, их размер неизвестен
+        assert items[path][2] == (size if size <= 20 else None)
+    assert items["pkg/core.py"][2] is None
+
+    # Отсутствующий блоб догружается при чтении содержимого
+    content = mirror.get_file_content(str(bare_repo), "pkg/core.py")
+    assert content.content == REPO_FILES["pkg/core.py"]
+    assert content.sha == items["pkg/core.py"][1]
+
+
+def test_get_file_content(bare_repo, tmp_path):
+    mirror = LocalMirror(tmp_path / "mirrors")
+    content = mirror.get_file_content(str(bare_repo), "docs/readme.txt")
+
+    assert content.content == REPO_FILES["docs/readme.txt"]
+    assert content.size == len(REPO_FILES["docs/readme.txt"].encode("utf-8"))
+    assert content.path == "docs/readme.txt"
+
+
+def test_directory_prefix_and_ignore(bare_repo, tmp_path):
+    mirror = LocalMirror(tmp_path / "mirrors")
+
+    assert as_dict(mirror.get_repository_tree(str(bare_repo), path="/pkg/")) == {
+        path: item for path, item in ls_tree(bare_repo, "pkg").items() if path.startswith("pkg/")
+    }
+    items = mirror.get_repository_tree(str(bare_repo), ignore=IgnoreMatcher(["pkg/sub/", "*.ts"]))
+    assert sorted(item.path for item in items) == [
+        "docs", "docs/readme.txt", "main.py", "pkg", "pkg/__init__.py", "pkg/core.py", "web"
+    ]
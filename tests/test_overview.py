@@ -0,0 +1,44 @@
+import re
+
+from conftest import RecordingAi, make_job, make_project
+from ai_docsgen.ai.worker import PipelineWorker
+from ai_docsgen.config import settings
+from ai_docsgen.schemas import JobReport, SourceMode
+
+MODULE_RE = re.compile(r"## ФАЙЛЫ ДИРЕКТОРИИ (.+?):\n")
+SUMMARY_RE = re.compile(r"## ДОКУМЕНТАЦИЯ ДИРЕКТОРИИ (.+?):\n")
+
+
+def answer(request: str) -> str:
+    if match := MODULE_RE.search(request):
+        return f"документация {match.group(1)}"
+    if match := SUMMARY_RE.search(request):
+        return f"сводка {match.group(1)}"
+    return "обзор"
+
+
+def test_subtrees_are_summarized_bottom_up(bare_repo, cache_dir, monkeypatch):
+    # Любое поддерево больше лимита, поэтому родителю передаётся только его сводка
+    monkeypatch.setattr(settings.generation, "overview_pass_tokens", 1)
+    monkeypatch.setattr(settings.generation, "pack_max_modules", 1)
+    monkeypatch.setattr(settings.ai, "dialog_max_turns", 1)
+    ai = RecordingAi(answer)
+    project = make_project(repository=str(bare_repo), source_mode=SourceMode.MIRROR)
+
+    PipelineWorker(ai_instance=ai).process(project, JobReport(), make_job(project))
+
+    summaries = {SUMMARY_RE.search(request).group(1): request for request in ai.requests if SUMMARY_RE.search(request)}
+    assert sorted(summaries) == ["pkg", "pkg/sub", "web"]
+    order = [SUMMARY_RE.search(request).group(1) for request in ai.requests if SUMMARY_RE.search(request)]
+    assert order.index("pkg/sub") < order.index("pkg")
+
+    # Сводка родителя строится по его документации и сводке поддиректории
+    assert "документация pkg\n" in summaries["pkg"]
+    assert "сводка pkg/sub" in summaries["pkg"]
+    assert "документация pkg/sub" not in summaries["pkg"]
+
+    overview = ai.requests[-1]
+    assert "## СОДЕРЖИМОЕ ФАЙЛОВ ДОКУМЕНТАЦИИ" in overview
+    assert "документация Корневая директория" in overview
+    assert "сводка pkg\n" in overview and "сводка web" in overview
+    assert "сводка pkg/sub" not in overview and "документация pkg" not in overview
@@ -0,0 +1,67 @@
+from conftest import make_project, make_job
+from ai_docsgen.ai.api import AiAPI
+from ai_docsgen.ai.packing import ModulePacker, SECTION_HEADER
+from ai_docsgen.ai.worker import PipelineWorker
+from ai_docsgen.schemas import TreeItem, JobReport, SourceMode
+
+
+def files(*sizes):
+    return [TreeItem(path=f"f{i}.py", mode="100644", type="blob", size=size, sha=f"s{i}") for i, size in enumerate(sizes)]
+
+
+def test_pack_first_fit_decreasing_respects_limits():
+    packer = ModulePacker(module_max_bytes=50, request_max_bytes=100, max_modules=3)
+    groups = packer.pack({
+        "a": files(50), "b": files(40), "c": files(30), "d": files(20, 10), "e": files(10),
+        "big": files(60), "unknown": files(None),
+    })
+
+    # Убывающий порядок: a(50) b(40) c(30) d(30) e(10); первая подходящая корзина
+    assert groups == [["a", "b", "e"], ["c", "d"]]
+
+
+def test_pack_limits_modules_per_request_and_drops_single_groups():
+    packer = ModulePacker(module_max_bytes=10, request_max_bytes=1000, max_modules=2)
+    assert packer.pack({"a": files(1), "b": files(1), "c": files(1)}) == [["a", "b"]]
+    assert ModulePacker(10, 1000, max_modules=1).pack({"a": files(1), "b": files(1)}) == []
+
+
+def test_split_response_by_section_headers():
+    response = "\n".join([
+        "Вступление, которое игнорируется",
+        SECTION_HEADER.format("pkg"),
+        "# pkg",
+        SECTION_HEADER.format("Корневая директория") + "  ",
+        "# root",
+        SECTION_HEADER.format("лишняя"),
+        "# не запрашивалась",
+    ])
+
+    sections = ModulePacker.split_response(response, ["pkg", "Корневая директория", "web"])
+
+    assert sections == {"pkg": "# pkg\n", "Корневая директория": "# root\n"}
+
+
+def test_split_response_skips_empty_and_repeated_sections():
+    response = "\n".join([SECTION_HEADER.format("a"), "", SECTION_HEADER.format("b"), "first",
+                          SECTION_HEADER.format("b"), "second"])
+    assert ModulePacker.split_response(response, ["a", "b"]) == {"b": "first\n"}
+    assert ModulePacker.split_response("ответ без разделов", ["a", "b"]) == {}
+
+
+def test_malformed_packed_response_is_not_cached(bare_repo, cache_dir, fake_ai):
+    # FakeAiServer отвечает без разделов, поэтому общий запрос каждый раз разбирается неудачно
+    project = make_project(repository=str(bare_repo), source_mode=SourceMode.MIRROR)
+    api = AiAPI(base_url=fake_ai.url, key="k", domain="d")
+    try:
+        first = JobReport()
+        PipelineWorker(ai_instance=api).process(project, first, make_job(project))
+        second = JobReport()
+        PipelineWorker(ai_instance=api).process(project, second, make_job(project))
+    finally:
+        api.close()
+
+    assert sorted(first.regenerated_modules) == ["", "pkg", "pkg/sub", "web"]
+    # Повторно отправляется только общий запрос; ответы отдельных директорий и обзора берутся из кэша
+    assert second.ai_cache.misses == 1
+    assert second.ai_cache.hits > 0
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from ai_docsgen.ai.pipeline import StagedPipeline
+
+
+def test_items_pass_all_stages_in_order():
+    results = []
+    StagedPipeline(
+        stages=[
+            ("double", lambda x: x * 2, 1),
+            ("label", lambda x: f"#{x}", 1),
+            ("collect", results.append, 1),
+        ],
+        queue_size=2
+    ).run(range(20))
+
+    assert results == [f"#{x * 2}" for x in range(20)]
+
+
+def test_parallel_stage_processes_every_item_once():
+    results = []
+    lock = threading.Lock()
+
+    def collect(item):
+        with lock:
+            results.append(item)
+
+    StagedPipeline(stages=[("inc", lambda x: x + 1, 4), ("collect", collect, 2)], queue_size=3).run(range(100))
+
+    assert sorted(results) == list(range(1, 101))
+
+
+def test_producer_waits_while_queue_is_full():
+    release = threading.Event()
+    produced = []
+
+    def items():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    def slow(item):
+        release.wait()
+        return item
+
+    runner = threading.Thread(target=StagedPipeline(stages=[("slow", slow, 1)], queue_size=2).run, args=(items(),))
+    runner.start()
+    time.sleep(0.2)
+
+    # Один элемент в обработке, два в очереди, четвёртый ждёт места в очереди
+    assert len(produced) == 4
+    release.set()
+    runner.join(timeout=5)
+    assert not runner.is_alive()
+    assert len(produced) == 10
+
+
+def test_stage_error_is_raised_after_other_items_finish():
+    results = []
+
+    def check(item):
+        if item == 3:
+            raise ValueError("плохой элемент")
+        return item
+
+    pipeline = StagedPipeline(stages=[("check", check, 2), ("collect", results.append, 1)], queue_size=1)
+    with pytest.raises(ValueError, match="плохой элемент"):
+        pipeline.run(range(10))
+
+    assert sorted(results) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+
+
+def test_input_error_does_not_hang_stages():
+    def items():
+        yield 1
+        raise RuntimeError("ошибка чтения")
+
+    results = []
+    with pytest.raises(RuntimeError, match="ошибка чтения"):
+        StagedPipeline(stages=[("collect", results.append, 2)], queue_size=1).run(items())
+
+    assert results == [1]
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("docgen-collect")]
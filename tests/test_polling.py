@@ -0,0 +1,57 @@
+import random
+import time
+from itertools import islice
+
+import pytest
+
+from conftest import start_fake_ai
+from ai_docsgen.ai.api import AiAPI, AiApiException
+from ai_docsgen.ai.polling import PollingPolicy
+
+
+def make_policy(jitter=0.0, deadline=60.0):
+    return PollingPolicy(initial=1.0, factor=2.0, max_interval=5.0, jitter=jitter, deadline=deadline, smoothing=0.5)
+
+
+def test_backoff_grows_to_max_interval():
+    assert list(islice(make_policy().delays(100), 6)) == [1.0, 2.0, 4.0, 5.0, 5.0, 5.0]
+
+
+def test_jitter_stays_within_bounds():
+    random.seed(7)
+    delays = list(islice(make_policy(jitter=0.2).delays(100), 50))
+
+    intervals = [1.0, 2.0, 4.0] + [5.0] * 47
+    assert all(interval * 0.8 <= delay <= interval * 1.2 for delay, interval in zip(delays, intervals))
+    assert len(set(delays)) == len(delays)
+
+
+def test_observed_latency_moves_first_poll():
+    policy = make_policy()
+    assert policy.expected(100) is None
+
+    policy.observe(100, 10.0)
+    policy.observe(120, 20.0)  # та же корзина размера (64-127 символов)
+
+    assert policy.expected(100) == 15.0
+    assert list(islice(policy.delays(100), 3)) == [12.0, 1.0, 2.0]
+    # Запросы другого размера не затронуты
+    assert policy.expected(1000) is None
+    assert next(policy.delays(1000)) == 1.0
+
+
+def test_ask_stops_at_deadline(fast_polling):
+    server = start_fake_ai(latency_median=30)
+    api = AiAPI(base_url=server.url, key="k", domain="d")
+    api.async_api.polling = PollingPolicy(initial=0.05, factor=2.0, max_interval=0.1, jitter=0.0, deadline=0.5)
+    try:
+        started = time.monotonic()
+        with pytest.raises(AiApiException, match="Не удалось получить ответ"):
+            api.new_dialog().ask_ai("запрос")
+        assert 0.5 <= time.monotonic() - started < 3
+
+        with pytest.raises(AiApiException):
+            api.new_dialog().ask_ai("запрос", max_attempts=2, deadline=10)
+    finally:
+        api.close()
+        server.stop()
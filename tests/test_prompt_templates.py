@@ -0,0 +1,29 @@
+import os
+
+from ai_docsgen.ai.prompt_builder import PromptTemplates
+
+
+def test_edited_template_is_reread(tmp_path):
+    path = tmp_path / "struct.txt"
+    path.write_text("старый промпт", encoding="utf-8")
+    templates = PromptTemplates()
+
+    first = templates.get(path)
+    assert first == "старый промпт"
+    assert templates.get(path) is first  # файл не менялся - текст из кэша
+
+    path.write_text("новый промпт, длиннее", encoding="utf-8")
+    assert templates.get(path) == "новый промпт, длиннее"
+
+
+def test_same_size_edit_is_detected_by_mtime(tmp_path):
+    path = tmp_path / "struct.txt"
+    path.write_text("вариант 1", encoding="utf-8")
+    templates = PromptTemplates()
+    assert templates.get(path) == "вариант 1"
+
+    mtime_ns = path.stat().st_mtime_ns
+    path.write_text("вариант 2", encoding="utf-8")
+    os.utime(path, ns=(mtime_ns + 1_000_000, mtime_ns + 1_000_000))
+
+    assert templates.get(path) == "вариант 2"
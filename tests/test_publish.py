@@ -0,0 +1,84 @@
+import hashlib
+from types import SimpleNamespace
+from unittest import mock
+
+from github import GithubException
+
+from conftest import make_scm
+
+
+def blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def element(path: str, data: bytes) -> SimpleNamespace:
+    return SimpleNamespace(path=path, mode="100644", type="blob", size=len(data), sha=blob_sha(data))
+
+
+def make_repo(remote_files=None):
+    """Подменённый репозиторий PyGithub; remote_files=None - ветки ещё нет"""
+    repo = mock.Mock()
+    repo.create_git_blob.side_effect = lambda content, encoding: SimpleNamespace(sha=f"blob-{content}")
+    repo.create_git_tree.return_value = SimpleNamespace(sha="new-tree")
+    repo.create_git_commit.return_value = SimpleNamespace(sha="new-commit")
+    if remote_files is None:
+        repo.get_git_ref.side_effect = GithubException(404, {"message": "Not Found"}, None)
+    else:
+        repo.get_git_ref.return_value = mock.Mock(object=SimpleNamespace(sha="base-commit"))
+        repo.get_git_commit.return_value = SimpleNamespace(sha="base-commit", tree=SimpleNamespace(sha="base-tree"))
+        repo.get_git_tree.return_value = SimpleNamespace(
+            sha="base-tree", raw_data={"truncated": False},
+            tree=[element(path, data) for path, data in remote_files.items()]
+        )
+    return repo
+
+
+def write_docs(tmp_path, files):
+    for path, data in files.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_bytes(data)
+    return str(tmp_path)
+
+
+def test_changes_are_published_as_one_commit(tmp_path):
+    repo = make_repo({"README.md": b"same\n", "old/old.md": b"removed\n"})
+    scm = make_scm(get_repo=mock.Mock(return_value=repo))
+    local = write_docs(tmp_path, {"README.md": b"same\n", "pkg/pkg.md": b"new\n"})
+
+    assert scm.publish_directory(local, "owner/docs", "Обновление") == "new-commit"
+
+    # Загружается только изменённый файл, удалённый передаётся с sha=None
+    repo.create_git_blob.assert_called_once()
+    repo.create_git_tree.assert_called_once()
+    elements, base_tree = repo.create_git_tree.call_args.args
+    assert [e._identity for e in elements] == [
+        {"path": "pkg/pkg.md", "mode": "100644", "type": "blob", "sha": "blob-bmV3Cg=="},  # base64 от b"new\n"
+        {"path": "old/old.md", "mode": "100644", "type": "blob", "sha": None},
+    ]
+    assert base_tree is repo.get_git_tree.return_value
+    repo.create_git_commit.assert_called_once_with("Обновление", repo.create_git_tree.return_value,
+                                                   [repo.get_git_commit.return_value])
+    repo.get_git_ref.return_value.edit.assert_called_once_with("new-commit", force=False)
+    repo.create_git_ref.assert_not_called()
+
+
+def test_unchanged_directory_is_not_committed(tmp_path):
+    repo = make_repo({"README.md": b"same\n"})
+    scm = make_scm(get_repo=mock.Mock(return_value=repo))
+
+    assert scm.publish_directory(write_docs(tmp_path, {"README.md": b"same\n"}), "owner/docs") == "base-commit"
+    repo.create_git_blob.assert_not_called()
+    repo.create_git_commit.assert_not_called()
+    repo.get_git_ref.return_value.edit.assert_not_called()
+
+
+def test_missing_branch_is_created(tmp_path):
+    repo = make_repo()
+    scm = make_scm(get_repo=mock.Mock(return_value=repo))
+
+    scm.publish_directory(write_docs(tmp_path, {"README.md": b"first\n"}), "owner/docs", branch="docs")
+
+    elements, = repo.create_git_tree.call_args.args
+    assert [e._identity["path"] for e in elements] == ["README.md"]
+    repo.create_git_commit.assert_called_once_with("Update documentation", repo.create_git_tree.return_value, [])
+    repo.create_git_ref.assert_called_once_with("refs/heads/docs", "new-commit")
@@ -0,0 +1,102 @@
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from conftest import make_scm
+from ai_docsgen.git.rate_limit import GithubRateLimiter
+
+
+def acquire_in_thread(limiter):
+    """Запускает acquire в отдельном потоке; возвращает поток и событие получения разрешения"""
+    acquired = threading.Event()
+
+    def run():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, acquired
+
+
+def test_requests_wait_for_reset_when_remaining_hits_reserve():
+    limiter = GithubRateLimiter(max_concurrency=4, reserve=2)
+    assert limiter.acquire() == 0  # запас неизвестен до первого ответа
+    # X-RateLimit-Remaining: 4, X-RateLimit-Reset через 0.3 с
+    limiter.release(remaining=4, limit=10, reset_at=time.time() + 0.3)
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    started = time.monotonic()
+    waited = limiter.acquire()  # в запасе осталось 2 запроса - ждём сброса лимита
+
+    assert 0.2 <= waited <= 1
+    assert time.monotonic() - started >= 0.2
+    assert limiter.throttled_seconds == waited
+
+
+def test_reset_headers_refill_tokens():
+    limiter = GithubRateLimiter(max_concurrency=4, reserve=2)
+    limiter.acquire()
+    limiter.acquire()
+    # Первый ответ: запас на уровне резерва, до сброса лимита минута
+    limiter.release(remaining=3, limit=100, reset_at=time.time() + 60)
+
+    thread, acquired = acquire_in_thread(limiter)
+    assert not acquired.wait(0.2)
+
+    # Второй ответ пришёл уже после сброса лимита и пополняет запас
+    limiter.release(remaining=100, limit=100, reset_at=time.time() + 3600)
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.throttled_seconds > 0
+
+
+def test_concurrency_is_limited_until_release():
+    limiter = GithubRateLimiter(max_concurrency=1, reserve=0)
+    limiter.acquire()
+
+    thread, acquired = acquire_in_thread(limiter)
+    assert not acquired.wait(0.2)
+    limiter.release(remaining=100, limit=100, reset_at=time.time() + 3600)
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_low_remaining_halves_concurrency_and_retry_after_blocks():
+    limiter = GithubRateLimiter(max_concurrency=8, reserve=0)
+    limiter.acquire()
+    limiter.release(remaining=5, limit=100, reset_at=time.time() + 3600)
+    assert limiter._concurrency == 4
+
+    limiter.acquire()
+    limiter.penalize(0.3)
+    started = time.monotonic()
+    assert limiter.acquire() >= 0.2
+    assert time.monotonic() - started >= 0.2
+    assert limiter._concurrency == 1
+
+
+def test_repository_is_requested_once_by_concurrent_threads():
+    repo = SimpleNamespace(
+        name="repo", full_name="owner/repo", description=None, private=False, html_url="https://github.com/owner/repo",
+        clone_url="https://github.com/owner/repo.git", ssh_url="git@github.com:owner/repo.git", default_branch="main",
+        language="Python", size=1, stargazers_count=0, forks_count=0, open_issues_count=0,
+        created_at=datetime.now(), updated_at=datetime.now(), pushed_at=None
+    )
+
+    def get_repo(name):
+        time.sleep(0.1)
+        return repo
+
+    scm = make_scm(get_repo=mock.Mock(side_effect=get_repo))
+
+    threads = [threading.Thread(target=scm.get_repository_info, args=("owner/repo",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    scm._client.get_repo.assert_called_once_with("owner/repo")
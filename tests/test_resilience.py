@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ai_docsgen.ai.api import AiApiException
+from ai_docsgen.ai.resilience import CircuitBreaker, CircuitOpenError
+from ai_docsgen.ai.worker import PipelineWorker
+from ai_docsgen.config import settings
+from ai_docsgen.schemas import JobReport
+
+
+def make_breaker():
+    return CircuitBreaker(window=4, error_rate=0.5, min_requests=2, open_seconds=0)
+
+
+def test_stale_result_does_not_drive_half_open_state():
+    breaker = make_breaker()
+    slow = breaker.before_call()  # разрешён в замкнутом состоянии, завершится позже
+
+    breaker.record(breaker.before_call(), False)
+    breaker.record(breaker.before_call(), False)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    probe = breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    # Результат старого запроса не закрывает цепь и не освобождает место пробного запроса
+    breaker.record(slow, True)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(probe, True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_and_stale_failure_is_ignored():
+    breaker = make_breaker()
+    slow = breaker.before_call()
+    breaker.record(breaker.before_call(), False)
+    breaker.record(breaker.before_call(), False)
+
+    probe = breaker.before_call()
+    breaker.record(slow, False)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.record(probe, False)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+class SlowFirstAi:
+    """Заменяет AiAPI: первая попытка каждого запроса отвечает медленно, повторная - сразу"""
+
+    model_code = "test"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.attempts = {}
+        self._lock = threading.Lock()
+
+    def new_dialog(self):
+        return self
+
+    def clear_context(self):
+        pass
+
+    def ask_ai(self, request):
+        if self.fail:
+            raise AiApiException("AI недоступен")
+        with self._lock:
+            attempt = self.attempts[request] = self.attempts.get(request, 0) + 1
+        if attempt == 1:
+            time.sleep(0.5)
+            return "primary"
+        return "backup"
+
+
+def test_hedged_requests_are_counted_from_concurrent_asks(cache_dir, monkeypatch):
+    monkeypatch.setattr(settings.ai, "hedge_enabled", True)
+    monkeypatch.setattr(settings.ai, "hedge_min_samples", 1)
+    monkeypatch.setattr(settings.ai, "dialog_max_turns", 1)
+    worker = PipelineWorker(ai_instance=SlowFirstAi())
+    worker.latencies.add(0.01)
+    report = JobReport()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda i: worker.ask(f"запрос {i}", report=report), range(8)))
+
+    assert responses == ["backup"] * 8
+    assert report.ai_hedged_requests == 8
+
+
+def test_requests_rejected_by_open_breaker_are_counted(cache_dir, monkeypatch):
+    monkeypatch.setattr(settings.ai, "dialog_max_turns", 1)
+    worker = PipelineWorker(ai_instance=SlowFirstAi(fail=True))
+    worker.breaker = CircuitBreaker(window=1, error_rate=1, min_requests=1, open_seconds=60)
+    report = JobReport()
+
+    with pytest.raises(AiApiException):
+        worker.ask("первый", report=report)
+    for i in range(3):
+        with pytest.raises(CircuitOpenError):
+            worker.ask(f"запрос {i}", report=report)
+
+    assert report.ai_rejected_requests == 3
+    assert worker.breaker.rejected == 3
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import start_fake_ai
+from ai_docsgen.ai.api import AiApiException
+from ai_docsgen.ai.router import AiRouter
+from ai_docsgen.config import AIEndpoint
+
+
+@pytest.fixture
+def servers(fast_polling):
+    started = []
+
+    def start(**config):
+        server = start_fake_ai(**config)
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.stop()
+
+
+def test_dialogs_reach_endpoint_with_its_domain(servers):
+    # Ответ готовится дольше, чем выбор точки вторым диалогом, поэтому диалоги занимают разные точки
+    a, b = servers(latency_median=0.3), servers(latency_median=0.3)
+    router = AiRouter([
+        AIEndpoint(base_url=a.url, key="key-a", domain="domain-a", max_in_flight=1),
+        AIEndpoint(base_url=b.url, key="key-b", domain="domain-b", max_in_flight=1),
+    ])
+    try:
+        dialogs = [router.new_dialog() for _ in range(2)]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda dialog: dialog.ask_ai("запрос"), dialogs))
+        # Продолжение диалога уходит в ту же точку доступа
+        for dialog in dialogs:
+            dialog.ask_ai("продолжение")
+    finally:
+        router.close()
+
+    assert len(a.dialogs) == len(b.dialogs) == 1
+    (dialog_a, count_a), = a.dialogs.items()
+    (dialog_b, count_b), = b.dialogs.items()
+    assert dialog_a.startswith("domain-a_") and dialog_b.startswith("domain-b_")
+    assert count_a == count_b == 2
+    assert sorted(dialog.dialog_id for dialog in dialogs) == sorted([dialog_a, dialog_b])
+
+
+def test_failing_endpoint_is_quarantined(servers):
+    broken, healthy = servers(error_rate=1.0), servers()
+    router = AiRouter([
+        AIEndpoint(base_url=broken.url, key="key-a", domain="domain-a"),
+        AIEndpoint(base_url=healthy.url, key="key-b", domain="domain-b"),
+    ], quarantine_errors=1, quarantine_seconds=60)
+    try:
+        with pytest.raises(AiApiException):
+            router.new_dialog().ask_ai("запрос")
+        for _ in range(3):
+            router.new_dialog().ask_ai("запрос")
+        stats = {endpoint.name.split(" ")[0]: endpoint for endpoint in router.endpoint_stats()}
+    finally:
+        router.close()
+
+    assert broken.dialogs == {}
+    assert len(healthy.dialogs) == 3
+    assert all(dialog.startswith("domain-b_") for dialog in healthy.dialogs)
+    assert stats[broken.url].quarantined and stats[broken.url].errors == 1
+    assert not stats[healthy.url].quarantined and stats[healthy.url].requests == 3
@@ -0,0 +1,47 @@
+import pytest
+
+from ai_docsgen.git.tarball import TarballSource
+from ai_docsgen.schemas import FileContent, TreeItem
+
+
+class ArchiveScm:
+    """Заменяет Scm: отдаёт заранее заданные файлы архива"""
+
+    throttled_seconds = 0.0
+
+    def __init__(self, files, skipped=()):
+        self.files = files
+        self.skipped = skipped
+        self.downloads = 0
+
+    def iter_archive_files(self, repo_name, branch, extensions, max_file_size, on_skip=None):
+        self.downloads += 1
+        for path, reason in self.skipped:
+            on_skip(TreeItem(path=path, mode="100644", type="blob", size=max_file_size + 1, sha=f"sha-{path}"), reason)
+        for path, content in self.files.items():
+            yield FileContent(name=path, path=path, content=content, encoding="utf-8",
+                              size=len(content.encode("utf-8")), sha=f"sha-{path}")
+
+
+def test_spooled_content_keeps_line_endings():
+    scm = ArchiveScm({"win.py": "a = 1\r\nb = 'ё'\r\n", "unix.py": "c = 3\n"})
+    source = TarballSource(scm, extensions=(".py",), max_file_size=100)
+    try:
+        assert sorted(item.path for item in source.get_repository_tree("owner/repo")) == ["unix.py", "win.py"]
+        assert source.get_file_content("owner/repo", "win.py").content == "a = 1\r\nb = 'ё'\r\n"
+        assert source.get_file_content("owner/repo", "unix.py").content == "c = 3\n"
+        assert scm.downloads == 1
+    finally:
+        source.close()
+
+
+def test_skipped_files_stay_in_tree_without_content():
+    scm = ArchiveScm({"small.py": "x = 1\n"}, skipped=[("big.py", "слишком большой")])
+    source = TarballSource(scm, extensions=(".py",), max_file_size=100)
+    try:
+        tree = {item.path: item for item in source.get_repository_tree("owner/repo")}
+        assert tree["big.py"].size == 101
+        with pytest.raises(Exception, match="слишком большой"):
+            source.get_file_content("owner/repo", "big.py")
+    finally:
+        source.close()